@@ -1,6 +1,14 @@
 from flask import Flask
 from dotenv import load_dotenv
 from utils import router as router
+from utils import api
+from utils import database
+from utils import http_cache
+from utils import ingest
+from utils import metrics
+from utils import parallel
+from utils import plan_check
+from utils import suggest
 
 
 def create_app():
@@ -9,20 +17,42 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object("utils.settings")
 
-    
+    # Her istek tek bir havuz bağlantısı kullanır; teardown'da havuza döner
+    app.teardown_appcontext(database.close_request_conn)
+
+    app.cli.add_command(ingest.load_dataset_command)
+    app.cli.add_command(ingest.rebuild_standings_command)
+    app.cli.add_command(plan_check.check_plans_command)
+    # Istek suresi olcumu diger before_request kancalarini da kapsasin diye ilk sirada
+    metrics.init_app(app)
+    # Baska surecteki ingest/yazmalar: veri surumu degisince yerel cache'ler silinir
+    app.before_request(database.sync_dataset_versions)
+    parallel.init_app(app)
+    suggest.init_app(app)
+    http_cache.init_app(app)
+
     app.add_url_rule("/", view_func=router.base_page)
     app.add_url_rule("/players", view_func=router.players_page)
     app.add_url_rule("/players/<int:player_id>", view_func=router.player_profile_page)
     app.add_url_rule("/transfers", view_func=router.transfers_page)
+    app.add_url_rule("/transfers/export", view_func=router.transfers_export)
+    app.add_url_rule("/transfers/analytics", view_func=router.analytics_page)
     app.add_url_rule("/games", view_func=router.games_page)
+    app.add_url_rule("/games/export", view_func=router.games_export)
     app.add_url_rule(
         "/games/<int:game_id>/favorite",
         view_func=router.update_game_favorite,
         methods=["POST"],
     )
     app.add_url_rule("/clubs", view_func=router.clubs_page)
+    app.add_url_rule("/clubs/players", view_func=router.club_squads_api)
     app.add_url_rule("/clubs/<int:club_id>/players", view_func=router.club_players_api)
+    app.add_url_rule("/clubs/<int:club_a>/vs/<int:club_b>", view_func=router.head_to_head_page)
     app.add_url_rule("/competitions", view_func=router.competitions_page)
+    app.add_url_rule("/competitions/<competition_id>/table", view_func=router.competition_table_page)
+    app.add_url_rule("/api/suggest", view_func=router.suggest_api)
+    app.add_url_rule("/metrics", view_func=router.metrics_page)
+    app.register_blueprint(api.bp)
 
     return app
 
@@ -0,0 +1,130 @@
+"""Players yaş filtresi: eski (AGE() ifadesi) ve yeni (doğum tarihi aralığı) karşılaştırması.
+
+Kullanım (proje kökünden):
+
+    DATABASE_URL=... python -m benchmarks.age_filters --repeat 20
+
+Her senaryo için COUNT(*) + ilk sayfa (LIMIT 100) sorgusu çalıştırılır ve
+medyan süre (ms) raporlanır. Eski predicate burada referans olarak tutulur.
+"""
+import argparse
+import os
+import statistics
+import time
+
+import psycopg2
+from dotenv import load_dotenv
+
+from utils.database import age_to_dob_range
+
+LEGACY_AGE = "DATE_PART('year', AGE(CURRENT_DATE, p.date_of_birth))"
+
+CASES = [
+    ("age 20-25", dict(min_age=20, max_age=25)),
+    ("age >= 35", dict(min_age=35)),
+    ("age 18-21 + CB + right", dict(min_age=18, max_age=21, position="Centre-Back", foot="right")),
+    ("age 30-33 + GK + left", dict(min_age=30, max_age=33, position="Goalkeeper", foot="left")),
+]
+
+
+def legacy_where(case):
+    sql, params = ["WHERE 1=1"], []
+    if case.get("min_age") is not None:
+        sql.append(f"AND {LEGACY_AGE} >= %s")
+        params.append(case["min_age"])
+    if case.get("max_age") is not None:
+        sql.append(f"AND {LEGACY_AGE} <= %s")
+        params.append(case["max_age"])
+    return sql, params
+
+
+def range_where(case):
+    sql, params = ["WHERE 1=1"], []
+    born_after, born_on_or_before = age_to_dob_range(case.get("min_age"), case.get("max_age"))
+    if born_on_or_before is not None:
+        sql.append("AND p.date_of_birth <= %s")
+        params.append(born_on_or_before)
+    if born_after is not None:
+        sql.append("AND p.date_of_birth > %s")
+        params.append(born_after)
+    return sql, params
+
+
+def with_common_filters(builder, case):
+    sql, params = builder(case)
+    if case.get("foot"):
+        sql.append("AND LOWER(p.foot) = ANY(%s)")
+        params.append([case["foot"]])
+    if case.get("position"):
+        sql.append("AND p.sub_position = ANY(%s)")
+        params.append([case["position"]])
+    return " ".join(sql), params
+
+
+def timed(cur, repeat, fn):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(cur)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), result
+
+
+def run_case(cur, builder, case):
+    where, params = with_common_filters(builder, case)
+
+    def query(c):
+        c.execute(f"SELECT COUNT(*) FROM players p {where}", params)
+        total = c.fetchone()[0]
+        c.execute(
+            f"SELECT p.player_id FROM players p {where} ORDER BY p.name, p.player_id LIMIT 100",
+            params,
+        )
+        c.fetchall()
+        return total
+
+    return query
+
+
+def age_limits_legacy(cur):
+    cur.execute(
+        f"""
+        SELECT MIN({LEGACY_AGE})::INTEGER, MAX({LEGACY_AGE})::INTEGER
+        FROM players p WHERE p.date_of_birth IS NOT NULL
+        """
+    )
+    return cur.fetchone()
+
+
+def age_limits_range(cur):
+    cur.execute("SELECT MIN(date_of_birth), MAX(date_of_birth) FROM players")
+    return cur.fetchone()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    print(f"{'scenario':<28} {'rows':>7} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for label, case in CASES:
+        before, rows_before = timed(cur, args.repeat, run_case(cur, legacy_where, case))
+        after, rows_after = timed(cur, args.repeat, run_case(cur, range_where, case))
+        if rows_before != rows_after:
+            raise SystemExit(f"{label}: row count mismatch ({rows_before} != {rows_after})")
+        print(f"{label:<28} {rows_after:>7} {before:>10.2f} {after:>10.2f} {before / after:>7.1f}x")
+
+    before, _ = timed(cur, args.repeat, age_limits_legacy)
+    after, _ = timed(cur, args.repeat, age_limits_range)
+    print(f"{'get_age_limits':<28} {'':>7} {before:>10.2f} {after:>10.2f} {before / after:>7.1f}x")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
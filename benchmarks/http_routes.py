@@ -0,0 +1,437 @@
+"""HTTP route benchmark'ı: her route için throughput ve gecikme yüzdelikleri.
+
+Kullanım (proje kökünden):
+
+    DATABASE_URL=... python -m benchmarks.http_routes --requests 200 --workers 1,4 --output bench.json
+    DATABASE_URL=... python -m benchmarks.http_routes --baseline bench.json --max-regression 0.25
+
+İstekler ``app.create_app`` üzerinden (ağ katmanı olmadan, WSGI test client'ı ile)
+gönderilir. Filtre/sıralama/sayfa parametreleri veritabanındaki gerçek seçenek
+listelerinden (sezonlar, ligler, pozisyonlar, yıllar, kulüpler) ``--seed`` ile
+tekrarlanabilir şekilde üretilir. Tablolar yoksa ``dataset/`` yüklenir;
+``--reload`` mevcut tabloları silip yeniden yükler. ``--dataset-dir`` ile
+``benchmarks.scale_dataset`` çıktısı gibi büyütülmüş bir kopya kullanılabilir.
+
+Süreç içi cache'ler (referans veri, liste sonuçları, sayımlar) varsayılan
+``--cache cold`` ile her (route, worker) ölçümünden önce boşaltılır; aksi halde
+ilk seviyeden sonrakiler yalnızca cache isabetlerini ölçer. ``--cache warm``
+cache'leri seviyeler arasında korur. Her ölçüm cache isabet oranını da kaydeder.
+
+``--baseline`` verilirse her (route, worker) için p50/p99 karşılaştırılır; izin
+verilen oranı ve ``--min-delta-ms`` değerini aşan gerileme varsa çıkış kodu 1'dir.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from dotenv import load_dotenv
+
+PERCENTILES = (50, 90, 99)
+COMPARED = ("p50_ms", "p99_ms")
+
+
+# ---------------------------------------------------------------------------
+# Seçenek listeleri ve istek karışımı
+
+def load_options(app):
+    """Route parametreleri için gerçek seçenek listelerini veritabanından okur."""
+    import utils.database as database
+    from utils import router
+
+    with app.app_context():
+        conn = database.get_conn()
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT DISTINCT EXTRACT(YEAR FROM date)::int FROM games WHERE date IS NOT NULL ORDER BY 1")
+            years = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT club_id FROM clubs ORDER BY club_id")
+            clubs = [row[0] for row in cur.fetchall()]
+            cur.execute("SELECT player_id FROM players ORDER BY player_id")
+            players = [row[0] for row in cur.fetchall()]
+            cur.execute(
+                """
+                SELECT competition_id, season FROM standings
+                GROUP BY competition_id, season ORDER BY competition_id, season
+                """
+            )
+            tables = cur.fetchall()
+            cur.execute("SELECT split_part(name, ' ', -1) FROM players WHERE name IS NOT NULL ORDER BY player_id LIMIT 500")
+            names = sorted({row[0] for row in cur.fetchall() if len(row[0]) >= 3})
+            cur.close()
+        finally:
+            conn.rollback()
+            database.release_conn(conn)
+        club_meta = database.get_club_filter_metadata()
+        return {
+            "seasons": database.get_transfer_seasons(),
+            "transfer_leagues": [row["name"] for row in database.get_transfer_leagues()],
+            "club_leagues": club_meta.get("leagues", []),
+            "max_capacity": int(club_meta.get("max_capacity") or 80000),
+            "positions": database.get_all_positions(),
+            "player_sorts": [key for key in database.PLAYER_SORTS if key != "relevance"],
+            "transfer_sorts": list(router.TRANSFER_SORT_OPTIONS),
+            "game_sorts": ["date", "goal_diff_desc", "goal_diff_asc"],
+            "years": years,
+            "clubs": clubs,
+            "players": players,
+            "tables": tables,
+            "names": names,
+        }
+
+
+def _maybe(rng, probability, value):
+    return value if rng.random() < probability else None
+
+
+def _url(path, params):
+    query = urlencode([(k, v) for k, v in params if v is not None and v != ""], doseq=True)
+    return f"{path}?{query}" if query else path
+
+
+def players_url(rng, opt):
+    min_age = _maybe(rng, 0.5, rng.randint(17, 30))
+    max_age = _maybe(rng, 0.5, rng.randint(min_age or 17, 40))
+    params = [
+        ("page", rng.choice((1, 1, 1, 2, 3, 5))),
+        ("min_age", min_age),
+        ("max_age", max_age),
+        ("foot", _maybe(rng, 0.3, rng.choice(("Right", "Left", "Both")))),
+        ("position", _maybe(rng, 0.4, rng.choice(opt["positions"]))),
+        ("sort", rng.choice(opt["player_sorts"])),
+    ]
+    if opt["names"] and rng.random() < 0.2:
+        params.append(("search", rng.choice(opt["names"])))
+    return _url("/players", params)
+
+
+def transfers_url(rng, opt):
+    min_fee = _maybe(rng, 0.3, rng.choice((0, 1_000_000, 5_000_000, 20_000_000)))
+    return _url(
+        "/transfers",
+        [
+            ("submitted", 1),
+            ("season", _maybe(rng, 0.6, rng.choice(opt["seasons"]) if opt["seasons"] else None)),
+            ("from_league", _maybe(rng, 0.25, rng.choice(opt["transfer_leagues"]) if opt["transfer_leagues"] else None)),
+            ("to_league", _maybe(rng, 0.25, rng.choice(opt["transfer_leagues"]) if opt["transfer_leagues"] else None)),
+            ("min_fee", min_fee),
+            ("max_fee", _maybe(rng, 0.2, (min_fee or 0) + rng.choice((10_000_000, 50_000_000)))),
+            ("sort", rng.choice(opt["transfer_sorts"])),
+            ("page", rng.choice((1, 1, 1, 2, 4))),
+        ],
+    )
+
+
+def games_url(rng, opt):
+    return _url(
+        "/games",
+        [
+            ("year", rng.choice(opt["years"]) if opt["years"] else None),
+            ("favorites", _maybe(rng, 0.1, 1)),
+            ("sort", rng.choice(opt["game_sorts"])),
+            ("page", rng.choice((1, 1, 2, 3))),
+        ],
+    )
+
+
+def clubs_url(rng, opt):
+    min_capacity = _maybe(rng, 0.3, rng.choice((0, 10000, 30000)))
+    return _url(
+        "/clubs",
+        [
+            ("submitted", 1),
+            ("league", _maybe(rng, 0.5, rng.choice(opt["club_leagues"]) if opt["club_leagues"] else None)),
+            ("min_age", _maybe(rng, 0.2, rng.choice((22, 24, 26)))),
+            ("max_age", _maybe(rng, 0.2, rng.choice((27, 29, 31)))),
+            ("min_capacity", min_capacity),
+            ("max_capacity", _maybe(rng, 0.2, opt["max_capacity"])),
+            ("search", _maybe(rng, 0.1, rng.choice(("united", "city", "real", "fc")))),
+        ],
+    )
+
+
+def club_players_url(rng, opt):
+    return f"/clubs/{rng.choice(opt['clubs'])}/players"
+
+
+def club_squads_url(rng, opt):
+    ids = rng.sample(opt["clubs"], min(len(opt["clubs"]), 12))
+    return _url("/clubs/players", [("ids", ",".join(map(str, ids)))])
+
+
+def player_profile_url(rng, opt):
+    return f"/players/{rng.choice(opt['players'])}"
+
+
+def head_to_head_url(rng, opt):
+    club_a, club_b = rng.sample(opt["clubs"], 2)
+    return f"/clubs/{club_a}/vs/{club_b}"
+
+
+def competition_table_url(rng, opt):
+    competition_id, season = rng.choice(opt["tables"])
+    return _url(f"/competitions/{competition_id}/table", [("season", season)])
+
+
+def analytics_url(rng, opt):
+    return _url("/transfers/analytics", [("season", _maybe(rng, 0.7, rng.choice(opt["seasons"])))])
+
+
+def api_players_url(rng, opt):
+    return _url(
+        "/api/v1/players",
+        [
+            ("position", _maybe(rng, 0.4, rng.choice(opt["positions"]))),
+            ("min_age", _maybe(rng, 0.4, rng.randint(17, 30))),
+            ("sort", rng.choice(opt["player_sorts"])),
+            ("limit", rng.choice((20, 50, 100))),
+        ],
+    )
+
+
+# route adı -> (URL üretici, gerekli seçenek listeleri)
+ROUTES = {
+    "players": (players_url, ()),
+    "transfers": (transfers_url, ()),
+    "games": (games_url, ("years",)),
+    "clubs": (clubs_url, ()),
+    "club_players": (club_players_url, ("clubs",)),
+    "club_squads": (club_squads_url, ("clubs",)),
+    "player_profile": (player_profile_url, ("players",)),
+    "head_to_head": (head_to_head_url, ("clubs",)),
+    "competitions": (lambda rng, opt: "/competitions", ()),
+    "competition_table": (competition_table_url, ("tables",)),
+    "transfer_analytics": (analytics_url, ("seasons",)),
+    "api_players": (api_players_url, ()),
+}
+DEFAULT_ROUTES = ("players", "transfers", "games", "clubs", "club_players")
+
+
+# ---------------------------------------------------------------------------
+# Ölçüm
+
+def percentile(samples, pct):
+    """Doğrusal enterpolasyonlu yüzdelik (``samples`` sıralı olmalı)."""
+    if not samples:
+        return None
+    rank = (len(samples) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(samples) - 1)
+    return samples[low] + (samples[high] - samples[low]) * (rank - low)
+
+
+def run_route(app, urls, workers):
+    """URL listesini ``workers`` eşzamanlı istemciyle gönderir; özet istatistik döner."""
+    local = threading.local()
+    errors = []
+
+    def send(url):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        started = time.perf_counter()
+        response = client.get(url)
+        response.get_data()  # akış (stream) cevaplarında gövdenin tamamı
+        elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            errors.append((url, response.status_code))
+        return elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        samples = sorted(executor.map(send, urls))
+    wall = time.perf_counter() - started
+
+    result = {
+        "requests": len(samples),
+        "errors": len(errors),
+        "throughput_rps": round(len(samples) / wall, 2) if wall else None,
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(samples[-1], 3),
+    }
+    for pct in PERCENTILES:
+        result[f"p{pct}_ms"] = round(percentile(samples, pct), 3)
+    if errors:
+        result["error_samples"] = [f"{status} {url}" for url, status in errors[:5]]
+    return result
+
+
+def _cache_counters():
+    from utils import cache
+
+    totals = {"hits": 0, "misses": 0}
+    for stats in (cache.stats(), cache.entity_stats(), cache.result_stats()):
+        for key in totals:
+            totals[key] += stats[key]
+    return totals
+
+
+def reset_caches():
+    """Süreç içi cache'leri ve sayım cache'ini boşaltır (soğuk ölçüm)."""
+    from utils import cache, counting
+
+    cache.invalidate()
+    counting.clear()
+
+
+def cache_usage(before, after):
+    """İki ``_cache_counters`` arasındaki isabet/ıska ve isabet oranı."""
+    hits = after["hits"] - before["hits"]
+    misses = after["misses"] - before["misses"]
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "hit_ratio": round(hits / lookups, 4) if lookups else None}
+
+
+def ensure_dataset(app, reload, dataset_dir):
+    """Tablolar yoksa (ya da ``reload``) ``dataset_dir`` klasörünü yükler."""
+    import utils.database as database
+    from utils import ingest
+
+    with app.app_context():
+        conn = database.get_pool().getconn()
+        try:
+            existing = ingest._existing_tables(conn)
+        finally:
+            database.get_pool().putconn(conn)
+        if reload or len(existing) < len(ingest.TABLE_SPECS):
+            print(f"Seeding database from {dataset_dir} ...")
+            ingest.load_dataset(dataset_dir, replace=bool(existing))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_regression, min_delta_ms):
+    """Baseline'a göre gerileyen (route, worker, metrik) listesini döner."""
+    regressions = []
+    for route, levels in results["routes"].items():
+        for workers, current in levels.items():
+            previous = baseline.get("routes", {}).get(route, {}).get(workers)
+            if not previous:
+                continue
+            for metric in COMPARED:
+                old, new = previous.get(metric), current.get(metric)
+                if old is None or new is None:
+                    continue
+                if new > old * (1 + max_regression) and new - old > min_delta_ms:
+                    regressions.append((route, workers, metric, old, new))
+    return regressions
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", default=",".join(DEFAULT_ROUTES), help=f"Virgülle ayrılmış; 'all' ya da: {', '.join(ROUTES)}")
+    parser.add_argument("--requests", type=int, default=200, help="Route ve worker seviyesi başına istek sayısı")
+    parser.add_argument("--warmup", type=int, default=20, help="Ölçülmeyen ısınma isteği sayısı")
+    parser.add_argument("--workers", default="1,4", help="Eşzamanlı istemci sayıları, ör. 1,2,4")
+    parser.add_argument("--seed", type=int, default=42, help="Parametre karışımı için rastgele tohum")
+    parser.add_argument("--cache", choices=("cold", "warm"), default="cold", help="cold: her ölçümden önce süreç içi cache'leri boşalt; warm: koru")
+    parser.add_argument("--reload", action="store_true", help="Dataset'i tabloları silerek yeniden yükle")
+    parser.add_argument("--dataset-dir", help="Yüklenecek CSV klasörü (varsayılan dataset/; bkz. benchmarks.scale_dataset)")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki JSON sonucu")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="İzin verilen oran (0.25 = %%25 yavaşlama)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Bundan küçük farklar gerileme sayılmaz")
+    args = parser.parse_args()
+
+    if "DATABASE_URL" not in os.environ:
+        raise SystemExit("DATABASE_URL is not set")
+    routes = list(ROUTES) if args.routes == "all" else [r.strip() for r in args.routes.split(",") if r.strip()]
+    unknown = [r for r in routes if r not in ROUTES]
+    if unknown:
+        raise SystemExit(f"Unknown routes: {', '.join(unknown)}. Available: {', '.join(ROUTES)}")
+    worker_levels = [int(w) for w in args.workers.split(",")]
+
+    from app import create_app
+
+    app = create_app()
+    from utils.ingest import DEFAULT_DATASET_DIR
+
+    ensure_dataset(app, args.reload, args.dataset_dir or DEFAULT_DATASET_DIR)
+    options = load_options(app)
+
+    from utils import settings
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "workers": worker_levels,
+            "seed": args.seed,
+            "dataset_dir": args.dataset_dir,
+            "db_pool_max_size": settings.DB_POOL_MAX_SIZE,
+            "parallel_enabled": settings.PARALLEL_ENABLED,
+            "cache_mode": args.cache,
+            "result_cache_enabled": settings.RESULT_CACHE_ENABLED,
+        },
+        "routes": {},
+    }
+
+    print(f"{'route':<20} {'workers':>7} {'rps':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'errors':>7} {'cache hit':>9}")
+    for route in routes:
+        make_url, required = ROUTES[route]
+        if any(not options[name] for name in required):
+            print(f"{route:<20} skipped (no data for {', '.join(required)})")
+            continue
+        rng = random.Random(f"{args.seed}:{route}")
+        urls = [make_url(rng, options) for _ in range(args.warmup + args.requests)]
+        if args.warmup:
+            run_route(app, urls[: args.warmup], 1)
+        results["routes"][route] = {}
+        for workers in worker_levels:
+            if args.cache == "cold":
+                reset_caches()
+            before = _cache_counters()
+            stats = run_route(app, urls[args.warmup :], workers)
+            stats["cache"] = cache_usage(before, _cache_counters())
+            results["routes"][route][str(workers)] = stats
+            hit_ratio = stats["cache"]["hit_ratio"]
+            print(
+                f"{route:<20} {workers:>7} {stats['throughput_rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+                f"{stats['p90_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>7} "
+                f"{'-' if hit_ratio is None else f'{hit_ratio:.0%}':>9}"
+            )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        baseline_mode = baseline.get("config", {}).get("cache_mode", "warm")
+        if baseline_mode != args.cache:
+            raise SystemExit(f"Baseline was measured with --cache {baseline_mode}; rerun with the same mode")
+        regressions = compare(results, baseline, args.max_regression, args.min_delta_ms)
+        if regressions:
+            print(f"\nRegressions vs {args.baseline} (commit {baseline.get('commit')}):")
+            for route, workers, metric, old, new in regressions:
+                print(f"  {route:<20} workers={workers:<3} {metric}: {old:.2f} -> {new:.2f} ms ({new / old - 1:+.0%})")
+            sys.exit(1)
+        print(f"\nNo regressions vs {args.baseline} (threshold {args.max_regression:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
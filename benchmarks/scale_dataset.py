@@ -0,0 +1,203 @@
+"""Sentetik dataset büyütücü: ``dataset/`` dosyalarından N kat büyük, tutarlı bir kopya üretir.
+
+Kullanım (proje kökünden):
+
+    python -m benchmarks.scale_dataset --factor 100 --output-dir /tmp/dataset_x100
+    flask load-dataset --dataset-dir /tmp/dataset_x100 --replace
+    python -m benchmarks.http_routes --dataset-dir /tmp/dataset_x100 --output bench_x100.json
+
+Çıktı, ``ingest.TABLE_SPECS`` ile aynı dosya adları, ayraçlar ve sayı
+biçimleriyle (ör. noktalı transfer tutarları) yazılır, yani doğrudan yüklenebilir.
+
+- Referans tablolar (ülkeler, pozisyonlar, ligler) aynen kopyalanır.
+- Kulüp, oyuncu, maç ve transferler ``factor`` kopya halinde yazılır. Kopya 0
+  orijinal satırlardır. Diğer kopyalarda id'ler yoğun bir aralığa kaydırılır,
+  yabancı anahtarlar aynı kopyadaki karşılıklarına eşlenir.
+- Kopyalarda doğum tarihi, boy, kapasite, bonservis ve piyasa değeri hafifçe
+  oynatılır, oyuncu isimleri karıştırılır. Lig, sezon, tarih, pozisyon ve ayak
+  dağılımları gerçek veriyle aynı kalır.
+
+Girdi her kopya için yeniden okunur, satırlar tek tek yazılır. Bellekte yalnızca
+orijinal boyuttaki id eşlemeleri tutulur, yani 1000x ölçekte de bellek sabittir.
+"""
+import argparse
+import csv
+import math
+import os
+import random
+import shutil
+import time
+from datetime import date, timedelta
+
+from utils.ingest import DEFAULT_DATASET_DIR, TABLE_SPECS, parse_dotted_amount
+
+REFERENCE_TABLES = ("countries", "positions", "competitions", "sub_positions")
+# Tablo -> (kopyalarda kaydırılan id kolonu, {FK kolonu: hedef tablo})
+SCALED_TABLES = {
+    "clubs": ("club_id", {}),
+    "players": ("player_id", {"current_club_id": "clubs"}),
+    "games": ("game_id", {"home_club_id": "clubs", "away_club_id": "clubs"}),
+    "transfers": (
+        "transfer_id",
+        {"player_id": "players", "from_club_id": "clubs", "to_club_id": "clubs"},
+    ),
+}
+
+
+def _read(spec, source_dir):
+    """(basliklar, satir iteratoru); dosya satir satir okunur."""
+    f = open(os.path.join(source_dir, spec.filename), encoding="utf-8-sig", newline="")
+    reader = csv.reader(f, delimiter=spec.delimiter)
+    header = [h.strip() for h in next(reader)]
+
+    def rows():
+        with f:
+            yield from reader
+
+    return header, rows()
+
+
+def format_dotted_amount(value):
+    """``parse_dotted_amount`` tersi: 52140000 -> '52.140.000.000'."""
+    if value is None:
+        return ""
+    if value == 0:
+        return "0"
+    return f"{value:,}".replace(",", ".") + ".000"
+
+
+class IdSpace:
+    """Orijinal id -> sira eslemesi; kopya ``k`` icin id'yi yogun bir araliga kaydirir."""
+
+    def __init__(self, ids):
+        self.rank = {value: i for i, value in enumerate(ids)}
+        self.base = max(ids, default=0) + 1
+
+    def shift(self, value, replica):
+        if replica == 0 or value == "":
+            return value
+        rank = self.rank.get(int(value))
+        if rank is None:
+            # Orijinal veride de eslesmeyen referans; oldugu gibi birakilir
+            return value
+        return str(self.base + (replica - 1) * len(self.rank) + rank)
+
+
+def _jitter_number(rng, value, spread, digits=0):
+    if value == "":
+        return value
+    number = float(value) * math.exp(rng.gauss(0, spread))
+    return f"{number:.{digits}f}" if digits else str(int(round(number)))
+
+
+def _jitter_date(rng, value, days):
+    if not value:
+        return value
+    # 'YYYY-MM-DD' ya da 'YYYY-MM-DD 00:00:00'; saat kismi aynen korunur
+    shifted = date.fromisoformat(value[:10]) + timedelta(days=rng.randint(-days, days))
+    return shifted.isoformat() + value[10:]
+
+
+def _jitter_amount(rng, value, spread):
+    amount = parse_dotted_amount(value)
+    if not amount:
+        return value
+    return format_dotted_amount(int(round(amount * math.exp(rng.gauss(0, spread)), -3)))
+
+
+class Scaler:
+    def __init__(self, source_dir, output_dir, factor, seed=42):
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.factor = factor
+        self.seed = seed
+        self.spaces = {}
+        self.surnames = []
+
+    def _load_spaces(self):
+        for table, (id_column, _) in SCALED_TABLES.items():
+            header, rows = _read(TABLE_SPECS[table], self.source_dir)
+            index = header.index(id_column)
+            name = header.index("name") if table == "players" else None
+            ids = []
+            for row in rows:
+                ids.append(int(row[index]))
+                if name is not None and " " in row[name]:
+                    self.surnames.append(row[name].rsplit(" ", 1)[1])
+            self.spaces[table] = IdSpace(ids)
+
+    def _perturb(self, table, record, rng):
+        """Kopya satirinin sayisal/tarih alanlarini dagilimi bozmadan oynatir."""
+        if table == "clubs":
+            record["name"] = f"{record['name']} {record['_replica']}"
+            record["stadium_seats"] = _jitter_number(rng, record["stadium_seats"], 0.1)
+        elif table == "players":
+            if " " in record["name"] and self.surnames:
+                record["name"] = f"{record['name'].rsplit(' ', 1)[0]} {rng.choice(self.surnames)}"
+            record["date_of_birth"] = _jitter_date(rng, record["date_of_birth"], 365)
+            record["height_in_cm"] = _jitter_number(rng, record["height_in_cm"], 0.01, digits=1)
+        elif table == "transfers":
+            record["transfer_fee"] = _jitter_amount(rng, record["transfer_fee"], 0.2)
+            record["market_value_in_eur"] = _jitter_amount(rng, record["market_value_in_eur"], 0.2)
+
+    def _write_scaled(self, table):
+        spec = TABLE_SPECS[table]
+        id_column, references = SCALED_TABLES[table]
+        path = os.path.join(self.output_dir, spec.filename)
+        count = 0
+        with open(path, "w", encoding="utf-8", newline="") as out:
+            writer = csv.writer(out, delimiter=spec.delimiter, lineterminator="\n")
+            for replica in range(self.factor):
+                header, rows = _read(spec, self.source_dir)
+                if replica == 0:
+                    writer.writerow(header)
+                rng = random.Random(f"{self.seed}:{table}:{replica}")
+                for row in rows:
+                    if replica:
+                        record = dict(zip(header, row), _replica=replica)
+                        record[id_column] = self.spaces[table].shift(record[id_column], replica)
+                        for column, target in references.items():
+                            record[column] = self.spaces[target].shift(record[column], replica)
+                        self._perturb(table, record, rng)
+                        row = [record[column] for column in header]
+                    writer.writerow(row)
+                    count += 1
+        return count
+
+    def run(self, echo=print):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._load_spaces()
+        for table in REFERENCE_TABLES:
+            spec = TABLE_SPECS[table]
+            shutil.copyfile(os.path.join(self.source_dir, spec.filename), os.path.join(self.output_dir, spec.filename))
+            echo(f"  {table:<14} copied")
+        total = 0
+        for table in SCALED_TABLES:
+            started = time.perf_counter()
+            count = self._write_scaled(table)
+            total += count
+            elapsed = time.perf_counter() - started
+            echo(f"  {table:<14} {count:>10} rows  {elapsed:7.2f}s  {count / max(elapsed, 1e-9):>10,.0f} rows/s")
+        return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--factor", type=int, required=True, help="Kulüp/oyuncu/maç/transfer çarpanı (ör. 10, 100, 1000)")
+    parser.add_argument("--output-dir", required=True, help="Üretilen CSV'lerin yazılacağı klasör")
+    parser.add_argument("--source-dir", default=DEFAULT_DATASET_DIR, help="Kaynak dataset klasörü")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.factor < 1:
+        raise SystemExit("--factor must be >= 1")
+    if os.path.abspath(args.output_dir) == os.path.abspath(args.source_dir):
+        raise SystemExit("--output-dir must differ from --source-dir")
+
+    started = time.perf_counter()
+    total = Scaler(args.source_dir, args.output_dir, args.factor, args.seed).run()
+    print(f"Wrote {total} rows (x{args.factor}) to {args.output_dir} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,16 @@
+-- Extensions: trigram index support and accent folding for name search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- Search key used by name search and its trigram indexes: lower-cased and
+-- accent-folded ("Özil" -> "ozil"). unaccent() itself is only STABLE, so it
+-- is wrapped with an explicit dictionary to be usable in index expressions.
+CREATE OR REPLACE FUNCTION f_search_key(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$;
+
+
 -- Table: positions
 CREATE TABLE positions (
     position_id INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
@@ -89,7 +102,10 @@ CREATE TABLE games (
     date DATE,
     home_club_position INTEGER,
     away_club_position INTEGER,
-    season VARCHAR
+    season VARCHAR,
+    is_favorite BOOLEAN NOT NULL DEFAULT FALSE,
+    -- Skorlardan biri NULL ise NULL kalir
+    goal_difference INTEGER GENERATED ALWAYS AS (ABS(home_club_goals - away_club_goals)) STORED
 );
 
 -- FKs for games
@@ -118,6 +134,37 @@ CREATE TABLE transfers (
     market_value_in_eur INTEGER
 );
 
+-- Table: dataset_version
+-- Ingest ve yazma islemlerinde artirilir; HTTP ETag'leri buradan turetilir.
+-- --replace ile yeniden yuklemede silinmez, boylece eski ETag'ler tekrar eslesmez.
+CREATE TABLE IF NOT EXISTS dataset_version (
+    table_name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Table: standings
+-- games tablosundan turetilir (utils/standings.py); ingest sirasinda yalnizca
+-- degisen (competition_id, season) gruplari yeniden hesaplanir.
+CREATE TABLE IF NOT EXISTS standings (
+    competition_id TEXT NOT NULL,
+    season VARCHAR NOT NULL,
+    club_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    played INTEGER NOT NULL,
+    won INTEGER NOT NULL,
+    drawn INTEGER NOT NULL,
+    lost INTEGER NOT NULL,
+    goals_for INTEGER NOT NULL,
+    goals_against INTEGER NOT NULL,
+    goal_difference INTEGER NOT NULL,
+    points INTEGER NOT NULL,
+    -- Son 5 mac, eskiden yeniye (ör. 'WDLWW')
+    form VARCHAR(5) NOT NULL,
+    last_game_date DATE,
+    PRIMARY KEY (competition_id, season, club_id)
+);
+
 -- FKs for transfers
 ALTER TABLE transfers
     ADD CONSTRAINT transfers_player_id_fkey
@@ -142,8 +189,20 @@ CREATE INDEX IF NOT EXISTS idx_games_home_club_id
 CREATE INDEX IF NOT EXISTS idx_games_away_club_id
     ON games(away_club_id);
 
-CREATE INDEX IF NOT EXISTS idx_games_competition_id
-    ON games(competition_id);
+-- Iki kulup arasindaki maclar (sirasiz cift): /clubs/<a>/vs/<b>
+CREATE INDEX IF NOT EXISTS idx_games_club_pair
+    ON games(LEAST(home_club_id, away_club_id), GREATEST(home_club_id, away_club_id), date);
+
+-- competition_id tek basina da bu index'i kullanir; puan durumu (lig, sezon) gruplarini okur
+CREATE INDEX IF NOT EXISTS idx_games_competition_season
+    ON games(competition_id, season);
+
+-- Games sayfasi: yil filtresi yari acik tarih araligi, varsayilan siralama (date, game_id)
+CREATE INDEX IF NOT EXISTS idx_games_date
+    ON games(date, game_id);
+
+CREATE INDEX IF NOT EXISTS idx_games_favorite_date
+    ON games(date, game_id) WHERE is_favorite;
 
 CREATE INDEX IF NOT EXISTS idx_transfers_player_id
     ON transfers(player_id);
@@ -162,3 +221,119 @@ CREATE INDEX IF NOT EXISTS idx_competitions_country_name
 
 CREATE INDEX IF NOT EXISTS idx_players_country_of_citizenship
     ON players(country_of_citizenship);
+
+-- Keyset pagination: (sort column, unique tiebreaker)
+CREATE INDEX IF NOT EXISTS idx_players_name_id
+    ON players(name, player_id);
+
+CREATE INDEX IF NOT EXISTS idx_players_date_of_birth_id
+    ON players(date_of_birth, player_id);
+
+CREATE INDEX IF NOT EXISTS idx_players_height_id
+    ON players(height_in_cm, player_id);
+
+CREATE INDEX IF NOT EXISTS idx_transfers_date_id
+    ON transfers(transfer_date, transfer_id);
+
+CREATE INDEX IF NOT EXISTS idx_transfers_fee_id
+    ON transfers(transfer_fee, transfer_id);
+
+CREATE INDEX IF NOT EXISTS idx_transfers_value_id
+    ON transfers(market_value_in_eur, transfer_id);
+
+-- Players filtreleri: pozisyon + ayak + yaş (doğum tarihi aralığı)
+CREATE INDEX IF NOT EXISTS idx_players_position_foot_dob
+    ON players(sub_position, lower(foot), date_of_birth);
+
+-- Fuzzy / substring name search (LIKE '%q%' and word similarity)
+CREATE INDEX IF NOT EXISTS idx_players_name_trgm
+    ON players USING gin (f_search_key(name) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_clubs_name_trgm
+    ON clubs USING gin (f_search_key(name) gin_trgm_ops);
+
+-- Transfer analytics (materialized; ingest sonrasi REFRESH ... CONCURRENTLY)
+-- Lig -> lig para akisi, sezon bazinda
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_transfer_flows AS
+SELECT
+    t.transfer_season AS season,
+    COALESCE(fc.domestic_competition_id, '-') AS from_league_id,
+    COALESCE(fc_comp.name, 'other') AS from_league,
+    COALESCE(tc.domestic_competition_id, '-') AS to_league_id,
+    COALESCE(tc_comp.name, 'other') AS to_league,
+    COUNT(*) AS transfers,
+    COUNT(t.transfer_fee) FILTER (WHERE t.transfer_fee > 0) AS paid_transfers,
+    COALESCE(SUM(t.transfer_fee), 0)::BIGINT AS total_fees
+FROM transfers t
+LEFT JOIN clubs fc ON t.from_club_id = fc.club_id
+LEFT JOIN clubs tc ON t.to_club_id = tc.club_id
+LEFT JOIN competitions fc_comp ON fc.domestic_competition_id = fc_comp.competition_id
+LEFT JOIN competitions tc_comp ON tc.domestic_competition_id = tc_comp.competition_id
+WHERE t.transfer_season IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_transfer_flows_key
+    ON mv_transfer_flows(season, from_league_id, to_league_id);
+
+-- Kulup bazinda sezonluk harcama / gelir
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_club_net_spend AS
+SELECT
+    m.club_id,
+    c.name AS club_name,
+    c.domestic_competition_id AS league_id,
+    m.season,
+    SUM(m.spent)::BIGINT AS spent,
+    SUM(m.received)::BIGINT AS received,
+    (SUM(m.spent) - SUM(m.received))::BIGINT AS net_spend,
+    SUM(m.arrivals)::INTEGER AS arrivals,
+    SUM(m.departures)::INTEGER AS departures
+FROM (
+    SELECT to_club_id AS club_id, transfer_season AS season,
+           COALESCE(transfer_fee, 0) AS spent, 0 AS received, 1 AS arrivals, 0 AS departures
+    FROM transfers
+    UNION ALL
+    SELECT from_club_id, transfer_season,
+           0, COALESCE(transfer_fee, 0), 0, 1
+    FROM transfers
+) m
+JOIN clubs c ON c.club_id = m.club_id
+WHERE m.season IS NOT NULL
+GROUP BY m.club_id, c.name, c.domestic_competition_id, m.season;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_club_net_spend_key
+    ON mv_club_net_spend(season, club_id);
+
+-- Sezonun en pahali transferleri (sezon basina ilk 25)
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_top_transfers AS
+SELECT *
+FROM (
+    SELECT
+        t.transfer_id,
+        t.transfer_season AS season,
+        ROW_NUMBER() OVER (
+            PARTITION BY t.transfer_season ORDER BY t.transfer_fee DESC, t.transfer_id
+        )::INTEGER AS season_rank,
+        t.transfer_date,
+        t.transfer_fee,
+        t.market_value_in_eur,
+        t.player_id,
+        p.name AS player_name,
+        fc.name AS from_club,
+        fc_comp.name AS from_league,
+        tc.name AS to_club,
+        tc_comp.name AS to_league
+    FROM transfers t
+    LEFT JOIN players p ON t.player_id = p.player_id
+    LEFT JOIN clubs fc ON t.from_club_id = fc.club_id
+    LEFT JOIN clubs tc ON t.to_club_id = tc.club_id
+    LEFT JOIN competitions fc_comp ON fc.domestic_competition_id = fc_comp.competition_id
+    LEFT JOIN competitions tc_comp ON tc.domestic_competition_id = tc_comp.competition_id
+    WHERE t.transfer_season IS NOT NULL AND t.transfer_fee > 0
+) ranked
+WHERE season_rank <= 25;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_top_transfers_key
+    ON mv_top_transfers(transfer_id);
+
+CREATE INDEX IF NOT EXISTS idx_mv_top_transfers_season_rank
+    ON mv_top_transfers(season, season_rank);
@@ -7,32 +7,136 @@ document.addEventListener('DOMContentLoaded', function() {
     const inputSearch = document.getElementById('inputSearch');
     const filterForm = document.getElementById('filterForm');
 
-    // Debounce Timer: Kullanıcı her harfe bastığında değil, 
-    // yazmayı bitirdikten 600ms sonra arama yapsın.
+    // Type-ahead: her harfte /api/suggest'ten öneri al (sayfa yenilenmez).
+    // Tam arama (tablo) Enter'a basınca yapılır.
     let typingTimer;
-    const doneTypingInterval = 600; // ms
+    const suggestInterval = 120; // ms
+    let suggestController = null;
+    let activeIndex = -1;
+    let suggestions = [];
+
+    const suggestBox = document.createElement('ul');
+    suggestBox.className = 'suggest-list';
+    suggestBox.id = 'suggestList';
+    if (searchInput) searchInput.parentElement.appendChild(suggestBox);
 
     if (searchInput) {
-        // Kullanıcı yazarken sayacı sıfırla
+        searchInput.setAttribute('autocomplete', 'off');
+
         searchInput.addEventListener('input', function() {
             clearTimeout(typingTimer);
-            typingTimer = setTimeout(performSearch, doneTypingInterval);
+            typingTimer = setTimeout(fetchSuggestions, suggestInterval);
         });
 
-        // Enter'a basarsa hemen ara
         searchInput.addEventListener('keydown', function(e) {
-            if (e.key === 'Enter') {
+            if (e.key === 'ArrowDown' || e.key === 'ArrowUp') {
+                if (suggestions.length === 0) return;
+                e.preventDefault();
+                const step = e.key === 'ArrowDown' ? 1 : -1;
+                activeIndex = (activeIndex + step + suggestions.length) % suggestions.length;
+                highlightSuggestion();
+            } else if (e.key === 'Escape') {
+                hideSuggestions();
+            } else if (e.key === 'Enter') {
                 clearTimeout(typingTimer);
-                performSearch();
+                if (activeIndex >= 0 && suggestions[activeIndex]) {
+                    window.location.href = suggestions[activeIndex].url;
+                } else {
+                    hideSuggestions();
+                    performSearch();
+                }
             }
         });
     }
 
+    function fetchSuggestions() {
+        const q = searchInput.value.trim();
+        if (!q) {
+            hideSuggestions();
+            return;
+        }
+        // Önceki istek hala sürüyorsa iptal et
+        if (suggestController) suggestController.abort();
+        suggestController = new AbortController();
+
+        fetch(`/api/suggest?q=${encodeURIComponent(q)}&limit=8`, { signal: suggestController.signal })
+            .then(res => res.ok ? res.json() : { results: [] })
+            .then(data => renderSuggestions(data.results || []))
+            .catch(err => {
+                if (err.name !== 'AbortError') hideSuggestions();
+            });
+    }
+
+    function renderSuggestions(results) {
+        suggestions = results;
+        activeIndex = -1;
+        suggestBox.innerHTML = '';
+        if (results.length === 0) {
+            hideSuggestions();
+            return;
+        }
+        const kindLabels = { player: 'Player', club: 'Club', competition: 'League' };
+        results.forEach((item, idx) => {
+            const li = document.createElement('li');
+            li.className = 'suggest-item';
+
+            const label = document.createElement('span');
+            label.className = 'suggest-label';
+            label.textContent = item.label;
+            li.appendChild(label);
+
+            const meta = document.createElement('span');
+            meta.className = 'suggest-meta';
+            meta.textContent = [kindLabels[item.kind] || item.kind, item.detail].filter(Boolean).join(' · ');
+            li.appendChild(meta);
+
+            // mousedown: input blur olmadan önce yakala
+            li.addEventListener('mousedown', function(e) {
+                e.preventDefault();
+                window.location.href = item.url;
+            });
+            li.addEventListener('mouseenter', function() {
+                activeIndex = idx;
+                highlightSuggestion();
+            });
+            suggestBox.appendChild(li);
+        });
+        suggestBox.classList.add('show');
+    }
+
+    function highlightSuggestion() {
+        Array.from(suggestBox.children).forEach((li, idx) => {
+            li.classList.toggle('active', idx === activeIndex);
+        });
+    }
+
+    function hideSuggestions() {
+        suggestions = [];
+        activeIndex = -1;
+        suggestBox.classList.remove('show');
+        suggestBox.innerHTML = '';
+    }
+
+    if (searchInput) {
+        searchInput.addEventListener('blur', hideSuggestions);
+    }
+
     function performSearch() {
         // 1. Search değerini gizli forma aktar
         if (inputSearch && searchInput) {
             inputSearch.value = searchInput.value;
         }
+
+        // Yeni aramada varsayılan sıralama yerine benzerliğe göre sırala
+        const sortInput = document.getElementById('inputSort');
+        if (sortInput && searchInput) {
+            const hasQuery = searchInput.value.trim() !== '';
+            if (hasQuery && (sortInput.value === '' || sortInput.value === 'name_asc')) {
+                sortInput.value = 'relevance';
+            } else if (!hasQuery && sortInput.value === 'relevance') {
+                sortInput.value = 'name_asc';
+            }
+        }
         
         // 2. Foot ve Position verilerini hidden inputlara doldur (yardımcı fonk.)
         refreshHiddenInputs();
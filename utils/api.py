@@ -0,0 +1,204 @@
+from flask import Blueprint, current_app, request, url_for
+
+import utils.database as database
+from utils import settings
+from utils.serialize import dumps
+
+bp = Blueprint("api_v1", __name__, url_prefix="/api/v1")
+
+
+# Tarihe cevrilen filtrelerin gecerli araliklari
+MIN_YEAR, MAX_YEAR = 1900, 9998
+MAX_AGE = 150
+
+
+class ApiError(Exception):
+    """Gecersiz istek parametresi; 400 olarak doner."""
+
+
+@bp.errorhandler(ApiError)
+def _api_error(error):
+    return _json({"error": str(error)}, status=400)
+
+
+def _json(payload, status=200):
+    return current_app.response_class(dumps(payload), status=status, mimetype="application/json")
+
+
+def _bool_arg(name):
+    raw = request.args.get(name)
+    if raw is None or raw == "":
+        return None
+    return str(raw).lower() in ("1", "true", "yes")
+
+
+def _number_arg(name, cast, minimum=None, maximum=None):
+    """Sayisal parametre; ``minimum``/``maximum`` disindaki degerler 400 doner.
+
+    Yil ve yas gibi tarihe cevrilen degerler sinirlanmalidir, aksi halde
+    filtre kodu (``date``) ``ValueError`` firlatir.
+    """
+    raw = request.args.get(name)
+    if raw is None or raw == "":
+        return None
+    try:
+        value = cast(raw)
+    except ValueError:
+        raise ApiError(f"'{name}' must be a number")
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        raise ApiError(f"'{name}' must be between {minimum} and {maximum}")
+    return value
+
+
+def _fields(resource):
+    """``fields=a,b`` parametresini dogrular; ``*`` tum alanlari secer."""
+    spec = database.API_RESOURCES[resource]
+    raw = request.args.get("fields")
+    if not raw:
+        return list(spec.default_fields)
+    if raw.strip() == "*":
+        return list(spec.fields)
+    fields = list(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in spec.fields]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(spec.fields)}")
+    return fields
+
+
+def _list(resource, filters):
+    spec = database.API_RESOURCES[resource]
+    sort_key = request.args.get("sort") or spec.default_sort
+    if sort_key not in spec.sorts:
+        raise ApiError(f"Unknown sort '{sort_key}'. Available: {', '.join(spec.sorts)}")
+    limit = _number_arg("limit", int) or settings.API_DEFAULT_LIMIT
+    limit = max(1, min(limit, settings.API_MAX_LIMIT))
+
+    rows, next_cursor = database.api_list(
+        resource,
+        filters,
+        _fields(resource),
+        sort_key,
+        cursor=request.args.get("cursor"),
+        limit=limit,
+    )
+    payload = {"data": rows, "count": len(rows), "next_cursor": next_cursor, "next": None}
+    if next_cursor:
+        args = request.args.to_dict(flat=False)
+        args["cursor"] = next_cursor
+        payload["next"] = url_for(request.endpoint, **args)
+    return _json(payload)
+
+
+@bp.route("/players")
+def players():
+    positions = request.args.getlist("position")
+    return _list(
+        "players",
+        dict(
+            min_age=_number_arg("min_age", int, 0, MAX_AGE),
+            max_age=_number_arg("max_age", int, 0, MAX_AGE),
+            feet=request.args.getlist("foot") or None,
+            positions=positions if positions and "All" not in positions else None,
+            search_query=(request.args.get("search") or "").strip() or None,
+        ),
+    )
+
+
+@bp.route("/players/<int:player_id>")
+def player_detail(player_id: int):
+    player = database.get_player_by_id(player_id)
+    if not player:
+        return _json({"error": "Player not found"}, status=404)
+    return _json({"data": player})
+
+
+@bp.route("/players/<int:player_id>/profile")
+def player_profile(player_id: int):
+    player = database.get_player_profile(player_id)
+    if not player:
+        return _json({"error": "Player not found"}, status=404)
+    return _json({"data": player})
+
+
+@bp.route("/transfers")
+def transfers():
+    return _list(
+        "transfers",
+        dict(
+            season=request.args.get("season") or None,
+            min_fee=_number_arg("min_fee", float),
+            max_fee=_number_arg("max_fee", float),
+            from_league=request.args.get("from_league") or None,
+            to_league=request.args.get("to_league") or None,
+        ),
+    )
+
+
+@bp.route("/games")
+def games():
+    return _list(
+        "games",
+        dict(
+            year=_number_arg("year", int, MIN_YEAR, MAX_YEAR),
+            favorites_only=bool(_bool_arg("favorites")),
+        ),
+    )
+
+
+@bp.route("/clubs")
+def clubs():
+    return _list(
+        "clubs",
+        dict(
+            search=(request.args.get("search") or "").strip() or None,
+            league=request.args.get("league") or None,
+            min_age=_number_arg("min_age", float),
+            max_age=_number_arg("max_age", float),
+            min_capacity=_number_arg("min_capacity", int),
+            max_capacity=_number_arg("max_capacity", int),
+        ),
+    )
+
+
+@bp.route("/clubs/<int:club_id>/players")
+def club_players(club_id: int):
+    players = database.get_players_by_club(club_id)
+    return _json({"data": players, "count": len(players)})
+
+
+@bp.route("/clubs/<int:club_a>/vs/<int:club_b>")
+def head_to_head(club_a: int, club_b: int):
+    if club_a == club_b:
+        raise ApiError("Clubs must be different")
+    h2h = database.get_head_to_head(club_a, club_b)
+    if not h2h:
+        return _json({"error": "Club not found"}, status=404)
+    return _json({"data": h2h})
+
+
+@bp.route("/competitions")
+def competitions():
+    return _list(
+        "competitions",
+        dict(
+            country_name=request.args.get("country") or None,
+            is_major_league=_bool_arg("is_major_league"),
+        ),
+    )
+
+
+@bp.route("/competitions/<competition_id>/table")
+def competition_table(competition_id: str):
+    if not database.get_competition(competition_id):
+        return _json({"error": "Competition not found"}, status=404)
+    seasons = database.get_competition_seasons(competition_id)
+    season = request.args.get("season") or (seasons[0] if seasons else None)
+    if season and season not in seasons:
+        raise ApiError(f"Unknown season '{season}'. Available: {', '.join(seasons)}")
+    table = database.get_standings(competition_id, season) if season else []
+    return _json({"competition_id": competition_id, "season": season, "seasons": seasons, "data": table})
+
+
+@bp.route("/analytics/transfers")
+def transfer_analytics():
+    return _json({"data": database.get_transfer_analytics(request.args.get("season") or None)})
@@ -0,0 +1,251 @@
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from utils import settings
+
+
+class TTLCache:
+    """Kayit basina TTL'li, boyutu sinirli, thread-safe memoization cache'i.
+
+    - Kapasite (kayit sayisi ya da verilirse ``max_bytes``) dolunca en uzun
+      suredir kullanilmayan kayit atilir (LRU).
+    - Ayni anahtar icin ayni anda tek bir hesaplama yapilir; digerleri sonucu bekler.
+    - Kayitlar bagli olduklari tablolarla etiketlenir, ``invalidate`` ile silinir.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, max_entries: int, default_ttl: float, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._bytes = 0
+        self._data = OrderedDict()  # key -> (value, expires_at, tags, bytes)
+        self._lock = threading.Lock()
+        self._key_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def _lookup(self, key):
+        """(bulundu_mu, deger) doner (lock altinda cagrilir)."""
+        entry = self._data.get(key)
+        if entry is None:
+            return False, None
+        if entry[1] < time.monotonic():
+            self._remove(key)
+            return False, None
+        self._data.move_to_end(key)
+        return True, entry[0]
+
+    def _remove(self, key):
+        self._bytes -= self._data.pop(key)[3]
+
+    def _store(self, key, value, expires_at, tags):
+        """Kaydi yazar ve kapasite asildikca en eskiyi atar (lock altinda)."""
+        size = deep_sizeof(value) if self.max_bytes else 0
+        if key in self._data:
+            self._remove(key)
+        # Tek basina butcenin cogunu kaplayacak sonuc cache'i bosaltmasin
+        if self.max_bytes and size > self.max_bytes // 4:
+            return
+        self._data[key] = (value, expires_at, tags, size)
+        self._bytes += size
+        while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+            self._remove(next(iter(self._data)))
+            self._stats["evictions"] += 1
+
+    def get_or_set(self, key, loader, ttl=None, tags=()):
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self._stats["hits"] += 1
+                return value
+
+        with self._key_locks[hash(key) % self.LOCK_STRIPES]:
+            # Beklerken baska bir thread hesaplamis olabilir
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    self._stats["hits"] += 1
+                    return value
+                self._stats["misses"] += 1
+                generation = self._generation
+
+            value = loader()
+            # Bos sonuclar (genelde DB hatasi) cache'lenmez
+            if value is None or value == [] or value == {}:
+                return value
+
+            with self._lock:
+                # Hesaplama sirasinda invalidate edildiyse eski sonucu yazma
+                if generation == self._generation:
+                    self._store(key, value, time.monotonic() + (ttl or self.default_ttl), frozenset(tags))
+            return value
+
+    def get_many(self, keys):
+        """Cache'te bulunan anahtarlari ``{anahtar: deger}`` olarak doner."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                hit, value = self._lookup(key)
+                if hit:
+                    found[key] = value
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(keys) - len(found)
+            return found, self._generation
+
+    def set_many(self, items, ttl=None, tags=(), generation=None):
+        """Toplu yukleme sonuclarini yazar (bos degerler dahil).
+
+        ``generation`` ``get_many``'den gelir; arada invalidate olduysa yazilmaz.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            expires_at = time.monotonic() + (ttl or self.default_ttl)
+            tags = frozenset(tags)
+            for key, value in items.items():
+                self._store(key, value, expires_at, tags)
+
+    def invalidate(self, tables=None):
+        """Verilen tablolara bagli kayitlari (``None`` ise hepsini) siler."""
+        with self._lock:
+            self._generation += 1
+            if tables is None:
+                removed = len(self._data)
+                self._data.clear()
+                self._bytes = 0
+            else:
+                tables = set(tables)
+                stale = [k for k, entry in self._data.items() if entry[2] & tables]
+                for k in stale:
+                    self._remove(k)
+                removed = len(stale)
+            self._stats["invalidations"] += removed
+            return removed
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            lookups = data["hits"] + data["misses"]
+            data["hit_ratio"] = round(data["hits"] / lookups, 4) if lookups else 0.0
+            data["size"] = len(self._data)
+            data["max_entries"] = self.max_entries
+            if self.max_bytes:
+                data["bytes"] = self._bytes
+                data["max_bytes"] = self.max_bytes
+            return data
+
+
+def deep_sizeof(value, _depth=0):
+    """Sonucun yaklasik bellek boyutu (bayt): satir listeleri, dict'ler ve degerleri."""
+    size = sys.getsizeof(value)
+    if _depth > 4:
+        return size
+    if isinstance(value, dict):
+        # Anahtarlar satirlar arasinda paylasilan kolon isimleridir; sayilmaz
+        size += sum(deep_sizeof(v, _depth + 1) for v in value.values())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_sizeof(v, _depth + 1) for v in value)
+    return size
+
+
+_cache = TTLCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_DEFAULT_TTL)
+# Kulup kadrolari, oyuncu profilleri, ikili maclar: cok sayida anahtar; referans
+# verisini LRU'dan atmasinlar diye ayri tutulur
+_entities = TTLCache(settings.ENTITY_CACHE_MAX_ENTRIES, settings.CACHE_DEFAULT_TTL)
+# Liste sorgularinin (sayfa + toplam) sonuclari; bayt butcesiyle sinirli
+_results = TTLCache(
+    settings.RESULT_CACHE_MAX_ENTRIES, settings.RESULT_CACHE_TTL, max_bytes=settings.RESULT_CACHE_MAX_BYTES
+)
+
+
+def memoize(ttl=None, tables=(), entity=False):
+    """Referans veri fonksiyonlarini arguman bazinda cache'ler.
+
+    ``tables``: sonucun bagli oldugu tablolar; bu tablolar degisince kayit silinir.
+    ``entity``: id basina sonuc (profil, ikili mac); ayri ``_entities`` cache'ine yazilir.
+    Donen degerler paylasilir, cagiranlar tarafindan degistirilmemelidir.
+    """
+    store = _entities if entity else _cache
+
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            return store.get_or_set(key, lambda: fn(*args, **kwargs), ttl=ttl, tags=tables)
+
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorator
+
+
+def cached_results(key, tables=(), finalize=None):
+    """Sayfali liste fonksiyonlarinin sonucunu normalize filtre anahtariyla cache'ler.
+
+    ``key``: fonksiyonla ayni argumanlari alip kanonik filtre tuple'i doner
+    (sirali listeler, parse edilmis tutarlar, sayfa). Satirsiz sonuclar
+    (genelde DB hatasi) cache'lenmez. Satirlar paylasilir, degistirilmemelidir.
+    ``finalize``: cache'ten sonra her cagrida uygulanir (ör. gune bagli yas);
+    satirlarin kopyasini donmelidir.
+    """
+
+    def decorator(fn):
+        def lookup(*args, **kwargs):
+            if not settings.RESULT_CACHE_ENABLED:
+                return fn(*args, **kwargs)
+            cache_key = (fn.__name__,) + tuple(key(*args, **kwargs))
+
+            computed = []
+
+            def load():
+                computed.append(fn(*args, **kwargs))
+                return computed[0] if computed[0][0] else None
+
+            result = _results.get_or_set(cache_key, load, tags=tables)
+            return computed[0] if result is None else result
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            result = lookup(*args, **kwargs)
+            return finalize(result) if finalize else result
+
+        wrapper.uncached = fn
+        return wrapper
+
+    return decorator
+
+
+def get_many(keys):
+    """Id basina toplu okuma (``_entities`` cache'i)."""
+    return _entities.get_many(keys)
+
+
+def set_many(items, ttl=None, tags=(), generation=None):
+    return _entities.set_many(items, ttl=ttl, tags=tags, generation=generation)
+
+
+def invalidate(tables=None):
+    """Ingest ve yazma islemlerinden sonra cagrilir; ``tables`` None ise tum cache bosaltilir.
+
+    Referans veri, id basina sonuc ve liste sonuc cache'leri birlikte temizlenir.
+    """
+    return _cache.invalidate(tables) + _entities.invalidate(tables) + _results.invalidate(tables)
+
+
+def stats():
+    return _cache.stats()
+
+
+def entity_stats():
+    return _entities.stats()
+
+
+def result_stats():
+    return _results.stats()
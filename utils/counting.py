@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+
+from utils import settings
+
+
+class CountCache:
+    """Normalize edilmis filtre anahtarina gore toplam sayilari TTL ile tutar.
+
+    Her kayit sayimin bagli oldugu tablolarla etiketlenir; ``invalidate``
+    yalnizca degisen tablolara bagli sayimlari siler.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = {}  # key -> (count, estimated, expires_at, tables)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[2] < time.monotonic():
+                del self._data[key]
+                return None
+            return entry[0], entry[1]
+
+    def set(self, key, count: int, estimated: bool, tables=()):
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.max_entries:
+                # En erken dolacak kaydi at
+                oldest = min(self._data, key=lambda k: self._data[k][2])
+                del self._data[oldest]
+            self._data[key] = (count, estimated, time.monotonic() + self.ttl, frozenset(tables))
+
+    def invalidate(self, tables=None):
+        """Verilen tablolara bagli sayimlari (``None`` ise hepsini) siler."""
+        with self._lock:
+            if tables is None:
+                self._data.clear()
+                return
+            tables = set(tables)
+            for key in [k for k, entry in self._data.items() if entry[3] & tables]:
+                del self._data[key]
+
+    def clear(self):
+        self.invalidate()
+
+
+_cache = CountCache(settings.COUNT_CACHE_TTL, settings.COUNT_CACHE_MAX_ENTRIES)
+
+
+def clear():
+    """Sayim cache'ini tamamen bosaltir."""
+    _cache.clear()
+
+
+def invalidate(tables=None):
+    """Veri degistikten sonra cagrilir; ``tables`` None ise tum sayimlar silinir."""
+    _cache.invalidate(tables)
+
+
+def planner_estimate(cur, from_sql: str, params) -> int:
+    """Sorgu planlayicisinin satir tahminini doner (sorgu calistirilmaz)."""
+    cur.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 {from_sql}", params)
+    plan = cur.fetchone()
+    plan = plan[0] if isinstance(plan, (list, tuple)) else next(iter(plan.values()))
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def peek(cache_key, known_total=None):
+    """Sorgu gerektirmeden bilinen (toplam, tahmini_mi) degerini doner; yoksa None.
+
+    ``known_total`` yalnizca bir ipucudur (``database.parse_total_hint`` ile
+    dogrulanmis); ayni filtre icin sunucuda sayim varsa o kullanilir.
+    """
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+    if known_total is not None and known_total >= 0:
+        return known_total, False
+    return None
+
+
+def count_rows(cur, from_sql: str, params, cache_key, filtered: bool, known_total=None, tables=()):
+    """Sayfalanan bir liste icin (toplam, tahmini_mi) doner.
+
+    Sira ile:
+    1. Ayni filtre seti icin TTL suresi dolmamis bir sayim varsa o kullanilir.
+    2. Istemci gecerli surumlu toplami tasiyorsa (ilk sayfadan) sayim yapilmaz.
+    3. Filtresiz ve planlayiciya gore cok buyuk sonuclarda tahmin kullanilir.
+    4. Aksi halde ``COUNT(*)`` calistirilir ve sonuc cache'lenir.
+
+    ``tables``: sayimin bagli oldugu tablolar (bkz. ``invalidate``).
+    """
+    cached = peek(cache_key, known_total)
+    if cached is not None:
+        return cached
+
+    if not filtered:
+        estimate = planner_estimate(cur, from_sql, params)
+        if estimate >= settings.COUNT_ESTIMATE_THRESHOLD:
+            _cache.set(cache_key, estimate, True, tables)
+            return estimate, True
+
+    cur.execute(f"SELECT COUNT(*) AS total {from_sql}", params)
+    row = cur.fetchone()
+    total = row["total"] if isinstance(row, dict) else row[0]
+    _cache.set(cache_key, total, False, tables)
+    return total, False
@@ -1,28 +1,428 @@
+import base64
+import json
 import psycopg2
 import os
-from typing import Optional
+import threading
+import time
+from datetime import date
+from typing import NamedTuple, Optional
+from flask import g, has_request_context
 from psycopg2.extras import RealDictCursor
 
 from dotenv import load_dotenv
 
+from utils import cache, counting, metrics, parallel, settings
+from utils.pool import ConnectionPool
+
 load_dotenv(override=True)
 
+_pool = None
+_pool_lock = threading.Lock()
+
 
 def _game_sort_clause(sort_by: str) -> str:
     """Returns an ORDER BY clause for game queries."""
     if sort_by == "goal_diff_desc":
-        return "ORDER BY goal_difference DESC NULLS LAST, g.date ASC, g.game_id ASC"
+        return "ORDER BY g.goal_difference DESC NULLS LAST, g.date ASC, g.game_id ASC"
     if sort_by == "goal_diff_asc":
-        return "ORDER BY goal_difference ASC NULLS LAST, g.date ASC, g.game_id ASC"
+        return "ORDER BY g.goal_difference ASC NULLS LAST, g.date ASC, g.game_id ASC"
     return "ORDER BY g.date ASC, g.game_id ASC"
 
+def get_pool() -> ConnectionPool:
+    """Uygulama genelindeki baglanti havuzunu (ilk kullanimda) olusturur."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                DB_URL = os.getenv("DATABASE_URL")
+                if not DB_URL:
+                    raise ValueError("DATABASE_URL environment variable is not set")
+                _pool = ConnectionPool(
+                    DB_URL,
+                    min_size=settings.DB_POOL_MIN_SIZE,
+                    max_size=settings.DB_POOL_MAX_SIZE,
+                    max_idle=settings.DB_POOL_MAX_IDLE,
+                    max_lifetime=settings.DB_POOL_MAX_LIFETIME,
+                    checkout_timeout=settings.DB_POOL_CHECKOUT_TIMEOUT,
+                    ping_after=settings.DB_POOL_PING_AFTER,
+                    connection_factory=metrics.InstrumentedConnection if settings.METRICS_ENABLED else None,
+                )
+    return _pool
+
+def _checkout():
+    started = time.perf_counter()
+    conn = get_pool().getconn()
+    metrics.observe_pool_wait(time.perf_counter() - started)
+    return conn
+
 def get_conn():
-    """PostgreSQL bağlantısını oluşturur."""
-    DB_URL = os.getenv("DATABASE_URL")
-    # print(DB_URL)
-    if not DB_URL:
-        raise ValueError("DATABASE_URL environment variable is not set")
-    return psycopg2.connect(DB_URL)
+    """Havuzdan PostgreSQL bağlantısı alır.
+
+    Flask isteği içinde çağrıldığında istek boyunca tek bir bağlantı paylaşılır;
+    bağlantı ``close_request_conn`` ile teardown sırasında havuza döner.
+    """
+    if has_request_context():
+        conn = g.get("_db_conn")
+        if conn is not None and conn.closed:
+            # Kopan baglanti havuzdaki yerini birakmali, yoksa slot kalici olarak kaybolur
+            g._db_conn = None
+            get_pool().putconn(conn, close=True)
+            conn = None
+        if conn is None:
+            conn = g._db_conn = _checkout()
+    else:
+        conn = _checkout()
+    # run_parallel gorevinde istek deadline'i sunucu tarafinda da uygulanir;
+    # SET LOCAL, transaction bitince (havuza donuste rollback) sifirlanir.
+    timeout_ms = parallel.remaining_ms()
+    if timeout_ms is not None and conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL statement_timeout = %s", (timeout_ms,))
+    return conn
+
+def release_conn(conn):
+    """Yardımcı fonksiyonun işi bitince bağlantıyı bırakır.
+
+    İstek bağlantısı teardown'a kadar açık kalır (yalnızca hatalı transaction
+    geri alınır); istek dışındaki bağlantılar doğrudan havuza döner.
+    """
+    if conn is None:
+        return
+    if has_request_context() and g.get("_db_conn") is conn:
+        if (
+            not conn.closed
+            and conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR
+        ):
+            conn.rollback()
+        return
+    get_pool().putconn(conn)
+
+def close_request_conn(exc=None):
+    """Flask teardown: istek bağlantısını havuza geri verir."""
+    conn = g.pop("_db_conn", None)
+    if conn is not None:
+        get_pool().putconn(conn, close=conn.closed)
+
+# Veri sürümü: ETag/Last-Modified için tablo bazlı sayaç
+DATA_TABLES = ("countries", "positions", "competitions", "sub_positions", "clubs", "players", "games", "transfers")
+
+
+def bump_dataset_version(cur, tables):
+    """Verilen tabloların veri sürümünü artırır (çağıranın transaction'ı içinde)."""
+    cur.execute(
+        """
+        INSERT INTO dataset_version (table_name, version, updated_at)
+        SELECT t, 1, now() FROM unnest(%s::text[]) AS t
+        ON CONFLICT (table_name) DO UPDATE
+        SET version = dataset_version.version + 1, updated_at = now()
+        """,
+        (list(tables),),
+    )
+
+
+@cache.memoize(ttl=settings.HTTP_VERSION_TTL, tables=DATA_TABLES)
+def _read_dataset_versions():
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute("SELECT table_name, version, updated_at FROM dataset_version")
+        versions = {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+        cur.close()
+        return versions
+    except Exception as e:
+        print(f"Database error (get_dataset_versions): {e}")
+        if conn:
+            conn.rollback()
+        return {}
+    finally:
+        release_conn(conn)
+
+
+_seen_versions = None
+_seen_versions_lock = threading.Lock()
+
+
+def _sync_caches(versions):
+    """Sürümü değişen tablolara bağlı bellek içi cache'leri siler.
+
+    Ingest başka bir süreçte (CLI) ya da favori başka bir worker'da yazılınca
+    bu süreçteki cache'ler ancak burada, sürüm değişikliği görülünce temizlenir.
+    """
+    global _seen_versions
+    with _seen_versions_lock:
+        previous, _seen_versions = _seen_versions, versions
+    if previous is None or previous == versions:
+        return
+    changed = [
+        table
+        for table in set(previous) | set(versions)
+        if previous.get(table, (0, None))[0] != versions.get(table, (0, None))[0]
+    ]
+    if changed:
+        cache.invalidate(changed)
+        counting.invalidate(changed)
+
+
+def get_dataset_versions():
+    """``{tablo: (sürüm, updated_at)}`` döner; kısa TTL ile bellekte tutulur.
+
+    Sürüm değişmişse (başka süreçte ingest) ilgili cache'ler önce temizlenir;
+    böylece yeni ETag ile eski içerik gönderilmez.
+    """
+    versions = _read_dataset_versions()
+    if versions:
+        _sync_caches(versions)
+    return versions
+
+
+def sync_dataset_versions():
+    """before_request: HTTP cache kapalıyken de sürüm kontrolü her istekte yapılır."""
+    get_dataset_versions()
+
+
+def pool_available() -> int:
+    """Havuzdan beklemeden alınabilecek bağlantı sayısı (paralel worker kapasitesi)."""
+    if _pool is None:
+        return settings.DB_POOL_MAX_SIZE
+    return _pool.available()
+
+
+def pool_stats():
+    """Havuz metriklerini (boyut, bekleme, tükenme sayaçları) döner."""
+    if _pool is None:
+        return {}
+    return _pool.stats()
+
+# ---------------------------------------------------------------------------
+# Keyset (seek) sayfalama
+# ---------------------------------------------------------------------------
+# sort anahtari -> (SQL kolonu, satirdaki alan, yon, NULL olabilir mi)
+PLAYER_SORTS = {
+    # Arama varken benzerlik skoruna gore; kolon sorguda _search_rank ile doldurulur
+    "relevance": ("search_rank", "search_rank", "DESC", False),
+    "name_asc": ("p.name", "name", "ASC", False),
+    "name_desc": ("p.name", "name", "DESC", False),
+    "age_asc": ("p.date_of_birth", "date_of_birth", "DESC", True),
+    "age_desc": ("p.date_of_birth", "date_of_birth", "ASC", True),
+    "height_asc": ("p.height_in_cm", "height_in_cm", "ASC", True),
+    "height_desc": ("p.height_in_cm", "height_in_cm", "DESC", True),
+}
+
+TRANSFER_SORTS = {
+    "fee_asc": ("t.transfer_fee", "transfer_fee", "ASC", True),
+    "fee_desc": ("t.transfer_fee", "transfer_fee", "DESC", True),
+    "value_asc": ("t.market_value_in_eur", "market_value_in_eur", "ASC", True),
+    "value_desc": ("t.market_value_in_eur", "market_value_in_eur", "DESC", True),
+    "date_asc": ("t.transfer_date", "transfer_date", "ASC", True),
+    "date_desc": ("t.transfer_date", "transfer_date", "DESC", True),
+}
+
+
+def encode_cursor(sort_key: str, value, last_id, direction: str, page: int) -> str:
+    """Sayfa imlecini URL'de tasinabilecek opak bir token'a cevirir."""
+    payload = {"s": sort_key, "v": value, "k": last_id, "d": direction, "p": page}
+    raw = json.dumps(payload, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: Optional[str], sort_key: str, key_type: type = int):
+    """Token'i cozer; bozuk ya da baska bir siralamaya aitse None doner.
+
+    ``key_type``: tiebreaker id kolonunun tipi (metin id'li tablolar icin ``str``).
+    """
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if (
+        not isinstance(payload, dict)
+        or payload.get("s") != sort_key
+        or payload.get("d") not in ("next", "prev")
+        or not isinstance(payload.get("k"), key_type)
+        or not isinstance(payload.get("p"), int)
+        or payload["p"] < 1
+    ):
+        return None
+    return payload
+
+
+def _order_by(column: str, tiebreaker: str, direction: str, nullable: bool) -> str:
+    nulls = " NULLS LAST" if nullable else ""
+    return f"ORDER BY {column} {direction}{nulls}, {tiebreaker} {direction}"
+
+
+def _keyset_segments(column, tiebreaker, direction, nullable, keyset):
+    """Imlecten sonraki (ya da onceki) satirlari veren WHERE/ORDER parcalarini doner.
+
+    NULL degerler her iki yonde de en sonda yer alir. ``(kolon, id)`` satir
+    karsilastirmasi NULL'lari dislayip indeks uzerinden seek yapabildigi icin
+    NULL kuyrugu ayri bir parca olarak sorgulanir; parcalar sirayla, sayfa
+    dolana kadar calistirilir.
+    """
+    backward = keyset["d"] == "prev"
+    ascending = (direction == "ASC") != backward
+    op = ">" if ascending else "<"
+    order_dir = "ASC" if ascending else "DESC"
+    value, last_id = keyset["v"], keyset["k"]
+
+    by_value = (
+        f"({column}, {tiebreaker}) {op} (%s, %s)",
+        [value, last_id],
+        f"ORDER BY {column} {order_dir}, {tiebreaker} {order_dir}",
+    )
+    if not nullable:
+        return [by_value]
+
+    nulls_after_id = (
+        f"{column} IS NULL AND {tiebreaker} {op} %s",
+        [last_id],
+        f"ORDER BY {tiebreaker} {order_dir}",
+    )
+    all_nulls = (f"{column} IS NULL", [], f"ORDER BY {tiebreaker} {order_dir}")
+    all_values = (
+        f"{column} IS NOT NULL",
+        [],
+        f"ORDER BY {column} {order_dir}, {tiebreaker} {order_dir}",
+    )
+    if not backward:
+        return [by_value, all_nulls] if value is not None else [nulls_after_id]
+    return [nulls_after_id, all_values] if value is None else [by_value]
+
+
+def _fetch_keyset_page(cur, select_sql, where_sql, params, segments, limit, backward):
+    """Keyset parcalarini sirayla calistirip en fazla ``limit`` satir doner."""
+    rows = []
+    for condition, condition_params, order_clause in segments:
+        cur.execute(
+            f"{select_sql} {where_sql} AND {condition} {order_clause} LIMIT %s",
+            list(params) + condition_params + [limit - len(rows)],
+        )
+        rows.extend(cur.fetchall())
+        if len(rows) >= limit:
+            break
+    if backward:
+        rows.reverse()
+    return rows
+
+
+def _page_tokens(rows, sort_key, sort_spec, id_field, page, total_pages):
+    """Bir sayfanin ilk/son satirindan onceki/sonraki sayfa token'larini uretir."""
+    if not rows:
+        return None, None
+    field = sort_spec[1]
+    prev_token = next_token = None
+    if page > 1:
+        first = rows[0]
+        prev_token = encode_cursor(sort_key, first.get(field), first.get(id_field), "prev", page - 1)
+    if page < total_pages:
+        last = rows[-1]
+        next_token = encode_cursor(sort_key, last.get(field), last.get(id_field), "next", page + 1)
+    return prev_token, next_token
+
+
+def _version_stamp(tables) -> int:
+    # Sürümler yalnızca artar; toplamları herhangi bir tablo değişince değişir
+    versions = get_dataset_versions()
+    return sum(versions.get(table, (0, None))[0] for table in tables)
+
+
+def total_hint(total, estimated, tables) -> Optional[str]:
+    """Sayfalama linklerindeki ``total`` parametresi: ``<toplam>.<veri sürümü>``.
+
+    Tahmini toplamlar taşınmaz (None).
+    """
+    if estimated or total is None:
+        return None
+    return f"{total}.{_version_stamp(tables)}"
+
+
+def parse_total_hint(raw: Optional[str], tables) -> Optional[int]:
+    """``total_hint`` değerini çözer; bozuksa ya da veri o linkten sonra değiştiyse None."""
+    try:
+        total, stamp = (int(part) for part in raw.split("."))
+    except (AttributeError, ValueError):
+        return None
+    if total < 0 or stamp != _version_stamp(tables):
+        return None
+    return total
+
+
+def _count_rows_own_conn(from_sql, params, cache_key, filtered, tables):
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        result = counting.count_rows(cur, from_sql, params, cache_key=cache_key, filtered=filtered, tables=tables)
+        cur.close()
+        return result
+    finally:
+        release_conn(conn)
+
+
+def _count_and_fetch(fetch, from_sql, params, cache_key, filtered, known_total=None, tables=()):
+    """Sayfa verisini (``fetch``) ve toplam sayıyı paralel çalıştırır.
+
+    ``fetch`` çağıranın bağlantısıyla bu thread'de çalışır, ``COUNT`` ayrı bir
+    havuz bağlantısında. Toplam zaten biliniyorsa yalnızca ``fetch`` çalışır.
+    ``(satırlar, (toplam, tahmini_mi))`` döner. ``parallel.DeadlineExceeded``
+    çağıranlarda boş sayfaya çevrilmez; 503 olarak Flask'e ulaşır. Sayım
+    ``tables`` ile etiketlenir; yalnızca bu tablolar değişince silinir.
+    """
+    known = counting.peek(cache_key, known_total)
+    if known is not None:
+        return fetch(), known
+    results = parallel.run_parallel(
+        {
+            "rows": fetch,
+            "count": lambda: _count_rows_own_conn(from_sql, params, cache_key, filtered, tables),
+        }
+    )
+    return results["rows"], results["count"]
+
+
+def player_page_tokens(players, sort_option, page, total_pages):
+    """Oyuncu listesi icin (onceki, sonraki) sayfa token'larini doner."""
+    sort_key = sort_option if sort_option in PLAYER_SORTS else "name_asc"
+    return _page_tokens(players, sort_key, PLAYER_SORTS[sort_key], "player_id", page, total_pages)
+
+
+def transfer_page_tokens(transfers, sort_by, sort_dir, page, total_pages):
+    """Transfer listesi icin (onceki, sonraki) sayfa token'larini doner."""
+    sort_key = _transfer_sort_key(sort_by, sort_dir)
+    return _page_tokens(transfers, sort_key, TRANSFER_SORTS[sort_key], "transfer_id", page, total_pages)
+
+
+def _transfer_sort_key(sort_by, sort_dir) -> str:
+    direction = "desc" if str(sort_dir).lower() == "desc" else "asc"
+    sort_key = f"{sort_by}_{direction}"
+    return sort_key if sort_key in TRANSFER_SORTS else f"date_{direction}"
+
+
+def _name_search(column: str, query: str):
+    """İsim araması için (WHERE parçası, parametreler) döner.
+
+    Aksan/büyük-küçük harf duyarsız alt dize eşleşmesi (LIKE '%q%') ile yazım
+    hatalarını tolere eden kelime benzerliği (pg_trgm ``<%``) birleştirilir;
+    ikisi de ``f_search_key(name)`` üzerindeki GIN trigram indeksini kullanır.
+    """
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return (
+        f"(f_search_key({column}) LIKE f_search_key(%s) OR f_search_key(%s) <%% f_search_key({column}))",
+        [f"%{escaped}%", query],
+    )
+
+def _search_rank(cur, column: str, query: str) -> str:
+    """Arama terimine benzerlik skorunu veren SQL ifadesini döner.
+
+    Skor keyset imlecinde birebir geri dönebilsin diye numeric'e yuvarlanır;
+    terim ``mogrify`` ile güvenli biçimde literal olarak gömülür.
+    """
+    literal = cur.mogrify("%s", (query,)).decode().replace("%", "%%")
+    return f"ROUND(word_similarity(f_search_key({literal}), f_search_key({column}))::numeric, 4)"
 
 def get_all_clubs():
     """Tüm kulüpleri veritabanından çeker."""
@@ -58,11 +458,20 @@ def get_all_clubs():
         print(f"Database error: {e}")
         return []
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
 
-def get_club_filter_metadata():
-    """Kulüp filtreleri için lig listesi ve min/max özetleri döner."""
+CLUB_FILTER_DEFAULTS = {
+    "leagues": [],
+    "min_age": None,
+    "max_age": None,
+    "min_capacity": None,
+    "max_capacity": None,
+}
+
+
+@cache.memoize(ttl=settings.CACHE_REFERENCE_TTL, tables=("clubs", "competitions"))
+def _load_club_filter_metadata():
+    """Hata durumunda None döner; None cache'lenmez."""
     conn = None
     try:
         conn = get_conn()
@@ -101,16 +510,170 @@ def get_club_filter_metadata():
         }
     except Exception as e:
         print(f"Database error (get_club_filter_metadata): {e}")
-        return {
-            "leagues": [],
-            "min_age": None,
-            "max_age": None,
-            "min_capacity": None,
-            "max_capacity": None,
-        }
+        return None
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
+
+
+def get_club_filter_metadata():
+    """Kulüp filtreleri için lig listesi ve min/max özetleri döner."""
+    return _load_club_filter_metadata() or dict(CLUB_FILTER_DEFAULTS)
+
+def _clubs_filter(search=None, league=None, min_age=None, max_age=None, min_capacity=None, max_capacity=None):
+    """Kulüp filtreleri için (WHERE, params) üretir (``clubs c`` + ``competitions comp`` üzerine)."""
+    query = " WHERE 1=1"
+    params = []
+
+    if search:
+        search_sql, search_params = _name_search("c.name", search)
+        query += " AND " + search_sql
+        params.extend(search_params)
+
+    if league:
+        query += " AND LOWER(comp.name) = %s"
+        params.append(league.lower())
+
+    if min_age is not None:
+        query += " AND c.average_age >= %s"
+        params.append(min_age)
+
+    if max_age is not None:
+        query += " AND c.average_age <= %s"
+        params.append(max_age)
+
+    if min_capacity is not None:
+        query += " AND c.stadium_seats >= %s"
+        params.append(min_capacity)
+
+    if max_capacity is not None:
+        query += " AND c.stadium_seats <= %s"
+        params.append(max_capacity)
+
+    return query, params
+
+
+HEAD_TO_HEAD_SQL = """
+    WITH meetings AS (
+        SELECT
+            g.game_id,
+            g.date,
+            g.season,
+            g.competition_id,
+            comp.name AS competition_name,
+            g.home_club_id,
+            g.away_club_id,
+            g.home_club_goals,
+            g.away_club_goals,
+            CASE WHEN g.home_club_id = %(low)s THEN g.home_club_goals ELSE g.away_club_goals END AS low_goals,
+            CASE WHEN g.home_club_id = %(low)s THEN g.away_club_goals ELSE g.home_club_goals END AS high_goals
+        FROM games g
+        LEFT JOIN competitions comp ON comp.competition_id = g.competition_id
+        WHERE LEAST(g.home_club_id, g.away_club_id) = %(low)s
+          AND GREATEST(g.home_club_id, g.away_club_id) = %(high)s
+    ),
+    scored AS (
+        SELECT
+            m.*,
+            CASE
+                WHEN low_goals IS NULL OR high_goals IS NULL THEN NULL
+                WHEN low_goals > high_goals THEN 'low'
+                WHEN low_goals < high_goals THEN 'high'
+                ELSE 'draw'
+            END AS winner
+        FROM meetings m
+    )
+    SELECT
+        (SELECT json_agg(json_build_object('club_id', club_id, 'name', name, 'league_id', domestic_competition_id))
+         FROM clubs WHERE club_id IN (%(low)s, %(high)s)) AS clubs,
+        (SELECT json_build_object(
+            'played', COUNT(*),
+            'low_wins', COUNT(*) FILTER (WHERE winner = 'low'),
+            'high_wins', COUNT(*) FILTER (WHERE winner = 'high'),
+            'draws', COUNT(*) FILTER (WHERE winner = 'draw'),
+            'low_goals', COALESCE(SUM(low_goals), 0),
+            'high_goals', COALESCE(SUM(high_goals), 0)
+         ) FROM scored) AS totals,
+        (SELECT json_agg(c ORDER BY c.played DESC, c.competition_id)
+         FROM (
+            SELECT
+                competition_id,
+                MIN(competition_name) AS competition_name,
+                COUNT(*) AS played,
+                COUNT(*) FILTER (WHERE winner = 'low') AS low_wins,
+                COUNT(*) FILTER (WHERE winner = 'high') AS high_wins,
+                COUNT(*) FILTER (WHERE winner = 'draw') AS draws,
+                COALESCE(SUM(low_goals), 0) AS low_goals,
+                COALESCE(SUM(high_goals), 0) AS high_goals
+            FROM scored
+            GROUP BY competition_id
+         ) c) AS competitions,
+        (SELECT json_agg(json_build_object(
+            'game_id', game_id,
+            'date', date,
+            'season', season,
+            'competition_id', competition_id,
+            'competition_name', competition_name,
+            'home_club_id', home_club_id,
+            'away_club_id', away_club_id,
+            'home_club_goals', home_club_goals,
+            'away_club_goals', away_club_goals
+         ) ORDER BY date DESC, game_id DESC) FROM scored) AS meetings
+"""
+
+
+@cache.memoize(tables=("games", "clubs", "competitions"), entity=True)
+def _head_to_head_pair(low: int, high: int):
+    """Sırasız kulüp çifti için ham sonuç; (a, b) ve (b, a) aynı kaydı paylaşır."""
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(HEAD_TO_HEAD_SQL, {"low": low, "high": high})
+        row = cur.fetchone()
+        cur.close()
+        return row
+    except Exception as e:
+        print(f"Database error (head_to_head): {e}")
+        return None
+    finally:
+        release_conn(conn)
+
+
+def _club_side(stats: dict, low_is_a: bool):
+    """low/high anahtarlarını istenen kulübün bakış açısına (a/b) çevirir."""
+    a, b = ("low", "high") if low_is_a else ("high", "low")
+    side = {k: v for k, v in stats.items() if not k.startswith(("low_", "high_"))}
+    side.update(
+        a_wins=stats[f"{a}_wins"],
+        b_wins=stats[f"{b}_wins"],
+        a_goals=stats[f"{a}_goals"],
+        b_goals=stats[f"{b}_goals"],
+    )
+    return side
+
+
+def get_head_to_head(club_a: int, club_b: int):
+    """İki kulüp arasındaki tüm maçlar, toplam G/B/M ve goller, mücadele kırılımı.
+
+    Tek sorguda (tek round trip) gelir; ``idx_games_club_pair`` ile okunur.
+    Kulüplerden biri yoksa None döner.
+    """
+    low, high = sorted((club_a, club_b))
+    row = _head_to_head_pair(low, high)
+    if not row:
+        return None
+    clubs = {c["club_id"]: c for c in row["clubs"] or []}
+    if club_a not in clubs or club_b not in clubs:
+        return None
+    low_is_a = club_a == low
+    return {
+        "club_a": clubs[club_a],
+        "club_b": clubs[club_b],
+        "totals": _club_side(row["totals"], low_is_a),
+        "competitions": [_club_side(c, low_is_a) for c in row["competitions"] or []],
+        "meetings": row["meetings"] or [],
+    }
+
 
 def get_clubs_filtered(search=None, league=None, min_age=None, max_age=None, min_capacity=None, max_capacity=None):
     """Filtrelere göre kulüp verilerini döner."""
@@ -135,35 +698,15 @@ def get_clubs_filtered(search=None, league=None, min_age=None, max_age=None, min
                 comp.is_major_national_league AS is_major_league
             FROM clubs c
             LEFT JOIN competitions comp ON c.domestic_competition_id = comp.competition_id
-            WHERE 1=1
         """
-        params = []
+        where_clause, params = _clubs_filter(search, league, min_age, max_age, min_capacity, max_capacity)
+        query += where_clause
 
         if search:
-            query += " AND LOWER(c.name) LIKE %s"
-            params.append(f"%{search.lower()}%")
-
-        if league:
-            query += " AND LOWER(comp.name) = %s"
-            params.append(league.lower())
-
-        if min_age is not None:
-            query += " AND c.average_age >= %s"
-            params.append(min_age)
-
-        if max_age is not None:
-            query += " AND c.average_age <= %s"
-            params.append(max_age)
-
-        if min_capacity is not None:
-            query += " AND c.stadium_seats >= %s"
-            params.append(min_capacity)
-
-        if max_capacity is not None:
-            query += " AND c.stadium_seats <= %s"
-            params.append(max_capacity)
-
-        query += " ORDER BY c.name ASC"
+            # En benzer kulüpler önce
+            query += f" ORDER BY {_search_rank(cur, 'c.name', search)} DESC, c.name ASC"
+        else:
+            query += " ORDER BY c.name ASC"
 
         cur.execute(query, params)
         clubs = cur.fetchall()
@@ -173,8 +716,20 @@ def get_clubs_filtered(search=None, league=None, min_age=None, max_age=None, min
         print(f"Database error (get_clubs_filtered): {e}")
         return []
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
+
+def _competitions_filter(country_name=None, is_major_league=None):
+    """Mücadele filtreleri için (WHERE, params) üretir (``competitions c`` üzerine)."""
+    query = " WHERE 1=1"
+    params = []
+    if country_name:
+        query += " AND c.country_name = %s"
+        params.append(country_name)
+    if is_major_league is not None:
+        query += " AND c.is_major_national_league = %s"
+        params.append(is_major_league)
+    return query, params
+
 
 def get_all_competitions(country_name=None, is_major_league=None):
     """Tüm mücadeleleri veritabanından çeker. İsteğe bağlı olarak ülke adına ve major league durumuna göre filtreler."""
@@ -191,19 +746,9 @@ def get_all_competitions(country_name=None, is_major_league=None):
                 c.url,
                 c.country_name
             FROM competitions c
-            WHERE 1=1
         """
-        params = []
-        
-        if country_name:
-            query += " AND c.country_name = %s"
-            params.append(country_name)
-        
-        if is_major_league is not None:
-            query += " AND c.is_major_national_league = %s"
-            params.append(is_major_league)
-        
-        query += " ORDER BY c.name ASC"
+        where_clause, params = _competitions_filter(country_name, is_major_league)
+        query += where_clause + " ORDER BY c.name ASC"
         
         cur.execute(query, params)
         competitions = cur.fetchall()
@@ -213,9 +758,9 @@ def get_all_competitions(country_name=None, is_major_league=None):
         print(f"Database error: {e}")
         return []
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
 
+@cache.memoize(ttl=settings.CACHE_REFERENCE_TTL, tables=("competitions",))
 def get_all_countries():
     """Tüm ülkeleri veritabanından çeker (mücadeleleri olan ülkeler)."""
     conn = None
@@ -238,9 +783,9 @@ def get_all_countries():
         print(f"Database error: {e}")
         return []
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
 
+@cache.memoize(ttl=settings.CACHE_REFERENCE_TTL, tables=("competitions",))
 def get_transfer_leagues():
     """Transfers için lig listesini ülkeye göre sıralı döner, 'Europa' hariç."""
     conn = None
@@ -261,218 +806,359 @@ def get_transfer_leagues():
         print(f"Database error: {e}")
         return []
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
 
 
-def get_transfers(
-    season=None,
-    min_fee=None,
-    max_fee=None,
-    sort_by=None,
-    sort_dir="asc",
-    page=None,
-    per_page=None,
-    from_league=None,
-    to_league=None,
-):
-    """Transferleri isteğe göre filtreleyip sıralar, opsiyonel sayfalama uygular."""
+@cache.memoize(ttl=settings.CACHE_REFERENCE_TTL, tables=("transfers",))
+def get_transfer_seasons():
+    """Transferlerde geçen sezonları (ör: 24/25) yeniden eskiye sıralı döner."""
     conn = None
     try:
         conn = get_conn()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT transfer_season
+            FROM transfers
+            WHERE transfer_season IS NOT NULL
+            GROUP BY transfer_season
+            ORDER BY MIN(transfer_date) DESC NULLS LAST
+            """
+        )
+        seasons = [row[0] for row in cur.fetchall()]
+        cur.close()
+        return seasons
+    except Exception as e:
+        print(f"Database error (get_transfer_seasons): {e}")
+        return []
+    finally:
+        release_conn(conn)
 
-        base_query = """
-            FROM transfers t
-            LEFT JOIN players p ON t.player_id = p.player_id
-            LEFT JOIN clubs fc ON t.from_club_id = fc.club_id
-            LEFT JOIN clubs tc ON t.to_club_id = tc.club_id
-            LEFT JOIN competitions fc_comp ON fc.domestic_competition_id = fc_comp.competition_id
-            LEFT JOIN competitions tc_comp ON tc.domestic_competition_id = tc_comp.competition_id
-            WHERE 1=1
-        """
-        filters = []
 
-        if season:
-            base_query += " AND t.transfer_season = %s"
-            filters.append(season)
+TRANSFER_SELECT = """
+    SELECT 
+        t.transfer_id,
+        t.transfer_season,
+        t.transfer_fee,
+        t.transfer_fee AS transfer_fee_value,
+        t.transfer_date,
+        t.market_value_in_eur,
+        p.name AS player_name,
+        t.market_value_in_eur AS player_value,
+        p.date_of_birth,
+        p.sub_position,
+        p.country_of_citizenship,
+        fc.name AS from_club,
+        fc_comp.name AS from_league,
+        tc_comp.name AS to_league,
+        tc.name AS to_club
+"""
 
-        if min_fee is not None:
-            base_query += " AND t.transfer_fee >= %s"
-            filters.append(min_fee)
 
-        if max_fee is not None:
-            base_query += " AND t.transfer_fee <= %s"
-            filters.append(max_fee)
+TRANSFER_FROM = """
+    FROM transfers t
+    LEFT JOIN players p ON t.player_id = p.player_id
+    LEFT JOIN clubs fc ON t.from_club_id = fc.club_id
+    LEFT JOIN clubs tc ON t.to_club_id = tc.club_id
+    LEFT JOIN competitions fc_comp ON fc.domestic_competition_id = fc_comp.competition_id
+    LEFT JOIN competitions tc_comp ON tc.domestic_competition_id = tc_comp.competition_id
+"""
 
-        if from_league:
-            base_query += " AND fc_comp.name = %s"
-            filters.append(from_league)
 
-        if to_league:
-            base_query += " AND tc_comp.name = %s"
-            filters.append(to_league)
+def _transfers_where(season=None, min_fee=None, max_fee=None, from_league=None, to_league=None):
+    """Transfer filtreleri için (WHERE, params) üretir (``TRANSFER_FROM`` üzerine)."""
+    base_query = " WHERE 1=1"
+    filters = []
 
-        sort_columns = {
-            "fee": "t.transfer_fee",
-            "date": "t.transfer_date",
-            "value": "t.market_value_in_eur",
-        }
-        sort_column = sort_columns.get(sort_by, "t.transfer_date")
-        sort_direction = "DESC" if str(sort_dir).lower() == "desc" else "ASC"
+    if season:
+        base_query += " AND t.transfer_season = %s"
+        filters.append(season)
 
-        count_query = "SELECT COUNT(*) " + base_query
-        cur.execute(count_query, filters)
-        total_count = cur.fetchone()["count"]
+    if min_fee is not None:
+        base_query += " AND t.transfer_fee >= %s"
+        filters.append(min_fee)
 
-        data_query = f"""
-            SELECT 
-                t.transfer_id,
-                t.transfer_season,
-                t.transfer_fee,
-                t.transfer_fee AS transfer_fee_value,
-                t.transfer_date,
-                t.market_value_in_eur,
-                p.name AS player_name,
-                t.market_value_in_eur AS player_value,
-                p.date_of_birth,
-                p.sub_position,
-                p.country_of_citizenship,
-                fc.name AS from_club,
-                fc_comp.name AS from_league,
-                tc_comp.name AS to_league,
-                tc.name AS to_club
-            {base_query}
-            ORDER BY {sort_column} {sort_direction}
-        """
+    if max_fee is not None:
+        base_query += " AND t.transfer_fee <= %s"
+        filters.append(max_fee)
 
-        params = list(filters)
-        if page and per_page:
-            offset = max(page - 1, 0) * per_page
-            data_query += " LIMIT %s OFFSET %s"
-            params.extend([per_page, offset])
+    if from_league:
+        base_query += " AND fc_comp.name = %s"
+        filters.append(from_league)
 
-        cur.execute(data_query, params)
-        transfers = cur.fetchall()
-        cur.close()
-        return transfers, total_count
+    if to_league:
+        base_query += " AND tc_comp.name = %s"
+        filters.append(to_league)
+
+    return base_query, filters
+
+
+def _transfers_filter(season=None, min_fee=None, max_fee=None, from_league=None, to_league=None):
+    """Transfer filtreleri için (FROM ... WHERE, params) üretir."""
+    where_clause, filters = _transfers_where(season, min_fee, max_fee, from_league, to_league)
+    return TRANSFER_FROM + where_clause, filters
+
+
+def _stream_rows(query: str, params, name: str, itersize: int):
+    """Sorgu sonucunu server-side (named) cursor ile ``itersize``'lik parçalar halinde üretir.
+
+    Hata akışın ortasında olursa yutulmaz; yarım kalan çıktı istemciye hata olarak yansır.
+    """
+    conn = None
+    cur = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(name=name, cursor_factory=RealDictCursor)
+        cur.itersize = itersize
+        cur.execute(query, params)
+        yield from cur
     except Exception as e:
-        print(f"Database error: {e}")
-        return [], 0
+        print(f"Database error ({name}): {e}")
+        raise
     finally:
-        if conn:
-            conn.close()
+        if cur is not None and not cur.closed:
+            try:
+                cur.close()
+            except Exception:
+                pass
+        if conn is not None and not conn.closed:
+            conn.rollback()
+        release_conn(conn)
+
+
+def iter_transfers(season=None, min_fee=None, max_fee=None, sort_by=None, sort_dir="asc", from_league=None, to_league=None):
+    """``get_transfers`` ile aynı filtre ve sıralamayla tüm transferleri akıtır (export için)."""
+    base_query, filters = _transfers_filter(season, min_fee, max_fee, from_league, to_league)
+    sort_column, _, sort_direction, nullable = TRANSFER_SORTS[_transfer_sort_key(sort_by, sort_dir)]
+    query = f"""
+        {TRANSFER_SELECT}
+        {base_query}
+        {_order_by(sort_column, "t.transfer_id", sort_direction, nullable)}
+    """
+    return _stream_rows(query, filters, "transfers_export", settings.EXPORT_ITERSIZE)
+
+
+# Sayfalı liste sonuçları (cache.cached_results) bu tablolar değişince silinir
+TRANSFER_LIST_TABLES = ("transfers", "players", "clubs", "competitions")
+PLAYER_LIST_TABLES = ("players", "clubs")
+GAME_LIST_TABLES = ("games", "clubs", "competitions")
+
+
+def with_ages(result):
+    """``(satırlar, toplam, tahmini_mi)`` sonucunun satır kopyalarına bugünkü ``age`` alanını ekler.
+
+    Yaş güne bağlıdır; cache'lenen satırlara yazılmaz, her çağrıda hesaplanır.
+    """
+    rows, total, estimated = result
+    today = date.today()
+    return (
+        [
+            dict(row, age=age_on(row["date_of_birth"], today) if row.get("date_of_birth") else None)
+            for row in rows
+        ],
+        total,
+        estimated,
+    )
+
+
+def _transfers_result_key(season=None, min_fee=None, max_fee=None, sort_by=None, sort_dir="asc", page=None, per_page=None, from_league=None, to_league=None, cursor=None, known_total=None):
+    """``get_transfers`` için kanonik sonuç anahtarı (tutarlar çağıranda parse edilir).
+
+    ``known_total`` yalnızca sayım ipucudur, sayfayı değiştirmez; anahtara girmez.
+    """
+    sort_key = _transfer_sort_key(sort_by, sort_dir)
+    keyset = decode_cursor(cursor, sort_key)
+    return (
+        season or None, min_fee, max_fee, from_league or None, to_league or None,
+        sort_key, page, per_page, cursor if keyset else None,
+    )
 
-def get_games_by_year(year: int, sort_by: str = "date"):
-    """Belirli bir yıl için maçları getirir."""
-    if not year:
-        return []
 
+@cache.cached_results(_transfers_result_key, tables=TRANSFER_LIST_TABLES, finalize=with_ages)
+def get_transfers(
+    season=None,
+    min_fee=None,
+    max_fee=None,
+    sort_by=None,
+    sort_dir="asc",
+    page=None,
+    per_page=None,
+    from_league=None,
+    to_league=None,
+    cursor=None,
+    known_total=None,
+):
+    """Transferleri isteğe göre filtreleyip sıralar, opsiyonel sayfalama uygular.
+
+    ``cursor`` verilirse (bkz. ``transfer_page_tokens``) OFFSET yerine keyset
+    sayfalama kullanılır; OFFSET yalnızca doğrudan sayfa numarasına atlarken
+    devreye girer. ``(transferler, toplam, toplam_tahmini_mi)`` döner;
+    ``known_total`` verilirse sayım yapılmaz (bkz. ``counting.count_rows``).
+    Sonuç filtre anahtarıyla cache'lenir; ``age`` alanı cache'ten sonra eklenir.
+    """
     conn = None
     try:
         conn = get_conn()
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
-        goal_diff_expr = """
-            CASE
-                WHEN g.home_club_goals IS NULL OR g.away_club_goals IS NULL THEN NULL
-                ELSE ABS(g.home_club_goals - g.away_club_goals)
-            END
-        """
+        base_query, filters = _transfers_filter(season, min_fee, max_fee, from_league, to_league)
 
-        order_clause = _game_sort_clause(sort_by)
+        sort_key = _transfer_sort_key(sort_by, sort_dir)
+        sort_column, _, sort_direction, nullable = TRANSFER_SORTS[sort_key]
+        keyset = decode_cursor(cursor, sort_key)
 
-        query = """
-            SELECT
-                g.game_id,
-                g.date AS game_date,
-                g.home_club_goals,
-                g.away_club_goals,
-                g.season,
-                g.home_club_position,
-                g.away_club_position,
-                g.is_favorite,
-                hc.name AS home_club_name,
-                ac.name AS away_club_name,
-                comp.name AS competition_name,
-                comp.country_name AS competition_country,
-                comp.is_major_national_league AS competition_is_major,
-                {goal_diff_expr} AS goal_difference
-            FROM games g
-            LEFT JOIN clubs hc ON g.home_club_id = hc.club_id
-            LEFT JOIN clubs ac ON g.away_club_id = ac.club_id
-            LEFT JOIN competitions comp ON g.competition_id = comp.competition_id
-            WHERE EXTRACT(YEAR FROM g.date) = %s
-            {order_clause}
-        """.format(goal_diff_expr=goal_diff_expr, order_clause=order_clause)
+        select_query = TRANSFER_SELECT
 
-        cur.execute(query, (year,))
-        games = cur.fetchall()
+        def fetch():
+            if keyset and per_page:
+                segments = _keyset_segments(sort_column, "t.transfer_id", sort_direction, nullable, keyset)
+                return _fetch_keyset_page(
+                    cur, select_query, base_query, filters, segments, per_page, keyset["d"] == "prev"
+                )
+
+            data_query = f"""
+                {select_query}
+                {base_query}
+                {_order_by(sort_column, "t.transfer_id", sort_direction, nullable)}
+            """
+            params = list(filters)
+            if page and per_page:
+                offset = max(page - 1, 0) * per_page
+                data_query += " LIMIT %s OFFSET %s"
+                params.extend([per_page, offset])
+            cur.execute(data_query, params)
+            return cur.fetchall()
+
+        # Toplam sayı ve sayfa verisi paralel çalışır
+        transfers, (total_count, estimated) = _count_and_fetch(
+            fetch,
+            base_query,
+            filters,
+            cache_key=("transfers", season, min_fee, max_fee, from_league, to_league),
+            filtered=bool(filters),
+            known_total=known_total,
+            tables=TRANSFER_LIST_TABLES,
+        )
         cur.close()
-        return games
+        return transfers, total_count, estimated
+    except parallel.DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"Database error: {e}")
-        return []
+        return [], 0, False
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
 
-def get_favorite_games(year: Optional[int] = None, sort_by: str = "date"):
-    """Favori olarak işaretlenmiş maçları getirir. İsteğe bağlı yıl filtresi uygular."""
-    conn = None
-    try:
-        conn = get_conn()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
+def _year_range(year: int):
+    """Yili yari acik [1 Ocak, ertesi yil 1 Ocak) tarih araligina cevirir."""
+    return date(year, 1, 1), date(year + 1, 1, 1)
 
-        goal_diff_expr = """
-            CASE
-                WHEN g.home_club_goals IS NULL OR g.away_club_goals IS NULL THEN NULL
-                ELSE ABS(g.home_club_goals - g.away_club_goals)
-            END
-        """
 
-        order_clause = _game_sort_clause(sort_by)
+def _games_filter(year: Optional[int] = None, favorites_only: bool = False):
+    """Games listesi için (WHERE, params) üretir.
 
-        query = """
-            SELECT
-                g.game_id,
-                g.date AS game_date,
-                g.home_club_goals,
-                g.away_club_goals,
-                g.season,
-                g.home_club_position,
-                g.away_club_position,
-                g.is_favorite,
-                hc.name AS home_club_name,
-                ac.name AS away_club_name,
-                comp.name AS competition_name,
-                comp.country_name AS competition_country,
-                comp.is_major_national_league AS competition_is_major,
-                {goal_diff_expr} AS goal_difference
-            FROM games g
-            LEFT JOIN clubs hc ON g.home_club_id = hc.club_id
-            LEFT JOIN clubs ac ON g.away_club_id = ac.club_id
-            LEFT JOIN competitions comp ON g.competition_id = comp.competition_id
-            WHERE g.is_favorite = TRUE
-        """
-        params = []
+    Tarih filtresi ``EXTRACT(YEAR ...)`` yerine aralik karsilastirmasi oldugu
+    icin ``idx_games_date`` / ``idx_games_favorite_date`` kullanilabilir.
+    """
+    conditions = []
+    params = []
+    if favorites_only:
+        conditions.append("g.is_favorite")
+    if year is not None:
+        conditions.append("g.date >= %s AND g.date < %s")
+        params.extend(_year_range(year))
+    where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+    return where_clause, params
+
+
+def build_games_query(
+    year: Optional[int] = None,
+    favorites_only: bool = False,
+    sort_by: str = "date",
+    limit: Optional[int] = None,
+    offset: int = 0,
+):
+    """Games sayfasi sorgusunu (sql, params) olarak uretir."""
+    where_clause, params = _games_filter(year, favorites_only)
+    query = f"""
+        SELECT
+            g.game_id,
+            g.date AS game_date,
+            g.home_club_goals,
+            g.away_club_goals,
+            g.season,
+            g.home_club_position,
+            g.away_club_position,
+            g.is_favorite,
+            g.home_club_id,
+            g.away_club_id,
+            hc.name AS home_club_name,
+            ac.name AS away_club_name,
+            comp.name AS competition_name,
+            comp.country_name AS competition_country,
+            comp.is_major_national_league AS competition_is_major,
+            g.goal_difference
+        FROM games g
+        LEFT JOIN clubs hc ON g.home_club_id = hc.club_id
+        LEFT JOIN clubs ac ON g.away_club_id = ac.club_id
+        LEFT JOIN competitions comp ON g.competition_id = comp.competition_id
+        {where_clause}
+        {_game_sort_clause(sort_by)}
+    """
+    if limit is not None:
+        query += " LIMIT %s OFFSET %s"
+        params = params + [limit, offset]
+    return query, params
 
-        if year is not None:
-            query += " AND EXTRACT(YEAR FROM g.date) = %s"
-            params.append(year)
 
-        query += f" {order_clause}"
+def _games_result_key(year=None, favorites_only=False, sort_by="date", page=1, per_page=60):
+    sort_key = sort_by if sort_by in ("goal_diff_desc", "goal_diff_asc") else "date"
+    return year, bool(favorites_only), sort_key, page, per_page
 
-        cur.execute(query.format(goal_diff_expr=goal_diff_expr), params)
-        games = cur.fetchall()
+
+@cache.cached_results(_games_result_key, tables=GAME_LIST_TABLES)
+def get_games_page(year: Optional[int] = None, favorites_only: bool = False, sort_by: str = "date", page: int = 1, per_page: int = 60):
+    """Yıl / favori filtresine göre tek sayfa maç ve toplam sayıyı ``(maçlar, toplam)`` döner."""
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        where_clause, params = _games_filter(year, favorites_only)
+        query, query_params = build_games_query(
+            year, favorites_only, sort_by, limit=per_page, offset=(page - 1) * per_page
+        )
+
+        def fetch():
+            cur.execute(query, query_params)
+            return cur.fetchall()
+
+        games, (total, _) = _count_and_fetch(
+            fetch,
+            f"FROM games g {where_clause}",
+            params,
+            cache_key=("games", year, favorites_only),
+            filtered=True,
+            tables=GAME_LIST_TABLES,
+        )
         cur.close()
-        return games
+        return games, total
+    except parallel.DeadlineExceeded:
+        raise
     except Exception as e:
-        print(f"Database error: {e}")
-        return []
+        print(f"Database error (get_games_page): {e}")
+        return [], 0
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
+
+
+def iter_games(year: Optional[int] = None, favorites_only: bool = False, sort_by: str = "date", itersize: Optional[int] = None):
+    """Filtreye uyan tüm maçları server-side (named) cursor ile parça parça üretir.
+
+    Bellekte aynı anda en fazla ``itersize`` satır tutulur; games sayfasının
+    akış (stream) modu ve export tarafından kullanılır.
+    """
+    query, params = build_games_query(year, favorites_only, sort_by)
+    return _stream_rows(query, params, "games_stream", itersize or settings.GAMES_STREAM_ITERSIZE)
 
 def set_game_favorite(game_id: int, is_favorite: bool = True) -> bool:
     """Bir maçı favori olarak işaretler veya kaldırır."""
@@ -484,8 +1170,13 @@ def set_game_favorite(game_id: int, is_favorite: bool = True) -> bool:
         query = "UPDATE games SET is_favorite = %s WHERE game_id = %s"
         cur.execute(query, (is_favorite, game_id))
         updated = cur.rowcount > 0
+        if updated:
+            bump_dataset_version(cur, ["games"])
         conn.commit()
         cur.close()
+        if updated:
+            cache.invalidate(["games"])
+            counting.invalidate(["games"])
         return updated
     except Exception as e:
         print(f"Database error: {e}")
@@ -493,140 +1184,382 @@ def set_game_favorite(game_id: int, is_favorite: bool = True) -> bool:
             conn.rollback()
         return False
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
+
+
+#----------------------------------STANDINGS----------------------------------------------
+# standings tablosu games'ten türetilir ve ingest ile güncellenir (utils/standings.py)
+@cache.memoize(ttl=settings.CACHE_REFERENCE_TTL, tables=("competitions",))
+def get_competition(competition_id: str):
+    """Tek bir mücadeleyi döner; yoksa None."""
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(
+            """
+            SELECT competition_id, name, is_major_national_league AS is_major_league, url, country_name
+            FROM competitions
+            WHERE competition_id = %s
+            """,
+            (competition_id,),
+        )
+        competition = cur.fetchone()
+        cur.close()
+        return competition
+    except Exception as e:
+        print(f"Database error (get_competition): {e}")
+        return None
+    finally:
+        release_conn(conn)
+
+
+@cache.memoize(tables=("games",))
+def get_competition_seasons(competition_id: str):
+    """Puan durumu olan sezonlar, yeniden eskiye."""
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT DISTINCT season FROM standings WHERE competition_id = %s ORDER BY season DESC",
+            (competition_id,),
+        )
+        seasons = [row[0] for row in cur.fetchall()]
+        cur.close()
+        return seasons
+    except Exception as e:
+        print(f"Database error (get_competition_seasons): {e}")
+        return []
+    finally:
+        release_conn(conn)
+
+
+@cache.memoize(tables=("games", "clubs"))
+def get_standings(competition_id: str, season: str):
+    """Bir lig ve sezonun puan durumu (sıralı), kulüp adlarıyla birlikte."""
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(
+            """
+            SELECT
+                s.position,
+                s.club_id,
+                c.name AS club_name,
+                s.played,
+                s.won,
+                s.drawn,
+                s.lost,
+                s.goals_for,
+                s.goals_against,
+                s.goal_difference,
+                s.points,
+                s.form,
+                s.last_game_date
+            FROM standings s
+            LEFT JOIN clubs c ON c.club_id = s.club_id
+            WHERE s.competition_id = %s AND s.season = %s
+            ORDER BY s.position
+            """,
+            (competition_id, season),
+        )
+        table = cur.fetchall()
+        cur.close()
+        return table
+    except Exception as e:
+        print(f"Database error (get_standings): {e}")
+        return []
+    finally:
+        release_conn(conn)
 
 
 
 #----------------------------------PLAYERS------------------------------------------------
 # utils/database.py içindeki get_all_players fonksiyonunu GÜNCELLE:
 
-def get_all_players(page=1, per_page=100, min_age=None, max_age=None, feet=None, positions=None, sort_option="name_asc", search_query=None):
+def _years_before(day: date, years: int) -> date:
+    """``day`` tarihinden ``years`` yıl önceki gün (29 Şubat -> 28 Şubat)."""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+def age_on(birth_date: date, today: Optional[date] = None) -> int:
+    """PostgreSQL ``DATE_PART('year', AGE(today, birth_date))`` ile aynı tam yaş."""
+    today = today or date.today()
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
+
+
+def age_to_dob_range(min_age=None, max_age=None, today: Optional[date] = None):
+    """Yaş sınırlarını ``(born_after, born_on_or_before)`` doğum tarihi aralığına çevirir.
+
+    ``age >= min_age``  <=>  ``date_of_birth <= today - min_age yıl``
+    ``age <= max_age``  <=>  ``date_of_birth >  today - (max_age + 1) yıl``
+    """
+    today = today or date.today()
+    born_on_or_before = _years_before(today, min_age) if min_age is not None else None
+    born_after = _years_before(today, max_age + 1) if max_age is not None else None
+    return born_after, born_on_or_before
+
+
+def _players_filter(min_age=None, max_age=None, feet=None, positions=None, search_query=None):
+    """Oyuncu filtreleri için (WHERE, params) üretir (``FROM players p`` üzerine)."""
+    base_where = "WHERE 1=1"
+    params = []
+
+    # --- ARAMA SORGUSU (trigram indeksli, aksan duyarsız, yazım hatası toleranslı) ---
+    if search_query:
+        search_sql, search_params = _name_search("p.name", search_query)
+        base_where += " AND " + search_sql
+        params.extend(search_params)
+    # -----------------------------------
+
+    # Yaş sınırları doğum tarihi aralığına çevrilir -> index kullanılır
+    born_after, born_on_or_before = age_to_dob_range(min_age, max_age)
+    if born_on_or_before is not None:
+        base_where += " AND p.date_of_birth <= %s"
+        params.append(born_on_or_before)
+    if born_after is not None:
+        base_where += " AND p.date_of_birth > %s"
+        params.append(born_after)
+    if feet and len(feet) > 0:
+        foot_conditions = []
+        if 'None' in feet:
+            foot_conditions.append("p.foot IS NULL")
+            feet = [f for f in feet if f != 'None']
+        if len(feet) > 0:
+            feet_lower = [f.lower() for f in feet]
+            foot_conditions.append("LOWER(p.foot) = ANY(%s)")
+            params.append(feet_lower)
+        if foot_conditions:
+            base_where += " AND (" + " OR ".join(foot_conditions) + ")"
+    if positions and len(positions) > 0:
+        if 'All' not in positions:
+            base_where += " AND p.sub_position = ANY(%s)"
+            params.append(positions)
+    return base_where, params
+
+
+def _players_filter_key(min_age=None, max_age=None, feet=None, positions=None, search_query=None):
+    """``_players_filter`` argümanlarının kanonik hali; sonuç ve sayım anahtarları bunu paylaşır."""
+    return (
+        search_query or None,
+        min_age,
+        max_age,
+        # Yaş filtresi doğum tarihi aralığına bugünden çevrilir; gün değişince anahtar da değişir
+        date.today() if min_age is not None or max_age is not None else None,
+        tuple(sorted({f if f == "None" else f.lower() for f in feet or []})),
+        () if not positions or "All" in positions else tuple(sorted(set(positions))),
+    )
+
+
+def _players_result_key(page=1, per_page=100, min_age=None, max_age=None, feet=None, positions=None, sort_option="name_asc", search_query=None, cursor=None, known_total=None):
+    """``get_all_players`` için kanonik sonuç anahtarı: sayfa, filtre anahtarı ve sıralama.
+
+    ``known_total`` yalnızca sayım ipucudur, sayfayı değiştirmez; anahtara girmez.
+    """
+    sort_key = sort_option if sort_option in PLAYER_SORTS else "name_asc"
+    if sort_key == "relevance" and not search_query:
+        sort_key = "name_asc"
+    keyset = decode_cursor(cursor, sort_key)
+    return (
+        page,
+        per_page,
+        _players_filter_key(min_age, max_age, feet, positions, search_query),
+        sort_key,
+        cursor if keyset else None,
+    )
+
+
+@cache.cached_results(_players_result_key, tables=PLAYER_LIST_TABLES, finalize=with_ages)
+def get_all_players(page=1, per_page=100, min_age=None, max_age=None, feet=None, positions=None, sort_option="name_asc", search_query=None, cursor=None, known_total=None):
     """
     Sayfa, yaş, ayak, pozisyon, sıralama ve ARAMA SORGUSUNA göre oyuncuları çeker.
+    ``cursor`` verilirse OFFSET yerine keyset (seek) sayfalama kullanılır.
+    ``(oyuncular, toplam, toplam_tahmini_mi)`` döner.
     """
     conn = None
     try:
         conn = get_conn()
         cur = conn.cursor(cursor_factory=RealDictCursor)
         
-        base_where = "WHERE 1=1"
-        params = []
-
-        # --- YENİ EKLENEN: ARAMA SORGUSU ---
+        # Sayım cache anahtarı: sıralamadan bağımsız, normalize edilmiş filtre seti
+        count_key = ("players",) + _players_filter_key(min_age, max_age, feet, positions, search_query)
+        base_where, params = _players_filter(min_age, max_age, feet, positions, search_query)
+
+        # 2. Sıralama (benzersiz player_id ile sabitlenir)
+        sort_key = sort_option if sort_option in PLAYER_SORTS else "name_asc"
+        if sort_key == "relevance" and not search_query:
+            sort_key = "name_asc"
+        sort_column, _, sort_direction, nullable = PLAYER_SORTS[sort_key]
+        rank_select = ""
         if search_query:
-            # ILIKE: Büyük/Küçük harf duyarsız 'içinde geçiyor mu' araması
-            base_where += " AND p.name ILIKE %s"
-            params.append(f"%{search_query}%")
-        # -----------------------------------
-
-        # 1. Filtreler (Mevcut kodlar)
-        if min_age is not None:
-            base_where += " AND DATE_PART('year', AGE(CURRENT_DATE, p.date_of_birth)) >= %s"
-            params.append(min_age)
-        if max_age is not None:
-            base_where += " AND DATE_PART('year', AGE(CURRENT_DATE, p.date_of_birth)) <= %s"
-            params.append(max_age)
-        if feet and len(feet) > 0:
-            foot_conditions = []
-            if 'None' in feet:
-                foot_conditions.append("p.foot IS NULL")
-                feet = [f for f in feet if f != 'None']
-            if len(feet) > 0:
-                feet_lower = [f.lower() for f in feet]
-                foot_conditions.append("LOWER(p.foot) = ANY(%s)")
-                params.append(feet_lower)
-            if foot_conditions:
-                base_where += " AND (" + " OR ".join(foot_conditions) + ")"
-        if positions and len(positions) > 0:
-            if 'All' not in positions:
-                base_where += " AND p.sub_position = ANY(%s)"
-                params.append(positions)
-
-        # 2. Sıralama
-        order_clause = "ORDER BY p.name ASC"
-        if sort_option == "name_desc": order_clause = "ORDER BY p.name DESC"
-        elif sort_option == "age_asc": order_clause = "ORDER BY p.date_of_birth DESC NULLS LAST"
-        elif sort_option == "age_desc": order_clause = "ORDER BY p.date_of_birth ASC NULLS LAST"
-        elif sort_option == "height_asc": order_clause = "ORDER BY p.height_in_cm ASC NULLS LAST"
-        elif sort_option == "height_desc": order_clause = "ORDER BY p.height_in_cm DESC NULLS LAST"
-
-        # 3. Toplam Sayı (Arama sonuçlarına göre toplam sayfa sayısını hesaplamak için önemli)
-        count_query = f"SELECT COUNT(*) as total FROM players p {base_where}"
-        cur.execute(count_query, params)
-        total_count = cur.fetchone()['total']
-
-        # 4. Veri Çekme
-        offset = (page - 1) * per_page
-        
-        query = f"""
+            rank_expr = _search_rank(cur, "p.name", search_query)
+            rank_select = f",\n                {rank_expr} AS search_rank"
+            if sort_key == "relevance":
+                sort_column = rank_expr
+        order_clause = _order_by(sort_column, "p.player_id", sort_direction, nullable)
+        keyset = decode_cursor(cursor, sort_key)
+
+        # 3. Veri Çekme
+        select_query = f"""
             SELECT 
                 p.player_id,
                 p.name,
                 p.date_of_birth,
-                DATE_PART('year', AGE(CURRENT_DATE, p.date_of_birth))::INTEGER AS age,
                 p.sub_position,
                 p.foot,
                 p.height_in_cm,
                 p.country_of_citizenship,
-                c.name AS club_name
+                c.name AS club_name{rank_select}
             FROM players p
             LEFT JOIN clubs c ON p.current_club_id = c.club_id
-            {base_where}
-            {order_clause}
-            LIMIT %s OFFSET %s
         """
-        
-        query_params = params + [per_page, offset]
-        
-        cur.execute(query, query_params)
-        players = cur.fetchall()
-        
+
+        def fetch():
+            if keyset:
+                segments = _keyset_segments(sort_column, "p.player_id", sort_direction, nullable, keyset)
+                return _fetch_keyset_page(
+                    cur, select_query, base_where, params, segments, per_page, keyset["d"] == "prev"
+                )
+            offset = (page - 1) * per_page
+            query = f"""
+                {select_query}
+                {base_where}
+                {order_clause}
+                LIMIT %s OFFSET %s
+            """
+            cur.execute(query, params + [per_page, offset])
+            return cur.fetchall()
+
+        # 4. Toplam Sayı (istemci biliyorsa atlanır, filtre setine göre cache'lenir);
+        # veri sorgusuyla paralel çalışır
+        players, (total_count, estimated) = _count_and_fetch(
+            fetch,
+            f"FROM players p {base_where}",
+            params,
+            cache_key=count_key,
+            filtered=base_where != "WHERE 1=1",
+            known_total=known_total,
+            tables=PLAYER_LIST_TABLES,
+        )
+
         cur.close()
-        return players, total_count
+        return players, total_count, estimated
         
+    except parallel.DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"Database error (get_all_players): {e}")
-        return [], 0
+        return [], 0, False
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
 
 
-def get_players_by_club(club_id: int):
-    """Secilen kulup kadrosunu doner."""
-    if not club_id:
-        return []
+def get_players_snapshot():
+    """Bellek içi oyuncu motoru (``utils/players_engine.py``) için tüm oyuncular.
 
+    Satırlar ``ORDER BY p.name, p.player_id`` sırasıyla gelir; isim sıralaması
+    böylece veritabanının collation'ıyla birebir aynı olur. Hata olursa None.
+    """
     conn = None
     try:
         conn = get_conn()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-
-        query = """
+        cur = conn.cursor()
+        cur.execute(
+            """
             SELECT
                 p.player_id,
                 p.name,
                 p.date_of_birth,
-                DATE_PART('year', AGE(CURRENT_DATE, p.date_of_birth))::INTEGER AS age,
                 p.sub_position,
                 p.foot,
                 p.height_in_cm,
-                p.country_of_citizenship
+                p.country_of_citizenship,
+                c.name AS club_name
             FROM players p
-            WHERE p.current_club_id = %s
-            ORDER BY p.name ASC
-        """
-        cur.execute(query, (club_id,))
-        players = cur.fetchall()
+            LEFT JOIN clubs c ON p.current_club_id = c.club_id
+            ORDER BY p.name, p.player_id
+            """
+        )
+        rows = cur.fetchall()
         cur.close()
-        return players
+        return rows
     except Exception as e:
-        print(f"Database error (get_players_by_club): {e}")
-        return []
-    finally:
+        print(f"Database error (get_players_snapshot): {e}")
         if conn:
-            conn.close()
+            conn.rollback()
+        return None
+    finally:
+        release_conn(conn)
+
+
+SQUAD_SELECT = """
+    SELECT
+        p.current_club_id AS club_id,
+        p.player_id,
+        p.name,
+        p.date_of_birth,
+        DATE_PART('year', AGE(CURRENT_DATE, p.date_of_birth))::INTEGER AS age,
+        p.sub_position,
+        p.foot,
+        p.height_in_cm,
+        p.country_of_citizenship
+    FROM players p
+    WHERE p.current_club_id = ANY(%s)
+    ORDER BY p.current_club_id, p.name ASC
+"""
+
+
+def get_players_by_clubs(club_ids):
+    """Birden fazla kulübün kadrosunu ``{club_id: [oyuncular]}`` olarak döner.
+
+    Kadrolar kulüp bazında cache'lenir; cache'te olmayan kulüpler tek bir
+    ``= ANY(%s)`` sorgusuyla birlikte çekilip sunucu tarafında gruplanır.
+    """
+    club_ids = list(dict.fromkeys(int(c) for c in club_ids if c))
+    if not club_ids:
+        return {}
+
+    keys = {club_id: ("squad", club_id) for club_id in club_ids}
+    found, generation = cache.get_many(list(keys.values()))
+    squads = {club_id: found[key] for club_id, key in keys.items() if key in found}
+    missing = [club_id for club_id in club_ids if club_id not in squads]
+    if not missing:
+        return squads
+
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(SQUAD_SELECT, (missing,))
+        loaded = {club_id: [] for club_id in missing}
+        for row in cur.fetchall():
+            loaded[row.pop("club_id")].append(row)
+        cur.close()
+    except Exception as e:
+        print(f"Database error (get_players_by_clubs): {e}")
+        return squads
+    finally:
+        release_conn(conn)
+
+    cache.set_many(
+        {keys[club_id]: players for club_id, players in loaded.items()},
+        tags=("players",),
+        generation=generation,
+    )
+    squads.update(loaded)
+    return squads
+
+
+def get_players_by_club(club_id: int):
+    """Secilen kulup kadrosunu doner."""
+    if not club_id:
+        return []
+    return get_players_by_clubs([club_id]).get(club_id, [])
 
 
 def get_player_by_id(player_id: int):
@@ -665,48 +1598,132 @@ def get_player_by_id(player_id: int):
         print(f"Database error (get_player_by_id): {e}")
         return None
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
+
+
+PLAYER_PROFILE_SQL = """
+    SELECT
+        p.player_id,
+        p.name,
+        p.date_of_birth,
+        DATE_PART('year', AGE(CURRENT_DATE, p.date_of_birth))::INTEGER AS age,
+        p.sub_position,
+        p.foot,
+        p.height_in_cm,
+        p.country_of_citizenship,
+        c.club_id,
+        c.name AS club_name,
+        comp.name AS league_name,
+        comp.country_name AS league_country,
+        COALESCE(tr.transfers, '[]') AS transfers,
+        COALESCE(tr.value_timeline, '[]') AS value_timeline,
+        COALESCE(tm.teammates, '[]') AS teammates
+    FROM players p
+    LEFT JOIN clubs c ON p.current_club_id = c.club_id
+    LEFT JOIN competitions comp ON c.domestic_competition_id = comp.competition_id
+    LEFT JOIN LATERAL (
+        SELECT
+            json_agg(json_build_object(
+                'transfer_id', t.transfer_id,
+                'date', t.transfer_date,
+                'season', t.transfer_season,
+                'fee', t.transfer_fee,
+                'market_value', t.market_value_in_eur,
+                'from_club_id', t.from_club_id,
+                'from_club', fc.name,
+                'from_league', fcomp.name,
+                'to_club_id', t.to_club_id,
+                'to_club', tc.name,
+                'to_league', tcomp.name
+            ) ORDER BY t.transfer_date DESC, t.transfer_id DESC) AS transfers,
+            json_agg(json_build_object('date', t.transfer_date, 'market_value', t.market_value_in_eur)
+                ORDER BY t.transfer_date, t.transfer_id)
+                FILTER (WHERE t.market_value_in_eur IS NOT NULL) AS value_timeline
+        FROM transfers t
+        LEFT JOIN clubs fc ON t.from_club_id = fc.club_id
+        LEFT JOIN competitions fcomp ON fc.domestic_competition_id = fcomp.competition_id
+        LEFT JOIN clubs tc ON t.to_club_id = tc.club_id
+        LEFT JOIN competitions tcomp ON tc.domestic_competition_id = tcomp.competition_id
+        WHERE t.player_id = p.player_id
+    ) tr ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(json_build_object(
+            'player_id', mate.player_id,
+            'name', mate.name,
+            'sub_position', mate.sub_position,
+            'age', DATE_PART('year', AGE(CURRENT_DATE, mate.date_of_birth))::INTEGER
+        ) ORDER BY mate.sub_position NULLS LAST, mate.name) AS teammates
+        FROM players mate
+        WHERE mate.current_club_id = p.current_club_id AND mate.player_id <> p.player_id
+    ) tm ON TRUE
+    WHERE p.player_id = %s
+"""
+
+
+@cache.memoize(tables=("players", "clubs", "competitions", "transfers"), entity=True)
+def get_player_profile(player_id: int):
+    """Oyuncu kaydı + transfer geçmişi (kulüp/lig adlarıyla), piyasa değeri
+    zaman çizelgesi ve güncel takım arkadaşları; tek sorguda gelir.
+
+    Oyuncu bazında cache'lenir; ingest ile ilgili tablolar değişince silinir.
+    """
+    if not player_id:
+        return None
+
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(PLAYER_PROFILE_SQL, (player_id,))
+        player = cur.fetchone()
+        cur.close()
+        return player
+    except Exception as e:
+        print(f"Database error (get_player_profile): {e}")
+        return None
+    finally:
+        release_conn(conn)
 
 
-def get_age_limits():
-    """Veritabanındaki en küçük ve en büyük yaşı hesaplar."""
+# Veri yoksa ya da okunamazsa yaş filtresinin varsayılan sınırları
+DEFAULT_AGE_LIMITS = (15, 45)
+
+
+@cache.memoize(ttl=settings.CACHE_REFERENCE_TTL, tables=("players",))
+def _load_age_limits():
+    """Veri yoksa ya da hata olursa None döner; None cache'lenmez."""
     conn = None
     try:
         conn = get_conn()
         cur = conn.cursor()
-        
-        # En küçük ve en büyük yaşı hesaplayan sorgu
-        query = """
-            SELECT 
-                MIN(DATE_PART('year', AGE(CURRENT_DATE, date_of_birth)))::INTEGER as min_age,
-                MAX(DATE_PART('year', AGE(CURRENT_DATE, date_of_birth)))::INTEGER as max_age
-            FROM players
-            WHERE date_of_birth IS NOT NULL
-        """
-        
-        cur.execute(query)
-        result = cur.fetchone()
+        cur.execute("SELECT MIN(date_of_birth), MAX(date_of_birth) FROM players")
+        oldest, youngest = cur.fetchone()
         cur.close()
-        
-        # Eğer veri yoksa varsayılan olarak 15-45 döndür
-        if result and result[0] is not None:
-            return result[0], result[1]
-        return 15, 45
-        
+
+        if oldest is None:
+            return None
+        return age_on(youngest), age_on(oldest)
+
     except Exception as e:
         print(f"Database error (get_age_limits): {e}")
-        return 15, 45
+        return None
     finally:
-        if conn:
-            conn.close()
+        release_conn(conn)
+
 
+def get_age_limits():
+    """Veritabanındaki en küçük ve en büyük yaşı hesaplar.
+
+    MIN/MAX(date_of_birth) index'in iki ucundan okunur; yaşa çeviri Python'da yapılır.
+    """
+    return _load_age_limits() or DEFAULT_AGE_LIMITS
+
+@cache.memoize(ttl=settings.CACHE_REFERENCE_TTL, tables=("players",))
 def get_all_positions():
     """Veritabanındaki tüm benzersiz pozisyonları (sub_position) çeker."""
     conn = None
     try:
         conn = get_conn()
-        print("1")
         cur = conn.cursor() # Dict cursor gerekmez, sadece liste döneceğiz
         
         query = """
@@ -724,7 +1741,420 @@ def get_all_positions():
         print(f"Database error (get_all_positions): {e}")
         return []
     finally:
+        release_conn(conn)
+
+
+def get_suggest_sources():
+    """Otomatik tamamlama indeksi için oyuncu, kulüp ve lig isimlerini döner.
+
+    Popülerlik skoru piyasa değeridir: oyuncu için son transferindeki değer,
+    kulüp için kadrosunun, lig için kulüplerinin toplam değeri.
+    """
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS _suggest_player_values ON COMMIT DROP AS
+            SELECT
+                p.player_id,
+                p.name,
+                p.current_club_id,
+                COALESCE(v.market_value_in_eur, 0)::BIGINT AS market_value
+            FROM players p
+            LEFT JOIN LATERAL (
+                SELECT t.market_value_in_eur
+                FROM transfers t
+                WHERE t.player_id = p.player_id AND t.market_value_in_eur IS NOT NULL
+                ORDER BY t.transfer_date DESC, t.transfer_id DESC
+                LIMIT 1
+            ) v ON TRUE
+            """
+        )
+        cur.execute("SELECT player_id, name, current_club_id, market_value FROM _suggest_player_values")
+        players = cur.fetchall()
+
+        cur.execute(
+            """
+            SELECT
+                c.club_id,
+                c.name,
+                c.domestic_competition_id,
+                COALESCE(SUM(pv.market_value), 0)::BIGINT AS market_value
+            FROM clubs c
+            LEFT JOIN _suggest_player_values pv ON pv.current_club_id = c.club_id
+            GROUP BY c.club_id, c.name, c.domestic_competition_id
+            """
+        )
+        clubs = cur.fetchall()
+
+        cur.execute(
+            """
+            SELECT
+                comp.competition_id,
+                comp.name,
+                comp.country_name,
+                COALESCE(SUM(pv.market_value), 0)::BIGINT AS market_value
+            FROM competitions comp
+            LEFT JOIN clubs c ON c.domestic_competition_id = comp.competition_id
+            LEFT JOIN _suggest_player_values pv ON pv.current_club_id = c.club_id
+            GROUP BY comp.competition_id, comp.name, comp.country_name
+            """
+        )
+        competitions = cur.fetchall()
+        conn.commit()
+        cur.close()
+        return {"players": players, "clubs": clubs, "competitions": competitions}
+    except Exception as e:
+        print(f"Database error (get_suggest_sources): {e}")
         if conn:
-            conn.close()
+            conn.rollback()
+        return {"players": [], "clubs": [], "competitions": []}
+    finally:
+        release_conn(conn)
+
+
+# ---------------------------------------------------------------------------
+# Transfer analitiği: schema.sql'deki materialized view'lardan okunur,
+# istek sırasında transfers tablosu üzerinde toplama yapılmaz.
+# ---------------------------------------------------------------------------
+ANALYTICS_TABLES = ("transfers", "players", "clubs", "competitions")
+
+
+@cache.memoize(tables=ANALYTICS_TABLES)
+def get_transfer_flows(season: Optional[str] = None):
+    """Lig -> lig transfer sayısı ve toplam bonservis (sezon verilmezse tüm sezonlar)."""
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        where, params = ("WHERE season = %s", [season]) if season else ("", [])
+        cur.execute(
+            f"""
+            SELECT
+                from_league_id,
+                MIN(from_league) AS from_league,
+                to_league_id,
+                MIN(to_league) AS to_league,
+                SUM(transfers)::INTEGER AS transfers,
+                SUM(paid_transfers)::INTEGER AS paid_transfers,
+                SUM(total_fees)::BIGINT AS total_fees
+            FROM mv_transfer_flows
+            {where}
+            GROUP BY from_league_id, to_league_id
+            ORDER BY total_fees DESC, transfers DESC
+            """,
+            params,
+        )
+        flows = cur.fetchall()
+        cur.close()
+        return flows
+    except Exception as e:
+        print(f"Database error (get_transfer_flows): {e}")
+        return []
+    finally:
+        release_conn(conn)
+
+
+def flow_matrix(flows, size: int = 8):
+    """Akışları en çok para hareket ettiren ``size`` lig için kare matrise çevirir.
+
+    Geri kalan ligler "other" satır/sütununda toplanır. Hücre: (adet, toplam).
+    """
+    volume = {}
+    names = {}
+    for f in flows:
+        for league_id, name in ((f["from_league_id"], f["from_league"]), (f["to_league_id"], f["to_league"])):
+            volume[league_id] = volume.get(league_id, 0) + f["total_fees"]
+            names[league_id] = name
+    leagues = [lid for lid in sorted(volume, key=lambda lid: (-volume[lid], lid)) if lid != "-"][:size]
+    index = {lid: i for i, lid in enumerate(leagues)}
+    other = len(leagues)
+
+    labels = [names[lid] for lid in leagues] + ["other"]
+    cells = [[{"transfers": 0, "total_fees": 0} for _ in labels] for _ in labels]
+    for f in flows:
+        cell = cells[index.get(f["from_league_id"], other)][index.get(f["to_league_id"], other)]
+        cell["transfers"] += f["transfers"]
+        cell["total_fees"] += f["total_fees"]
+    return {"league_ids": leagues + ["-"], "labels": labels, "cells": cells}
+
+
+@cache.memoize(tables=ANALYTICS_TABLES)
+def get_club_net_spend(season: Optional[str] = None, order: str = "desc", limit: int = 20):
+    """Net harcaması en yüksek (``desc``) ya da en düşük (``asc``) kulüpler."""
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        where, params = ("WHERE season = %s", [season]) if season else ("", [])
+        direction = "ASC" if order == "asc" else "DESC"
+        cur.execute(
+            f"""
+            SELECT
+                club_id,
+                MIN(club_name) AS club_name,
+                MIN(league_id) AS league_id,
+                SUM(spent)::BIGINT AS spent,
+                SUM(received)::BIGINT AS received,
+                SUM(net_spend)::BIGINT AS net_spend,
+                SUM(arrivals)::INTEGER AS arrivals,
+                SUM(departures)::INTEGER AS departures
+            FROM mv_club_net_spend
+            {where}
+            GROUP BY club_id
+            ORDER BY net_spend {direction}, club_id
+            LIMIT %s
+            """,
+            params + [limit],
+        )
+        clubs = cur.fetchall()
+        cur.close()
+        return clubs
+    except Exception as e:
+        print(f"Database error (get_club_net_spend): {e}")
+        return []
+    finally:
+        release_conn(conn)
+
+
+@cache.memoize(tables=ANALYTICS_TABLES)
+def get_top_transfers(season: Optional[str] = None, limit: int = 25):
+    """Sezonun (ya da tüm zamanların) en pahalı transferleri.
+
+    View her sezonun ilk 25'ini tuttuğu için tüm zamanların ilk 25'i de içindedir.
+    """
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        where, params = ("WHERE season = %s", [season]) if season else ("", [])
+        cur.execute(
+            f"""
+            SELECT transfer_id, season, transfer_date, transfer_fee, market_value_in_eur,
+                   player_id, player_name, from_club, from_league, to_club, to_league
+            FROM mv_top_transfers
+            {where}
+            ORDER BY transfer_fee DESC, transfer_id
+            LIMIT %s
+            """,
+            params + [min(limit, 25)],
+        )
+        transfers = cur.fetchall()
+        cur.close()
+        return transfers
+    except Exception as e:
+        print(f"Database error (get_top_transfers): {e}")
+        return []
+    finally:
+        release_conn(conn)
+
+
+def get_transfer_analytics(season: Optional[str] = None):
+    """Analitik sayfası ve API için ortak veri; tamamı materialized view'lardan okunur."""
+    flows = get_transfer_flows(season)
+    return {
+        "season": season,
+        "matrix": flow_matrix(flows),
+        "flows": flows[:50],
+        "top_spenders": get_club_net_spend(season, order="desc", limit=15),
+        "top_sellers": get_club_net_spend(season, order="asc", limit=15),
+        "top_transfers": get_top_transfers(season, limit=25),
+    }
+
+
+# ---------------------------------------------------------------------------
+# /api/v1 kaynakları: alan projeksiyonu + keyset sayfalama
+# ---------------------------------------------------------------------------
+class ApiResource(NamedTuple):
+    from_sql: str
+    where: object  # (**filtreler) -> (WHERE, params); HTML route'larıyla aynı filtre kodu
+    id_column: str
+    fields: dict  # alan adı -> SQL ifadesi
+    default_fields: tuple
+    sorts: dict  # sort anahtarı -> (SQL kolonu, satırdaki alan, yön, NULL olabilir mi)
+    default_sort: str
+    id_type: type = int  # imleçteki id'nin tipi (competition_id gibi metin id'ler için str)
+
+
+PLAYER_AGE_SQL = "DATE_PART('year', AGE(CURRENT_DATE, p.date_of_birth))::INTEGER"
+
+API_RESOURCES = {
+    "players": ApiResource(
+        from_sql="FROM players p LEFT JOIN clubs c ON p.current_club_id = c.club_id",
+        where=_players_filter,
+        id_column="p.player_id",
+        fields={
+            "player_id": "p.player_id",
+            "name": "p.name",
+            "date_of_birth": "p.date_of_birth",
+            "age": PLAYER_AGE_SQL,
+            "sub_position": "p.sub_position",
+            "foot": "p.foot",
+            "height_in_cm": "p.height_in_cm",
+            "country_of_citizenship": "p.country_of_citizenship",
+            "club_id": "p.current_club_id",
+            "club_name": "c.name",
+        },
+        default_fields=("player_id", "name", "date_of_birth", "age", "sub_position", "foot", "height_in_cm", "country_of_citizenship", "club_name"),
+        sorts={k: v for k, v in PLAYER_SORTS.items() if k != "relevance"},
+        default_sort="name_asc",
+    ),
+    "transfers": ApiResource(
+        from_sql=TRANSFER_FROM,
+        where=_transfers_where,
+        id_column="t.transfer_id",
+        fields={
+            "transfer_id": "t.transfer_id",
+            "transfer_date": "t.transfer_date",
+            "transfer_season": "t.transfer_season",
+            "transfer_fee": "t.transfer_fee",
+            "market_value_in_eur": "t.market_value_in_eur",
+            "player_id": "t.player_id",
+            "player_name": "p.name",
+            "date_of_birth": "p.date_of_birth",
+            "sub_position": "p.sub_position",
+            "country_of_citizenship": "p.country_of_citizenship",
+            "from_club_id": "t.from_club_id",
+            "from_club": "fc.name",
+            "from_league": "fc_comp.name",
+            "to_club_id": "t.to_club_id",
+            "to_club": "tc.name",
+            "to_league": "tc_comp.name",
+        },
+        default_fields=("transfer_id", "transfer_date", "transfer_season", "player_id", "player_name", "from_club", "to_club", "transfer_fee", "market_value_in_eur"),
+        sorts=TRANSFER_SORTS,
+        default_sort="date_desc",
+    ),
+    "games": ApiResource(
+        from_sql="""FROM games g
+            LEFT JOIN clubs hc ON g.home_club_id = hc.club_id
+            LEFT JOIN clubs ac ON g.away_club_id = ac.club_id
+            LEFT JOIN competitions comp ON g.competition_id = comp.competition_id""",
+        where=_games_filter,
+        id_column="g.game_id",
+        fields={
+            "game_id": "g.game_id",
+            "date": "g.date",
+            "season": "g.season",
+            "competition_id": "g.competition_id",
+            "competition_name": "comp.name",
+            "home_club_id": "g.home_club_id",
+            "home_club_name": "hc.name",
+            "away_club_id": "g.away_club_id",
+            "away_club_name": "ac.name",
+            "home_club_goals": "g.home_club_goals",
+            "away_club_goals": "g.away_club_goals",
+            "goal_difference": "g.goal_difference",
+            "home_club_position": "g.home_club_position",
+            "away_club_position": "g.away_club_position",
+            "is_favorite": "g.is_favorite",
+        },
+        default_fields=("game_id", "date", "competition_name", "home_club_name", "away_club_name", "home_club_goals", "away_club_goals"),
+        sorts={
+            "date_asc": ("g.date", "date", "ASC", True),
+            "date_desc": ("g.date", "date", "DESC", True),
+            "goal_diff_desc": ("g.goal_difference", "goal_difference", "DESC", True),
+            "goal_diff_asc": ("g.goal_difference", "goal_difference", "ASC", True),
+        },
+        default_sort="date_asc",
+    ),
+    "clubs": ApiResource(
+        from_sql="FROM clubs c LEFT JOIN competitions comp ON c.domestic_competition_id = comp.competition_id",
+        where=_clubs_filter,
+        id_column="c.club_id",
+        fields={
+            "club_id": "c.club_id",
+            "name": "c.name",
+            "stadium_name": "c.stadium_name",
+            "stadium_capacity": "c.stadium_seats",
+            "squad_size": "c.squad_size",
+            "average_age": "c.average_age",
+            "foreign_number": "c.foreigners_number",
+            "national_number": "c.national_team_players",
+            "domestic_competition_id": "c.domestic_competition_id",
+            "league_name": "comp.name",
+            "league_country": "comp.country_name",
+        },
+        default_fields=("club_id", "name", "stadium_name", "stadium_capacity", "squad_size", "average_age", "league_name"),
+        sorts={
+            "name_asc": ("c.name", "name", "ASC", False),
+            "name_desc": ("c.name", "name", "DESC", False),
+            "capacity_desc": ("c.stadium_seats", "stadium_capacity", "DESC", True),
+            "capacity_asc": ("c.stadium_seats", "stadium_capacity", "ASC", True),
+        },
+        default_sort="name_asc",
+    ),
+    "competitions": ApiResource(
+        from_sql="FROM competitions c",
+        where=_competitions_filter,
+        id_column="c.competition_id",
+        fields={
+            "competition_id": "c.competition_id",
+            "name": "c.name",
+            "country_name": "c.country_name",
+            "is_major_league": "c.is_major_national_league",
+            "url": "c.url",
+        },
+        default_fields=("competition_id", "name", "country_name", "is_major_league"),
+        sorts={"name_asc": ("c.name", "name", "ASC", False)},
+        default_sort="name_asc",
+        id_type=str,
+    ),
+}
+
+
+def api_list(resource: str, filters: dict, fields, sort_key: str, cursor: Optional[str] = None, limit: int = 50):
+    """Bir /api/v1 kaynağından yalnızca istenen kolonları keyset sayfalama ile çeker.
+
+    ``(satırlar, sonraki_imleç)`` döner; son sayfada imleç ``None``'dır.
+    SELECT listesi ``fields`` ile sınırlanır, sıralama kolonu ve id imleç için
+    gizli olarak eklenir.
+    """
+    spec = API_RESOURCES[resource]
+    where_sql, params = spec.where(**filters)
+    conn = None
+    try:
+        conn = get_conn()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        sort_column, _, direction, nullable = spec.sorts[sort_key]
+        columns = ", ".join(f"{spec.fields[f]} AS {f}" for f in fields)
+        select_sql = (
+            f"SELECT {columns}, {sort_column} AS _sort_value, {spec.id_column} AS _row_id "
+            f"{spec.from_sql}"
+        )
+        where_sql = where_sql or "WHERE 1=1"
+        token_key = f"{resource}:{sort_key}"
+        keyset = decode_cursor(cursor, token_key, spec.id_type)
+        if keyset and keyset["d"] != "next":
+            keyset = None
+
+        # Bir fazla satır çekilir: varsa sonraki sayfa vardır
+        if keyset:
+            segments = _keyset_segments(sort_column, spec.id_column, direction, nullable, keyset)
+            rows = _fetch_keyset_page(cur, select_sql, where_sql, params, segments, limit + 1, False)
+        else:
+            cur.execute(
+                f"{select_sql} {where_sql} {_order_by(sort_column, spec.id_column, direction, nullable)} LIMIT %s",
+                list(params) + [limit + 1],
+            )
+            rows = cur.fetchall()
+        cur.close()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            page = keyset["p"] + 1 if keyset else 2
+            next_cursor = encode_cursor(token_key, last["_sort_value"], last["_row_id"], "next", page)
+        for row in rows:
+            del row["_sort_value"], row["_row_id"]
+        return rows, next_cursor
+    except Exception as e:
+        print(f"Database error (api_list {resource}): {e}")
+        return [], None
+    finally:
+        release_conn(conn)
 
 #-----------------------------------------------------------------------------------------
@@ -0,0 +1,124 @@
+import csv
+import io
+import json
+import time
+import zlib
+
+from flask import current_app, request, stream_with_context
+
+from utils import settings
+from utils.serialize import json_default
+
+TRANSFER_COLUMNS = [
+    "transfer_id",
+    "transfer_date",
+    "transfer_season",
+    "player_name",
+    "date_of_birth",
+    "sub_position",
+    "country_of_citizenship",
+    "from_club",
+    "from_league",
+    "to_club",
+    "to_league",
+    "transfer_fee",
+    "market_value_in_eur",
+]
+
+GAME_COLUMNS = [
+    "game_id",
+    "game_date",
+    "season",
+    "competition_name",
+    "competition_country",
+    "home_club_name",
+    "away_club_name",
+    "home_club_goals",
+    "away_club_goals",
+    "goal_difference",
+    "home_club_position",
+    "away_club_position",
+    "is_favorite",
+]
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+
+def csv_chunks(rows, columns):
+    """Satirlari CSV olarak ``EXPORT_CHUNK_BYTES`` buyuklugunde parcalar halinde uretir."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([row.get(c) for c in columns])
+        if buffer.tell() >= settings.EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(rows, columns):
+    """Her satir icin bir JSON nesnesi (newline-delimited JSON)."""
+    parts, size = [], 0
+    for row in rows:
+        line = json.dumps({c: row.get(c) for c in columns}, default=json_default, ensure_ascii=False) + "\n"
+        parts.append(line)
+        size += len(line)
+        if size >= settings.EXPORT_CHUNK_BYTES:
+            yield "".join(parts)
+            parts, size = [], 0
+    yield "".join(parts)
+
+
+def gzip_chunks(chunks):
+    """Metin parcalarini anlik olarak gzip'ler (tum cikti bellekte tutulmaz)."""
+    compressor = zlib.compressobj(settings.EXPORT_GZIP_LEVEL, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _counted(rows, label):
+    """Satirlari sayar; akis bitince (ya da kesilince) hizi loglar."""
+    count = 0
+    started = time.perf_counter()
+    try:
+        for row in rows:
+            count += 1
+            yield row
+    finally:
+        elapsed = time.perf_counter() - started
+        print(f"Export {label}: {count} rows in {elapsed:.2f}s ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+
+
+def export_response(rows, columns, label):
+    """``?format=csv|ndjson`` icin akan (generator) cevap olusturur.
+
+    Istemci ``Accept-Encoding: gzip`` gonderirse cikti anlik olarak sikistirilir.
+    """
+    fmt = (request.args.get("format") or "csv").lower()
+    if fmt not in FORMATS:
+        fmt = "csv"
+    mimetype, extension = FORMATS[fmt]
+
+    writer = csv_chunks if fmt == "csv" else ndjson_chunks
+    body = writer(_counted(rows, label), columns)
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{label}.{extension}"',
+        "X-Accel-Buffering": "no",
+    }
+    use_gzip = "gzip" in request.accept_encodings
+    if use_gzip:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+
+    response = current_app.response_class(stream_with_context(body), mimetype=mimetype, headers=headers)
+    response.vary.add("Accept-Encoding")
+    return response
@@ -0,0 +1,122 @@
+import hashlib
+import time
+
+from flask import current_app, g, request
+
+from utils import settings
+import utils.database as database
+
+# Her endpoint'in cevabini etkileyen tablolar; ETag bu tablolarin surumunden turetilir.
+# Bos tuple: DB'ye bagli degil (yalnizca surec baslangici + argumanlar).
+# None: dogrulama yapilmaz, yalnizca Cache-Control eklenir.
+ROUTE_TABLES = {
+    "base_page": (),
+    "players_page": ("players", "clubs", "competitions", "sub_positions"),
+    "player_profile_page": ("players", "clubs", "competitions", "transfers"),
+    "transfers_page": ("transfers", "players", "clubs", "competitions"),
+    "games_page": ("games", "clubs", "competitions"),
+    "transfers_export": ("transfers", "players", "clubs", "competitions"),
+    "games_export": ("games", "clubs", "competitions"),
+    "clubs_page": ("clubs", "competitions"),
+    "competitions_page": ("competitions",),
+    "competition_table_page": ("games", "clubs", "competitions"),
+    "analytics_page": ("transfers", "players", "clubs", "competitions"),
+    "club_players_api": ("players", "clubs"),
+    "club_squads_api": ("players", "clubs"),
+    "head_to_head_page": ("games", "clubs", "competitions"),
+    "suggest_api": None,
+    "api_v1.players": ("players", "clubs"),
+    "api_v1.player_detail": ("players", "clubs", "competitions"),
+    "api_v1.player_profile": ("players", "clubs", "competitions", "transfers"),
+    "api_v1.transfers": ("transfers", "players", "clubs", "competitions"),
+    "api_v1.games": ("games", "clubs", "competitions"),
+    "api_v1.clubs": ("clubs", "competitions"),
+    "api_v1.club_players": ("players", "clubs"),
+    "api_v1.head_to_head": ("games", "clubs", "competitions"),
+    "api_v1.competitions": ("competitions",),
+    "api_v1.competition_table": ("games", "clubs", "competitions"),
+    "api_v1.transfer_analytics": ("transfers", "players", "clubs", "competitions"),
+}
+
+# Deploy sonrasi sablon/kod degisikliklerinde eski ETag'ler eslesmesin
+_BOOT_ID = str(time.time_ns())
+
+
+def normalized_args():
+    """Sorgu argumanlarini sirali ve tekrarsiz (anahtar, degerler) listesine cevirir."""
+    return sorted((key, sorted(set(values))) for key, values in request.args.lists())
+
+
+def compute_etag(endpoint, tables):
+    """Endpoint + argumanlar + ilgili tablo surumlerinden ETag uretir.
+
+    Tablo surumleri okunamazsa (ör. dataset_version yok) None doner.
+    """
+    versions = []
+    last_modified = None
+    if tables:
+        known = database.get_dataset_versions()
+        if not known:
+            return None, None
+        for table in tables:
+            version, updated_at = known.get(table, (0, None))
+            versions.append(f"{table}:{version}")
+            if updated_at and (last_modified is None or updated_at > last_modified):
+                last_modified = updated_at
+
+    raw = repr((_BOOT_ID, endpoint, sorted((request.view_args or {}).items()), normalized_args(), versions))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest(), last_modified
+
+
+def _check_conditional():
+    g.http_etag = None
+    g.http_last_modified = None
+    if request.method not in ("GET", "HEAD"):
+        return None
+    tables = ROUTE_TABLES.get(request.endpoint)
+    if tables is None:
+        return None
+
+    etag, last_modified = compute_etag(request.endpoint, tables)
+    if etag is None:
+        return None
+    g.http_etag, g.http_last_modified = etag, last_modified
+
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        matched = last_modified.replace(microsecond=0) <= request.if_modified_since
+    else:
+        matched = False
+    if not matched:
+        return None
+
+    # View fonksiyonu (ve SQL) hic calismadan 304
+    return _apply_headers(current_app.response_class(status=304))
+
+
+def _apply_headers(response):
+    policy = settings.CACHE_CONTROL_POLICIES.get(request.endpoint)
+    if policy and "Cache-Control" not in response.headers:
+        response.headers["Cache-Control"] = policy
+    etag = getattr(g, "http_etag", None)
+    if etag and response.status_code in (200, 304):
+        response.set_etag(etag, weak=True)
+        if g.http_last_modified:
+            response.last_modified = g.http_last_modified
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def _after_request(response):
+    if request.method in ("GET", "HEAD") and response.status_code == 200:
+        _apply_headers(response)
+    return response
+
+
+def init_app(app):
+    """Kosullu GET (304) ve route bazli Cache-Control basliklarini etkinlestirir."""
+    if not settings.HTTP_CACHE_ENABLED:
+        return
+    app.before_request(_check_conditional)
+    app.after_request(_after_request)
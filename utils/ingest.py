@@ -0,0 +1,549 @@
+import csv
+import io
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+import click
+from flask.cli import with_appcontext
+
+import utils.database as database
+from utils import cache, counting, standings
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DATASET_DIR = os.path.join(BASE_DIR, "dataset")
+SCHEMA_PATH = os.path.join(BASE_DIR, "schema.sql")
+
+
+class TableSpec(NamedTuple):
+    table: str
+    filename: str
+    key: str
+    delimiter: str = ","
+    # CSV sutunu -> deger donusturucu (yalnizca ham dosya COPY'ye uygun degilse)
+    converters: Optional[dict] = None
+
+
+def parse_dotted_amount(value: str):
+    """'52.140.000.000' gibi noktali tutarlari tam sayiya cevirir.
+
+    Transfermarkt dokumunde son grup 3 haneli ondalik kisimdir, yani
+    '52.140.000.000' = 52.140.000,000 EUR -> 52140000.
+    """
+    if value is None or value == "":
+        return None
+    groups = value.split(".")
+    if len(groups) > 1 and len(groups[-1]) == 3:
+        groups = groups[:-1]
+    return int("".join(groups))
+
+
+TABLE_SPECS = {
+    spec.table: spec
+    for spec in (
+        TableSpec("countries", "countries.csv", "name"),
+        TableSpec("positions", "positions.csv", "position_id", delimiter=";"),
+        TableSpec("competitions", "competitions.csv", "competition_id"),
+        TableSpec("sub_positions", "subpositions.csv", "name", delimiter=";"),
+        TableSpec("clubs", "clubs.csv", "club_id"),
+        TableSpec("players", "players.csv", "player_id"),
+        TableSpec("games", "games.csv", "game_id"),
+        TableSpec(
+            "transfers",
+            "transfers.csv",
+            "transfer_id",
+            converters={
+                "transfer_fee": parse_dotted_amount,
+                "market_value_in_eur": parse_dotted_amount,
+            },
+        ),
+    )
+}
+
+# Materialized view -> okudugu tablolar; bu tablolar degisince view yenilenir
+ANALYTICS_VIEWS = {
+    "mv_transfer_flows": ("transfers", "clubs", "competitions"),
+    "mv_club_net_spend": ("transfers", "clubs"),
+    "mv_top_transfers": ("transfers", "players", "clubs", "competitions"),
+}
+
+# Ayni seviyedeki tablolar birbirinden bagimsizdir ve paralel yuklenir
+LOAD_LEVELS = [
+    ("countries", "positions"),
+    ("competitions", "sub_positions"),
+    ("clubs",),
+    ("players",),
+    ("games", "transfers"),
+]
+
+
+# ----------------------------------------------------------------------------
+# schema.sql
+# ----------------------------------------------------------------------------
+def split_sql(text: str):
+    """SQL metnini ';' ile ifadelere boler ($$ govdeli fonksiyonlari bozmadan)."""
+    statements, current, in_dollar = [], [], False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not in_dollar and (not stripped or stripped.startswith("--")):
+            continue
+        current.append(line)
+        if line.count("$$") % 2 == 1:
+            in_dollar = not in_dollar
+        if not in_dollar and stripped.endswith(";"):
+            statements.append("\n".join(current).strip().rstrip(";"))
+            current = []
+    if "".join(current).strip():
+        statements.append("\n".join(current).strip().rstrip(";"))
+    return statements
+
+
+def schema_phases(path: str = SCHEMA_PATH):
+    """schema.sql'i (setup, tables, post_load) gruplarina ayirir.
+
+    FK'ler, indeksler ve diger turetilmis nesneler toplu yukleme bittikten
+    sonra calistirilir.
+    """
+    with open(path, encoding="utf-8") as f:
+        statements = split_sql(f.read())
+
+    setup, tables, post_load = [], [], []
+    for stmt in statements:
+        head = " ".join(stmt.split()[:5]).upper()
+        if head.startswith(("CREATE EXTENSION", "CREATE FUNCTION", "CREATE OR REPLACE FUNCTION")):
+            setup.append(stmt)
+        elif head.startswith(("CREATE TABLE", "CREATE UNLOGGED TABLE")):
+            tables.append(stmt)
+        else:
+            post_load.append(stmt)
+    return setup, tables, post_load
+
+
+def refresh_analytics_views(cur, changed, echo=print):
+    """Degisen tablolara bagli materialized view'lari yeniler.
+
+    ``CONCURRENTLY`` sayesinde yenileme sirasinda view'lar okunmaya devam
+    eder. View henuz yoksa (eski sema) schema.sql'deki tanimi ile olusturulur.
+    """
+    views = [v for v, deps in ANALYTICS_VIEWS.items() if set(deps) & set(changed)]
+    if not views:
+        return []
+    _, _, post_load = schema_phases()
+    for view in views:
+        started = time.perf_counter()
+        cur.execute("SELECT to_regclass(%s)", (view,))
+        if cur.fetchone()[0] is None:
+            for stmt in post_load:
+                if f" {view}" in stmt:
+                    cur.execute(stmt)
+        else:
+            cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+        echo(f"  {view:<20} refreshed  {time.perf_counter() - started:6.2f}s")
+    return views
+
+
+def refresh_standings(cur, groups=None, echo=print):
+    """Puan durumunu gunceller; ``groups`` None ise tamami hesaplanir.
+
+    Tablo henuz yoksa (eski sema) schema.sql'deki tanimla olusturulup
+    tamamen doldurulur.
+    """
+    started = time.perf_counter()
+    cur.execute("SELECT to_regclass('standings')")
+    if cur.fetchone()[0] is None:
+        _, tables, _ = schema_phases()
+        for stmt in tables:
+            if " standings" in stmt:
+                cur.execute(stmt)
+        groups = None
+    rows = standings.refresh(cur, groups)
+    scope = "all groups" if groups is None else f"{len(groups)} groups"
+    echo(f"  {'standings':<20} {rows:>8} rows ({scope})  {time.perf_counter() - started:6.2f}s")
+    return rows
+
+
+def after_ingest(tables):
+    """Veri degistikten sonra bu surecteki turetilmis durumu gecersiz kilar.
+
+    Web surecleri ayni degisikligi artan ``dataset_version`` uzerinden gorur
+    (bkz. ``database.get_dataset_versions``).
+    """
+    counting.invalidate(tables)
+    cache.invalidate(tables)
+
+
+# ----------------------------------------------------------------------------
+# COPY
+# ----------------------------------------------------------------------------
+class _RowStream(io.TextIOBase):
+    """Satir iteratorunu COPY FROM STDIN'in okuyabilecegi dosyaya cevirir."""
+
+    def __init__(self, rows):
+        self._rows = rows
+        self._buffer = ""
+        self._out = io.StringIO()
+        self._writer = csv.writer(self._out, lineterminator="\n")
+
+    def readable(self):
+        return True
+
+    def _fill(self, size):
+        while len(self._buffer) < size:
+            chunk = []
+            for _ in range(1000):
+                row = next(self._rows, None)
+                if row is None:
+                    break
+                chunk.append(row)
+            if not chunk:
+                return
+            self._writer.writerows(chunk)
+            self._buffer += self._out.getvalue()
+            self._out.seek(0)
+            self._out.truncate()
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = 1 << 62
+        self._fill(size)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    readline = read
+
+    def close(self):
+        self._rows.close()
+        super().close()
+
+
+def open_csv(spec: TableSpec, dataset_dir: str):
+    """CSV'yi BOM'suz acar ve (dosya, basliklar) doner."""
+    f = open(os.path.join(dataset_dir, spec.filename), encoding="utf-8-sig", newline="")
+    header = next(csv.reader([f.readline()], delimiter=spec.delimiter))
+    return f, [h.strip() for h in header]
+
+
+def csv_source(spec: TableSpec, dataset_dir: str):
+    """(kolonlar, COPY kaynagi, COPY secenekleri) doner.
+
+    Donusum gerekmeyen dosyalar dogrudan diskten akitilir; gerekenler
+    satir satir donusturulerek akitilir. Dosya hicbir zaman tamamen bellege
+    alinmaz.
+    """
+    f, columns = open_csv(spec, dataset_dir)
+    if not spec.converters:
+        delimiter = spec.delimiter.replace("'", "''")
+        return columns, f, f"FORMAT csv, DELIMITER '{delimiter}'"
+
+    converters = [spec.converters.get(col) for col in columns]
+
+    def rows():
+        try:
+            for raw in csv.reader(f, delimiter=spec.delimiter):
+                yield [conv(val) if conv else val for conv, val in zip(converters, raw)]
+        finally:
+            f.close()
+
+    return columns, _RowStream(rows()), "FORMAT csv"
+
+
+def copy_table(conn, spec: TableSpec, dataset_dir: str, target: Optional[str] = None):
+    """Bir CSV dosyasini COPY FROM STDIN ile tabloya akitir; satir sayisini doner."""
+    columns, source, options = csv_source(spec, dataset_dir)
+    column_list = ", ".join(columns)
+    # CSV dosyalari UTF-8; sunucu varsayilani ne olursa olsun oyle gonderilir
+    conn.set_client_encoding("UTF8")
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(
+                f"COPY {target or spec.table} ({column_list}) FROM STDIN WITH ({options})",
+                source,
+            )
+            return cur.rowcount
+    finally:
+        source.close()
+
+
+def _sync_identity(cur, spec: TableSpec):
+    """IDENTITY dizisini tablodaki en buyuk id'nin otesine tasir."""
+    cur.execute("SELECT pg_get_serial_sequence(%s, %s)", (spec.table, spec.key))
+    sequence = cur.fetchone()[0]
+    if sequence:
+        cur.execute(
+            f"SELECT setval(%s, COALESCE(MAX({spec.key}), 0) + 1, false) FROM {spec.table}",
+            (sequence,),
+        )
+
+
+def _load_one(table: str, dataset_dir: str):
+    spec = TABLE_SPECS[table]
+    pool = database.get_pool()
+    conn = pool.getconn()
+    try:
+        started = time.perf_counter()
+        rows = copy_table(conn, spec, dataset_dir)
+        with conn.cursor() as cur:
+            _sync_identity(cur, spec)
+        conn.commit()
+        return table, rows, time.perf_counter() - started
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+
+def _existing_tables(conn):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT tablename FROM pg_tables WHERE schemaname = current_schema() AND tablename = ANY(%s)",
+            (list(TABLE_SPECS),),
+        )
+        return {row[0] for row in cur.fetchall()}
+
+
+def load_dataset(dataset_dir: str = DEFAULT_DATASET_DIR, replace: bool = False, workers: int = 4, echo=print):
+    """Tum dataset'i bos bir semaya toplu yukler.
+
+    1. schema.sql'deki tablolar olusturulur (FK ve indeksler olmadan),
+    2. bagimlilik sirasina gore her seviyedeki tablolar paralel COPY edilir,
+    3. FK, indeks ve turetilmis nesneler eklenip ANALYZE calistirilir.
+    """
+    setup, tables, post_load = schema_phases()
+    pool = database.get_pool()
+    conn = pool.getconn()
+    results = []
+    total_started = time.perf_counter()
+    try:
+        existing = _existing_tables(conn)
+        if existing and not replace:
+            raise click.ClickException(
+                f"Tables already exist ({', '.join(sorted(existing))}); use --replace to reload."
+            )
+        with conn.cursor() as cur:
+            if existing:
+                cur.execute(
+                    "DROP TABLE IF EXISTS " + ", ".join(reversed(list(TABLE_SPECS))) + " CASCADE"
+                )
+            for stmt in setup + tables:
+                cur.execute(stmt)
+        conn.commit()
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for level in LOAD_LEVELS:
+                for table, rows, elapsed in executor.map(lambda t: _load_one(t, dataset_dir), level):
+                    results.append((table, rows, elapsed))
+                    echo(f"  {table:<14} {rows:>8} rows  {elapsed:6.2f}s  {rows / max(elapsed, 1e-9):>10,.0f} rows/s")
+
+        started = time.perf_counter()
+        with conn.cursor() as cur:
+            for stmt in post_load:
+                cur.execute(stmt)
+            refresh_standings(cur, echo=echo)
+            database.bump_dataset_version(cur, TABLE_SPECS)
+            cur.execute("ANALYZE")
+        conn.commit()
+        echo(f"  constraints + indexes        {time.perf_counter() - started:6.2f}s")
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+    after_ingest(list(TABLE_SPECS))
+    total_rows = sum(r[1] for r in results)
+    total_elapsed = time.perf_counter() - total_started
+    echo(f"Loaded {total_rows} rows in {total_elapsed:.2f}s ({total_rows / max(total_elapsed, 1e-9):,.0f} rows/s)")
+    return results
+
+
+# ----------------------------------------------------------------------------
+# Artimli (delta) yukleme
+# ----------------------------------------------------------------------------
+def _stage_and_diff(cur, conn, spec: TableSpec, dataset_dir: str):
+    """Yeni snapshot'i staging tablosuna alir ve canli tabloyla farkini cikarir.
+
+    Yalnizca CSV'de bulunan kolonlar karsilastirilir; ``games.is_favorite``
+    gibi kullaniciya ait kolonlar staging'de yer almaz ve hic dokunulmaz.
+    Sonuc ``delta_<tablo>`` gecici tablosunda (key, action) olarak tutulur.
+    """
+    f, columns = open_csv(spec, dataset_dir)
+    f.close()
+    stage, delta, key = f"stg_{spec.table}", f"delta_{spec.table}", spec.key
+    column_list = ", ".join(columns)
+
+    cur.execute(
+        f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+        f"SELECT {column_list} FROM {spec.table} WITH NO DATA"
+    )
+    staged = copy_table(conn, spec, dataset_dir, target=stage)
+    cur.execute(f"ALTER TABLE {stage} ADD PRIMARY KEY ({key})")
+    cur.execute(f"ANALYZE {stage}")
+
+    row_hash = "md5(ROW({cols})::text)"
+    cur.execute(
+        f"""
+        CREATE TEMP TABLE {delta} ON COMMIT DROP AS
+        SELECT
+            COALESCE(s.{key}, t.{key}) AS key,
+            CASE
+                WHEN t.{key} IS NULL THEN 'insert'
+                WHEN s.{key} IS NULL THEN 'delete'
+                ELSE 'update'
+            END AS action
+        FROM {stage} s
+        FULL JOIN {spec.table} t ON t.{key} = s.{key}
+        WHERE s.{key} IS NULL
+           OR t.{key} IS NULL
+           OR {row_hash.format(cols=", ".join("s." + c for c in columns))}
+              <> {row_hash.format(cols=", ".join("t." + c for c in columns))}
+        """
+    )
+    cur.execute(f"SELECT action, COUNT(*) FROM {delta} GROUP BY action")
+    counts = {"insert": 0, "update": 0, "delete": 0}
+    counts.update(dict(cur.fetchall()))
+    counts["staged"] = staged
+    return columns, counts
+
+
+def _apply_upserts(cur, spec: TableSpec, columns):
+    key = spec.key
+    column_list = ", ".join(columns)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != key)
+    cur.execute(
+        f"""
+        INSERT INTO {spec.table} ({column_list})
+        SELECT {", ".join("s." + c for c in columns)}
+        FROM stg_{spec.table} s
+        JOIN delta_{spec.table} d ON d.key = s.{key} AND d.action <> 'delete'
+        ON CONFLICT ({key}) DO UPDATE SET {updates}
+        """
+    )
+    _sync_identity(cur, spec)
+
+
+def _apply_deletes(cur, spec: TableSpec):
+    cur.execute(
+        f"""
+        DELETE FROM {spec.table} t
+        USING delta_{spec.table} d
+        WHERE d.action = 'delete' AND t.{spec.key} = d.key
+        """
+    )
+
+
+def sync_dataset(tables=None, dataset_dir: str = DEFAULT_DATASET_DIR, echo=print):
+    """Yeni snapshot'i canli tablolara artimli olarak uygular.
+
+    Tum tablolar tek transaction icinde islenir: once her tablo staging'e
+    alinip farki cikarilir, sonra bagimlilik sirasina gore INSERT ... ON
+    CONFLICT ile eklemeler/guncellemeler, ters sirayla da silmeler uygulanir.
+    Tablolar bosaltilmadigi icin site yukleme boyunca calismaya devam eder.
+    """
+    order = [t for level in LOAD_LEVELS for t in level]
+    selected = [t for t in order if not tables or t in tables]
+    unknown = set(tables or ()) - set(order)
+    if unknown:
+        raise click.ClickException(f"Unknown tables: {', '.join(sorted(unknown))}")
+
+    pool = database.get_pool()
+    conn = pool.getconn()
+    started = time.perf_counter()
+    changes = {}
+    try:
+        with conn.cursor() as cur:
+            staged_columns = {}
+            for table in selected:
+                staged_columns[table], changes[table] = _stage_and_diff(
+                    cur, conn, TABLE_SPECS[table], dataset_dir
+                )
+            # Mac degisiklikleri uygulanmadan once eski/yeni gruplar toplanir
+            games_changed = "games" in changes and any(
+                changes["games"][a] for a in ("insert", "update", "delete")
+            )
+            standings_groups = standings.changed_groups(cur) if games_changed else None
+            for table in selected:
+                if changes[table]["insert"] or changes[table]["update"]:
+                    _apply_upserts(cur, TABLE_SPECS[table], staged_columns[table])
+            for table in reversed(selected):
+                if changes[table]["delete"]:
+                    _apply_deletes(cur, TABLE_SPECS[table])
+            changed = [t for t in selected if any(changes[t][a] for a in ("insert", "update", "delete"))]
+            for table in changed:
+                cur.execute(f"ANALYZE {table}")
+            if standings_groups:
+                refresh_standings(cur, standings_groups, echo=echo)
+            if changed:
+                refresh_analytics_views(cur, changed, echo=echo)
+                database.bump_dataset_version(cur, changed)
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+
+    if changed:
+        after_ingest(changed)
+
+    elapsed = time.perf_counter() - started
+    echo(f"  {'table':<14} {'staged':>8} {'insert':>8} {'update':>8} {'delete':>8}")
+    for table in selected:
+        c = changes[table]
+        echo(f"  {table:<14} {c['staged']:>8} {c['insert']:>8} {c['update']:>8} {c['delete']:>8}")
+    total = sum(c["insert"] + c["update"] + c["delete"] for c in changes.values())
+    echo(f"Applied {total} changes in {elapsed:.2f}s")
+    return changes
+
+
+@click.command("rebuild-standings")
+@with_appcontext
+def rebuild_standings_command():
+    """standings tablosunu games tablosundan bastan hesaplar."""
+    pool = database.get_pool()
+    conn = pool.getconn()
+    try:
+        with conn.cursor() as cur:
+            refresh_standings(cur, echo=click.echo)
+            cur.execute("ANALYZE standings")
+            database.bump_dataset_version(cur, ["games"])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
+    after_ingest(["games"])
+
+
+@click.command("load-dataset")
+@click.option(
+    "--dataset-dir",
+    default=DEFAULT_DATASET_DIR,
+    show_default=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="CSV dosyalarinin bulundugu klasor.",
+)
+@click.option("--replace", is_flag=True, help="Mevcut tablolari silip bastan yukler.")
+@click.option("--workers", default=4, show_default=True, help="Paralel COPY baglantisi sayisi.")
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Tablolari silmeden yalnizca degisen satirlari uygular (staging + upsert).",
+)
+@click.option(
+    "--table",
+    "tables",
+    multiple=True,
+    help="--incremental ile yalnizca bu tablolari isler (tekrar edilebilir).",
+)
+@with_appcontext
+def load_dataset_command(dataset_dir, replace, workers, incremental, tables):
+    """dataset/ altindaki CSV'leri COPY ile veritabanina yukler."""
+    if incremental:
+        sync_dataset(tables, dataset_dir, echo=click.echo)
+    else:
+        load_dataset(dataset_dir, replace=replace, workers=workers, echo=click.echo)
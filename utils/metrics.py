@@ -0,0 +1,267 @@
+import functools
+import hashlib
+import re
+import sys
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+from flask import g, request
+
+from utils import settings
+
+# Saniye cinsinden histogram sinirlari (Prometheus varsayilanlarina yakin)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Etiket kombinasyonu basina kumulatif kova sayaclari tutan thread-safe histogram."""
+
+    def __init__(self, name, help_text, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label degerleri -> [kova sayaclari, toplam, adet]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for label_values, (counts, total, count) in items:
+            base = _labels(self.labels, label_values)
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, le=_number(bound))} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_labels(self.labels, label_values, le='+Inf')} {count}")
+            lines.append(f"{self.name}_sum{base} {_number(total)}")
+            lines.append(f"{self.name}_count{base} {count}")
+        return lines
+
+
+class Counter:
+    """Etiket kombinasyonu basina artan sayac."""
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines.extend(f"{self.name}{_labels(self.labels, k)} {_number(v)}" for k, v in items)
+        return lines
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, le=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+QUERY_DURATION = Histogram(
+    "databros_db_query_duration_seconds", "SQL execute latency per query shape.", ("query",)
+)
+QUERY_ROWS = Counter("databros_db_query_rows_total", "Rows returned or affected per query shape.", ("query",))
+QUERY_ERRORS = Counter("databros_db_query_errors_total", "Failed executes per query shape.", ("query",))
+SLOW_QUERIES = Counter("databros_db_slow_queries_total", "Executes slower than SLOW_QUERY_MS.", ("query",))
+POOL_WAIT = Histogram("databros_db_pool_wait_seconds", "Time spent waiting for a pooled connection.")
+REQUEST_DURATION = Histogram(
+    "databros_http_request_duration_seconds",
+    "Request latency per route (streamed bodies: until the first byte).",
+    ("endpoint", "method", "status"),
+)
+
+# ---------------------------------------------------------------------------
+# Sorgu sekli: literal'ler ve IN/ANY listeleri normalize edilmis SQL'in parmak izi
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(sql):
+    """Bosluklari tekler, literal'leri ``?`` yapar; ayni sekildeki sorgular ayni metni verir."""
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    text = _STRING_RE.sub("?", str(sql))
+    text = _NUMBER_RE.sub("?", text)
+    text = text.replace("%s", "?")
+    text = _LIST_RE.sub("(?...)", text)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+@functools.lru_cache(maxsize=4096)
+def query_shape(caller, sql):
+    """``fonksiyon:parmakizi`` etiketi; ayni fonksiyondaki farkli sorgular ayrisir."""
+    digest = hashlib.sha1(normalize_sql(sql).encode("utf-8")).hexdigest()[:8]
+    return f"{caller}:{digest}"
+
+
+def _is_read_only(sql):
+    text = normalize_sql(sql).upper()
+    if not text.startswith(("SELECT", "WITH")):
+        return False
+    return not re.search(r"\b(INSERT|UPDATE|DELETE|MERGE|REFRESH|CREATE|DROP|ALTER|TRUNCATE)\b", text)
+
+
+# ---------------------------------------------------------------------------
+# cursor.execute kancasi
+
+class InstrumentedCursorMixin:
+    """``execute`` suresini, satir sayisini ve yavas sorgulari kaydeder."""
+
+    def execute(self, query, vars=None):
+        caller = sys._getframe(1).f_code.co_name
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except Exception:
+            elapsed = time.perf_counter() - started
+            shape = query_shape(caller, query)
+            QUERY_DURATION.observe(elapsed, shape)
+            QUERY_ERRORS.inc(1, shape)
+            raise
+        elapsed = time.perf_counter() - started
+        shape = query_shape(caller, query)
+        QUERY_DURATION.observe(elapsed, shape)
+        # Named cursor'da satirlar iterasyonda gelir, rowcount -1 kalir
+        if self.rowcount >= 0:
+            QUERY_ROWS.inc(self.rowcount, shape)
+        if settings.SLOW_QUERY_MS and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+            SLOW_QUERIES.inc(1, shape)
+            _log_slow_query(self, shape, query, elapsed)
+        return result
+
+
+@functools.lru_cache(maxsize=None)
+def _instrumented(cursor_class):
+    return type(f"Instrumented{cursor_class.__name__}", (InstrumentedCursorMixin, cursor_class), {})
+
+
+class InstrumentedConnection(psycopg2.extensions.connection):
+    """Acilan her cursor'u (``cursor_factory`` verilse de) olcumlu sinifa sarar."""
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get("cursor_factory") or self.cursor_factory or psycopg2.extensions.cursor
+        kwargs["cursor_factory"] = _instrumented(factory)
+        return super().cursor(*args, **kwargs)
+
+
+def _log_slow_query(cur, shape, query, elapsed):
+    """Yavas sorguyu parametreleri baglanmis haliyle, istenirse planiyla yazar."""
+    statement = cur.query.decode("utf-8", "replace") if cur.query else str(query)
+    print(f"Slow query ({shape}, {elapsed * 1000:.1f} ms, rows={cur.rowcount}): {_SPACE_RE.sub(' ', statement).strip()}")
+    if not settings.SLOW_QUERY_EXPLAIN or cur.name or not _is_read_only(query):
+        return
+    conn = cur.connection
+    if conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+        return
+    # Ham cursor: kancaya tekrar girmez. Sorgu tekrar calisir; hata olursa
+    # savepoint sayesinde cagiranin transaction'i bozulmaz.
+    explain = psycopg2.extensions.cursor(conn)
+    use_savepoint = not conn.autocommit
+    try:
+        if use_savepoint:
+            explain.execute("SAVEPOINT slow_query_explain")
+        explain.execute(b"EXPLAIN (ANALYZE, BUFFERS) " + cur.query)
+        plan = "\n".join(row[0] for row in explain.fetchall())
+        if use_savepoint:
+            explain.execute("RELEASE SAVEPOINT slow_query_explain")
+        print(f"Slow query plan ({shape}):\n{plan}")
+    except Exception as e:
+        print(f"Slow query explain failed ({shape}): {e}")
+        if use_savepoint:
+            try:
+                explain.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            except Exception:
+                pass
+    finally:
+        explain.close()
+
+
+def observe_pool_wait(seconds):
+    POOL_WAIT.observe(seconds)
+
+
+# ---------------------------------------------------------------------------
+# Route sureleri ve /metrics ciktisi
+
+def _gauges(prefix, help_text, stats):
+    lines = []
+    for key, value in sorted(stats.items()):
+        if not isinstance(value, (int, float)):
+            continue
+        value = int(value) if isinstance(value, bool) else value
+        name = f"{prefix}_{key}"
+        lines += [f"# HELP {name} {help_text} ({key}).", f"# TYPE {name} gauge", f"{name} {_number(value)}"]
+    return lines
+
+
+def render(extra_stats=None):
+    """Tum metrikleri Prometheus text (0.0.4) formatinda doner.
+
+    ``extra_stats``: ``{onek: (aciklama, istatistik sozlugu)}``; havuz/cache
+    gibi anlik degerler gauge olarak eklenir.
+    """
+    lines = []
+    for metric in (REQUEST_DURATION, QUERY_DURATION, QUERY_ROWS, QUERY_ERRORS, SLOW_QUERIES, POOL_WAIT):
+        lines += metric.render()
+    for prefix, (help_text, stats) in (extra_stats or {}).items():
+        lines += _gauges(prefix, help_text, stats)
+    return "\n".join(lines) + "\n"
+
+
+def _start_timer():
+    g._metrics_started = time.perf_counter()
+
+
+def _record_request(response):
+    started = g.pop("_metrics_started", None)
+    if started is not None:
+        REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            request.endpoint or "unmatched",
+            request.method,
+            str(response.status_code),
+        )
+    return response
+
+
+def init_app(app):
+    """Route bazli istek surelerini kaydeder; diger kancalardan once kaydedilmelidir."""
+    if not settings.METRICS_ENABLED:
+        return
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
@@ -0,0 +1,218 @@
+import math
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+from flask import g, has_request_context
+
+from utils import settings
+
+
+class DeadlineExceeded(Exception):
+    """Istek icin ayrilan sure paralel sorgular bitmeden doldugunda firlatilir."""
+
+
+_executor = None
+_executor_lock = threading.Lock()
+# Worker'larin ayni anda tuttugu havuz baglantilari; istek baglantilarina yer birakir
+_worker_slots = threading.BoundedSemaphore(settings.PARALLEL_MAX_CONNECTIONS)
+_stats_lock = threading.Lock()
+_stats = {"parallel_tasks": 0, "serial_fallback_tasks": 0}
+# Worker thread'lerinde: in_worker (ic ice paralellik yok) ve deadline
+_local = threading.local()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.PARALLEL_MAX_WORKERS, thread_name_prefix="db-parallel"
+                )
+    return _executor
+
+
+def current_deadline():
+    """Gecerli istegin (ya da worker gorevinin) bitmesi gereken ``time.monotonic`` ani."""
+    if has_request_context():
+        return g.get("_deadline")
+    return getattr(_local, "deadline", None)
+
+
+def remaining_ms():
+    """Calisan gorevde kalan sure (ms); gorev disinda ya da deadline yoksa None.
+
+    Worker'da gorevin deadline'i, istek thread'inde ``run_parallel``'in sirayla
+    calistirdigi gorevin deadline'i kullanilir. ``database.get_conn`` bunu
+    ``statement_timeout`` olarak uygular, boylece suresi dolan bir sorgu
+    sunucu tarafinda da iptal edilir.
+    """
+    if has_request_context():
+        deadline = g.get("_statement_deadline")
+    else:
+        deadline = getattr(_local, "deadline", None)
+    if deadline is None:
+        return None
+    return max(1, math.ceil((deadline - time.monotonic()) * 1000))
+
+
+def _deadline_error(error, deadline):
+    """Gorev hatasi deadline asimiysa ``DeadlineExceeded``, degilse None."""
+    # statement_timeout ile iptal edilen sorgu (SQLSTATE 57014) da deadline asimidir
+    if deadline is not None and (time.monotonic() >= deadline or getattr(error, "pgcode", None) == "57014"):
+        return DeadlineExceeded(f"Deadline exceeded: {error}")
+    return None
+
+
+def _reserve_workers(wanted: int) -> int:
+    """En fazla ``wanted`` worker icin baglanti yeri ayirir; ayrilan sayiyi doner.
+
+    Hem ``PARALLEL_MAX_CONNECTIONS`` semaforundan hem de havuzun o anki bos
+    kapasitesinden ayrilir. Ayrilamayan gorevler istek baglantisiyla sirayla
+    calisir; boylece havuz doluyken worker'lar ``checkout_timeout`` kadar beklemez.
+    """
+    from utils import database  # database bu modulu import eder
+
+    free = database.pool_available()
+    if not (has_request_context() and g.get("_db_conn") is not None):
+        free -= 1  # cagiran thread'in ilk gorevi de bir baglanti alacak
+    reserved = 0
+    while reserved < min(wanted, free) and _worker_slots.acquire(blocking=False):
+        reserved += 1
+    return reserved
+
+
+def _release_worker(_future=None):
+    _worker_slots.release()
+
+
+def _count(key, amount):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def stats():
+    """Paralel ve (kapasite yetmedigi icin) sirayla calisan gorev sayilari."""
+    with _stats_lock:
+        data = dict(_stats)
+    data["max_connections"] = settings.PARALLEL_MAX_CONNECTIONS
+    return data
+
+
+def _run_in_worker(fn, deadline):
+    _local.in_worker = True
+    _local.deadline = deadline
+    try:
+        return fn()
+    except Exception as e:
+        error = _deadline_error(e, deadline)
+        if error is not None:
+            raise error from e
+        raise
+    finally:
+        _local.deadline = None
+
+
+def run_parallel(tasks: dict, timeout=None):
+    """Birbirinden bagimsiz yardimci fonksiyonlari paralel calistirir.
+
+    ``tasks``: ``{isim: argumansiz fonksiyon}``; ``{isim: sonuc}`` doner.
+
+    - Ilk gorev cagiran thread'de (istek baglantisiyla) calisir, digerleri
+      sinirli thread havuzunda kendi havuz baglantilariyla calisir.
+    - Worker baglantisi ayrilamayan gorevler (havuz dolu ya da
+      ``PARALLEL_MAX_CONNECTIONS`` kullanimda) cagiran thread'de sirayla calisir.
+    - Bir gorev hata verirse bekleyenler iptal edilir ve ayni hata firlatilir.
+    - Istek deadline'i (ya da ``timeout``) dolarsa ``DeadlineExceeded``.
+    - Worker icinden cagrilirsa (ic ice) ya da kapaliysa gorevler sirayla calisir.
+    """
+    names = list(tasks)
+    deadline = current_deadline()
+    if timeout is not None:
+        deadline = min(filter(None, (deadline, time.monotonic() + timeout)))
+    if deadline is not None and deadline <= time.monotonic():
+        raise DeadlineExceeded("Request deadline already passed")
+
+    reserved = 0
+    if len(names) >= 2 and settings.PARALLEL_ENABLED and not getattr(_local, "in_worker", False):
+        reserved = _reserve_workers(len(names) - 1)
+    if reserved:
+        _count("parallel_tasks", reserved)
+    if len(names) > 1 + reserved:
+        _count("serial_fallback_tasks", len(names) - 1 - reserved)
+
+    # Son ``reserved`` gorev worker'lara, kalanlar sirayla bu thread'e
+    parallel_names = names[len(names) - reserved:] if reserved else []
+    serial_names = names[:len(names) - reserved]
+
+    def run_serial():
+        # Istek baglantisindaki sorgulara da kalan sure statement_timeout olarak uygulanir
+        in_request = has_request_context()
+        if in_request:
+            previous, g._statement_deadline = g.get("_statement_deadline"), deadline
+        try:
+            results = {}
+            for name in serial_names:
+                if deadline is not None and deadline <= time.monotonic():
+                    raise DeadlineExceeded(f"Deadline exceeded before '{name}'")
+                try:
+                    results[name] = tasks[name]()
+                except Exception as e:
+                    error = _deadline_error(e, deadline)
+                    if error is not None:
+                        raise error from e
+                    raise
+                # Hatayi kendisi yakalayip bos sonuc donen yardimcilar icin
+                if deadline is not None and deadline <= time.monotonic():
+                    raise DeadlineExceeded(f"Deadline exceeded during '{name}'")
+            return results
+        finally:
+            if in_request:
+                g._statement_deadline = previous
+
+    if not reserved:
+        return run_serial()
+
+    executor = _get_executor()
+    futures = {}
+    for name in parallel_names:
+        future = executor.submit(_run_in_worker, tasks[name], deadline)
+        # Iptal edilen (hic baslamayan) gorevde de yer geri verilir
+        future.add_done_callback(_release_worker)
+        futures[name] = future
+    try:
+        results = run_serial()
+    except Exception:
+        for future in futures.values():
+            future.cancel()
+        raise
+
+    remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+    done, pending = wait(futures.values(), timeout=remaining, return_when=FIRST_EXCEPTION)
+    for future in done:
+        if future.exception() is not None:
+            for other in pending:
+                other.cancel()
+            raise future.exception()
+    if pending:
+        for future in pending:
+            future.cancel()
+        late = [name for name, future in futures.items() if future in pending]
+        raise DeadlineExceeded(f"Deadline exceeded waiting for {', '.join(late)}")
+
+    results.update((name, future.result()) for name, future in futures.items())
+    return results
+
+
+def init_app(app):
+    """Her istege ``REQUEST_DEADLINE_SECONDS`` suresi tanir; asilirsa 503 doner."""
+
+    @app.before_request
+    def _set_deadline():
+        g._deadline = time.monotonic() + settings.REQUEST_DEADLINE_SECONDS
+
+    @app.errorhandler(DeadlineExceeded)
+    def _deadline_exceeded(error):
+        print(f"Request deadline exceeded: {error}")
+        return "The request took too long, please try again.", 503
@@ -0,0 +1,66 @@
+import json
+
+import click
+from flask.cli import with_appcontext
+
+import utils.database as database
+
+
+def _seq_scans(plan, relation):
+    """Plan agacinda ``relation`` uzerindeki Seq Scan dugumlerini toplar."""
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") == relation:
+        found.append(plan)
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child, relation))
+    return found
+
+
+def explain(cur, query, params):
+    cur.execute(f"EXPLAIN (FORMAT JSON) {query}", params)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def games_plan_cases(year: int):
+    """Games sayfasinin urettigi sorgu kombinasyonlari ve kulup eslesmesi sorgusu."""
+    for filter_year, favorites_only in ((year, False), (year, True), (None, True)):
+        for sort_by in ("date", "goal_diff_desc", "goal_diff_asc"):
+            label = f"year={filter_year} favorites={favorites_only} sort={sort_by}"
+            query = database.build_games_query(filter_year, favorites_only=favorites_only, sort_by=sort_by)
+            yield label, query
+    yield "head_to_head", (database.HEAD_TO_HEAD_SQL, {"low": 1, "high": 2})
+
+
+def check_games_plans(year: int, echo=print):
+    """Games sorgularinda ``games`` tablosu taranmiyorsa True doner.
+
+    ``enable_seqscan = off`` ile planlayici kullanilabilir bir index varsa onu
+    secmeye zorlanir; yine de Seq Scan cikiyorsa sorgu sargable degildir ya da
+    index eksiktir. Kucuk tablolarda maliyet tahmininden bagimsiz sonuc verir.
+    """
+    conn = database.get_pool().getconn()
+    ok = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL enable_seqscan = off")
+            for label, (query, params) in games_plan_cases(year):
+                scans = _seq_scans(explain(cur, query, params), "games")
+                status = "FAIL (Seq Scan on games)" if scans else "ok"
+                echo(f"{label}: {status}")
+                ok = ok and not scans
+        conn.rollback()
+    finally:
+        database.get_pool().putconn(conn)
+    return ok
+
+
+@click.command("check-plans")
+@click.option("--year", default=2023, show_default=True, help="Plani kontrol edilecek sezon yili.")
+@with_appcontext
+def check_plans_command(year):
+    """Games sorgularinin index kullandigini EXPLAIN ile dogrular."""
+    if not check_games_plans(year, echo=click.echo):
+        raise click.ClickException("Sequential scan on games detected")
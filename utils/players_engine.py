@@ -0,0 +1,196 @@
+import threading
+import time
+from datetime import date
+
+try:
+    import numpy as np
+except ImportError:  # opsiyonel bagimlilik; yoksa her zaman SQL kullanilir
+    np = None
+
+from utils import settings
+import utils.database as database
+
+# Snapshot bu tablolarin veri surumune baglidir; surum degisince yeniden kurulur
+TABLES = ("players", "clubs")
+OUTPUT_FIELDS = ("name", "date_of_birth", "sub_position", "foot", "height_in_cm", "country_of_citizenship", "club_name")
+
+
+def _codes(values, normalize=None):
+    """Kategorik kolonu (kodlar, {deger: kod}) olarak kodlar; NULL -> -1."""
+    normalized = [normalize(v) if normalize and v is not None else v for v in values]
+    categories = {v: i for i, v in enumerate(sorted({v for v in normalized if v is not None}))}
+    codes = np.fromiter((categories.get(v, -1) for v in normalized), dtype=np.int16, count=len(normalized))
+    return codes, categories
+
+
+class PlayersEngine:
+    """Oyuncu listesinin bellek ici, kolon bazli kopyasi.
+
+    - ``foot`` (kucuk harfe cevrilmis) ve ``sub_position`` kategorik kodlardir,
+      dogum tarihi gun sayisi (``date.toordinal``), boy float (NULL -> NaN).
+    - ``PLAYER_SORTS``'taki her siralama icin permutasyon onceden hesaplanir;
+      NULL'lar SQL'deki gibi en sonda, esitlikte ``player_id`` ayni yonde.
+    - Filtreler vektorel boolean maskelerle uygulanir; sonuc bir sayfa ve
+      kesin toplamdir.
+    """
+
+    def __init__(self, rows, versions):
+        self.versions = versions
+        self.size = len(rows)
+        columns = list(zip(*rows)) if rows else [()] * (len(OUTPUT_FIELDS) + 1)
+        ids, names, dobs, positions, feet, heights, countries, clubs = columns
+
+        self.player_id = np.fromiter(ids, dtype=np.int64, count=self.size)
+        self.dob_null = np.fromiter((d is None for d in dobs), dtype=bool, count=self.size)
+        self.dob = np.fromiter((d.toordinal() if d else 0 for d in dobs), dtype=np.int64, count=self.size)
+        self.height_null = np.fromiter((h is None for h in heights), dtype=bool, count=self.size)
+        self.height = np.fromiter((h if h is not None else 0.0 for h in heights), dtype=np.float64, count=self.size)
+        self.foot, self.foot_codes = _codes(feet, str.lower)
+        self.position, self.position_codes = _codes(positions)
+        self.output = {
+            field: np.array(values, dtype=object)
+            for field, values in zip(OUTPUT_FIELDS, (names, dobs, positions, feet, heights, countries, clubs))
+        }
+
+        # Satirlar ``ORDER BY name, player_id`` sirasinda yuklenir: sira = isim rank'i
+        sort_values = {
+            "name": (np.arange(self.size, dtype=np.int64), np.zeros(self.size, dtype=bool)),
+            "date_of_birth": (self.dob, self.dob_null),
+            "height_in_cm": (self.height, self.height_null),
+        }
+        self.orders = {}
+        for sort_key, (_, field, direction, _) in database.PLAYER_SORTS.items():
+            if field not in sort_values:
+                continue  # relevance: arama SQL'e birakilir
+            values, nulls = sort_values[field]
+            sign = -1 if direction == "DESC" else 1
+            # lexsort son anahtara gore birincil siralar: NULL'lar sonda, sonra deger, sonra id
+            self.orders[sort_key] = np.lexsort((sign * self.player_id, sign * values, nulls))
+
+    def _mask(self, min_age, max_age, feet, positions):
+        """``database._players_filter`` ile ayni kosullar; filtre yoksa None."""
+        mask = None
+
+        def both(condition):
+            return condition if mask is None else mask & condition
+
+        born_after, born_on_or_before = database.age_to_dob_range(min_age, max_age)
+        if born_on_or_before is not None:
+            mask = both(~self.dob_null & (self.dob <= born_on_or_before.toordinal()))
+        if born_after is not None:
+            mask = both(~self.dob_null & (self.dob > born_after.toordinal()))
+        if feet:
+            codes = [self.foot_codes[f.lower()] for f in feet if f != "None" and f.lower() in self.foot_codes]
+            if "None" in feet:
+                codes.append(-1)
+            if codes or any(f != "None" for f in feet):
+                mask = both(np.isin(self.foot, codes))
+        if positions and "All" not in positions:
+            codes = [self.position_codes[p] for p in positions if p in self.position_codes]
+            mask = both(np.isin(self.position, codes))
+        return mask
+
+    def query(self, page=1, per_page=100, min_age=None, max_age=None, feet=None, positions=None, sort_option="name_asc"):
+        """``(oyuncular, toplam, False)`` doner; satirlar SQL yoluyla ayni alanlari tasir."""
+        sort_key = sort_option if sort_option in self.orders else "name_asc"
+        order = self.orders[sort_key]
+        mask = self._mask(min_age, max_age, feet, positions)
+        selected = order if mask is None else order[mask[order]]
+
+        offset = max(page - 1, 0) * per_page
+        indices = selected[offset:offset + per_page]
+        today = date.today()
+        players = []
+        for i, player_id in zip(indices.tolist(), self.player_id[indices].tolist()):
+            row = {"player_id": player_id}
+            row.update((field, column[i]) for field, column in self.output.items())
+            row["age"] = database.age_on(row["date_of_birth"], today) if row["date_of_birth"] else None
+            players.append(row)
+        return players, int(selected.size), False
+
+
+_engine = None
+_built_at = None
+_build_seconds = None
+_building = False
+_lock = threading.Lock()
+
+
+def _current_versions():
+    known = database.get_dataset_versions()
+    return tuple(known.get(table, (0, None))[0] for table in TABLES)
+
+
+def build():
+    """Snapshot'i veritabanindan kurar ve atomik olarak yerine koyar."""
+    global _engine, _built_at, _build_seconds
+    started = time.perf_counter()
+    # Surum once okunur: kurulum sirasinda ingest olursa bir sonraki istek yeniden kurar
+    versions = _current_versions()
+    rows = database.get_players_snapshot()
+    if rows is None:
+        return None
+    engine = PlayersEngine(rows, versions)
+    _engine, _built_at, _build_seconds = engine, time.time(), time.perf_counter() - started
+    return engine
+
+
+def _build_in_background():
+    global _building
+    try:
+        build()
+    except Exception as e:
+        print(f"Players engine error: {e}")
+    finally:
+        with _lock:
+            _building = False
+
+
+def current():
+    """Guncel snapshot'i doner; yoksa ya da eskiyse arka planda kurar ve None doner."""
+    global _building
+    engine = _engine
+    if engine is not None and engine.versions == _current_versions():
+        return engine
+    with _lock:
+        if _building:
+            return None
+        _building = True
+    threading.Thread(target=_build_in_background, name="players-engine", daemon=True).start()
+    return None
+
+
+def enabled():
+    return settings.PLAYERS_ENGINE == "numpy" and np is not None
+
+
+def get_all_players(page=1, per_page=100, min_age=None, max_age=None, feet=None, positions=None, sort_option="name_asc", search_query=None, cursor=None, known_total=None):
+    """``database.get_all_players`` ile ayni imza ve sonuc.
+
+    ``PLAYERS_ENGINE=numpy`` iken aramasiz istekler bellekteki snapshot'tan
+    cevaplanir. Arama (trigram benzerligi), kapali motor ya da henuz
+    kurulmamis/eskimis snapshot durumunda SQL yolu kullanilir.
+    """
+    engine = current() if enabled() and not search_query else None
+    if engine is None:
+        return database.get_all_players(
+            page, per_page, min_age, max_age, feet, positions, sort_option, search_query,
+            cursor=cursor, known_total=known_total,
+        )
+    try:
+        return engine.query(page, per_page, min_age, max_age, feet, positions, sort_option)
+    except ValueError as e:
+        # Tarih araligina sigmayan yas siniri: SQL yolu gibi bos sonuc
+        print(f"Players engine error: {e}")
+        return [], 0, False
+
+
+def status():
+    engine = _engine
+    return {
+        "enabled": enabled(),
+        "ready": engine is not None,
+        "rows": engine.size if engine else 0,
+        "built_at": _built_at,
+        "build_seconds": _build_seconds,
+    }
@@ -0,0 +1,213 @@
+import threading
+import time
+from collections import deque
+
+import psycopg2
+
+
+class PoolExhaustedError(Exception):
+    """Havuzdan belirlenen sure icinde baglanti alinamadiginda firlatilir."""
+
+
+class ConnectionPool:
+    """Thread-safe PostgreSQL baglanti havuzu.
+
+    - ``min_size`` kadar baglanti acik tutulur, ``max_size`` asilmaz.
+    - ``max_idle`` saniyeden uzun bosta kalan baglantilar kapatilir (min_size korunur).
+    - ``max_lifetime`` saniyeden yasli baglantilar yenilenir.
+    - Checkout sirasinda bosta kalmis baglantilar ``SELECT 1`` ile kontrol edilir.
+    """
+
+    def __init__(
+        self,
+        dsn,
+        min_size=1,
+        max_size=10,
+        max_idle=300.0,
+        max_lifetime=3600.0,
+        checkout_timeout=10.0,
+        ping_after=5.0,
+        connection_factory=None,
+    ):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size (min_size <= max_size, max_size >= 1)")
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+        self.connection_factory = connection_factory
+
+        self._lock = threading.Condition()
+        self._idle = deque()  # (conn, created_at, last_used_at)
+        self._in_use = {}  # id(conn) -> (conn, created_at)
+        self._pending = 0  # lock disinda acilmakta olan baglantilar
+        self._closed = False
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "exhausted_waits": 0,
+            "exhausted_timeouts": 0,
+            "failed_pings": 0,
+            "wait_seconds_total": 0.0,
+        }
+
+        for _ in range(min_size):
+            self._idle.append(self._new_entry())
+
+    # ------------------------------------------------------------------
+    def _new_entry(self):
+        conn = psycopg2.connect(self.dsn, connection_factory=self.connection_factory)
+        now = time.monotonic()
+        with self._lock:
+            self._stats["connections_created"] += 1
+        return conn, now, now
+
+    def _discard(self, conn):
+        self._stats["connections_closed"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_alive(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            with self._lock:
+                self._stats["failed_pings"] += 1
+            return False
+
+    def _expired(self, created, last_used, now):
+        if self.max_lifetime and now - created > self.max_lifetime:
+            return True
+        return bool(self.max_idle) and now - last_used > self.max_idle
+
+    def _prune_idle(self, now):
+        """Bosta cok kalan ya da cok yaslanan baglantilari kapatir (lock altinda)."""
+        total = len(self._idle) + len(self._in_use)
+        keep = deque()
+        while self._idle:
+            conn, created, last_used = self._idle.popleft()
+            if total > self.min_size and self._expired(created, last_used, now):
+                self._discard(conn)
+                total -= 1
+            else:
+                keep.append((conn, created, last_used))
+        self._idle = keep
+
+    # ------------------------------------------------------------------
+    def getconn(self):
+        """Havuzdan bir baglanti alir; havuz doluysa ``checkout_timeout`` kadar bekler."""
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout
+        waited = False
+        while True:
+            entry = None
+            with self._lock:
+                while entry is None:
+                    if self._closed:
+                        raise PoolExhaustedError("Connection pool is closed")
+                    self._prune_idle(time.monotonic())
+
+                    if self._idle:
+                        entry = self._idle.pop()
+                    elif len(self._in_use) + self._pending < self.max_size:
+                        self._pending += 1
+                        entry = False  # yeni baglanti lock disinda acilacak
+                        break
+                    else:
+                        if not waited:
+                            waited = True
+                            self._stats["exhausted_waits"] += 1
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._stats["exhausted_timeouts"] += 1
+                            raise PoolExhaustedError(
+                                f"No connection available within {self.checkout_timeout}s "
+                                f"(max_size={self.max_size})"
+                            )
+                        self._lock.wait(remaining)
+
+            # Ag islemleri (connect / ping) lock disinda yapilir
+            if entry is False:
+                try:
+                    conn, created, last_used = self._new_entry()
+                finally:
+                    with self._lock:
+                        self._pending -= 1
+                        self._lock.notify()
+            else:
+                conn, created, last_used = entry
+                if not self._is_alive(conn, last_used):
+                    with self._lock:
+                        self._discard(conn)
+                    continue
+
+            with self._lock:
+                self._in_use[id(conn)] = (conn, created)
+                self._stats["checkouts"] += 1
+                self._stats["wait_seconds_total"] += time.monotonic() - started
+            return conn
+
+    def putconn(self, conn, close=False):
+        """Baglantiyi havuza geri koyar; acik transaction varsa geri alinir."""
+        if not close and not conn.closed:
+            try:
+                if conn.status != psycopg2.extensions.STATUS_READY:
+                    conn.rollback()
+            except Exception:
+                close = True
+
+        with self._lock:
+            entry = self._in_use.pop(id(conn), None)
+            if entry is None:
+                raise ValueError("Connection does not belong to this pool")
+            created = entry[1]
+
+            now = time.monotonic()
+            if close or conn.closed or self._closed or self._expired(created, now, now):
+                self._discard(conn)
+            else:
+                self._idle.append((conn, created, now))
+            self._lock.notify()
+
+    def available(self):
+        """Beklemeden alinabilecek baglanti sayisi (bosta + acilabilecek)."""
+        with self._lock:
+            return self.max_size - len(self._in_use) - self._pending
+
+    def closeall(self):
+        with self._lock:
+            self._closed = True
+            while self._idle:
+                self._discard(self._idle.popleft()[0])
+            for conn, _ in list(self._in_use.values()):
+                self._discard(conn)
+            self._in_use.clear()
+            self._lock.notify_all()
+
+    def stats(self):
+        """Havuz durum ve tukenme metriklerini doner."""
+        with self._lock:
+            data = dict(self._stats)
+            data.update(
+                {
+                    "size": len(self._idle) + len(self._in_use),
+                    "idle": len(self._idle),
+                    "in_use": len(self._in_use),
+                    "min_size": self.min_size,
+                    "max_size": self.max_size,
+                }
+            )
+            return data
@@ -1,10 +1,32 @@
+import time
 from datetime import datetime
-from flask import render_template, request, jsonify, abort
+from flask import render_template, request, jsonify, abort, current_app, stream_template
 import utils.database as database
+from utils import cache, export, metrics, parallel, players_engine, settings, suggest
 
 def base_page():
     return render_template('base.html')
 
+TRANSFER_SORT_OPTIONS = {
+    "fee_asc": ("fee", "asc"),
+    "fee_desc": ("fee", "desc"),
+    "value_asc": ("value", "asc"),
+    "value_desc": ("value", "desc"),
+    "date_asc": ("date", "asc"),
+    "date_desc": ("date", "desc"),
+}
+
+
+def _parse_money(val):
+    if val is None or val == "":
+        return None
+    cleaned = val.replace(".", "").replace(",", ".")
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
 def transfers_page():
     submitted = request.args.get("submitted")
     season = request.args.get("season")
@@ -14,50 +36,33 @@ def transfers_page():
     from_league = request.args.get("from_league")
     to_league = request.args.get("to_league")
     page = request.args.get("page", default=1, type=int)
+    cursor = request.args.get("cursor")
+    # Ilk sayfada hesaplanan toplam, sayfalama linkleriyle geri gelir (veri surumuyle)
+    known_total = database.parse_total_hint(request.args.get("total"), database.TRANSFER_LIST_TABLES)
     per_page = 20
 
-    # Sezonlar kısaltılmış formatta (ör: 24/25) tutuluyor
-    seasons = [f"{str(y)[-2:]}/{str(y+1)[-2:]}" for y in range(2025, 2000, -1)]
-
     def _format_league_name(name: str) -> str:
         if not name:
             return ""
         return name.replace("-", " ").replace("_", " ").title()
 
-    leagues_raw = database.get_transfer_leagues()
-    leagues = [
-        {
-            "value": row.get("name"),
-            "label": _format_league_name(row.get("name")),
-            "country": row.get("country_name"),
-        }
-        for row in leagues_raw
-    ]
-
-    def _parse_money(val):
-        if val is None or val == "":
-            return None
-        cleaned = val.replace(".", "").replace(",", ".")
-        try:
-            return float(cleaned)
-        except ValueError:
-            return None
-
-    sort_map = {
-        "fee_asc": ("fee", "asc"),
-        "fee_desc": ("fee", "desc"),
-        "value_asc": ("value", "asc"),
-        "value_desc": ("value", "desc"),
-        "date_asc": ("date", "asc"),
-        "date_desc": ("date", "desc"),
-    }
-    sort_by, sort_dir = sort_map.get(sort_option, ("date", "desc"))
+    sort_by, sort_dir = TRANSFER_SORT_OPTIONS.get(sort_option, ("date", "desc"))
 
     transfers = []
     total_results = 0
+    total_is_estimate = False
     current_page = page if page and page > 0 else 1
+    # Onceki/sonraki sayfa token'i varsa sayfa numarasi token'dan gelir
+    keyset = database.decode_cursor(cursor, f"{sort_by}_{sort_dir}")
+    if keyset:
+        current_page = keyset["p"]
+    else:
+        cursor = None
+
+    # Listeler ve transfer sorgusu (kendi COUNT'u dahil) paralel calisir
+    tasks = {}
     if submitted:
-        transfers_raw, total_results = database.get_transfers(
+        tasks["transfers"] = lambda: database.get_transfers(
             season=season,
             min_fee=_parse_money(min_fee_raw),
             max_fee=_parse_money(max_fee_raw),
@@ -67,21 +72,38 @@ def transfers_page():
             per_page=per_page,
             from_league=from_league,
             to_league=to_league,
+            cursor=cursor,
+            known_total=known_total,
         )
-        def _calc_age(dob):
-            if not dob:
-                return None
-            today = datetime.utcnow().date()
-            return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+    tasks["seasons"] = database.get_transfer_seasons
+    tasks["leagues"] = database.get_transfer_leagues
+    results = parallel.run_parallel(tasks)
+
+    # Sezonlar kısaltılmış formatta (ör: 24/25) tutuluyor
+    seasons = results["seasons"] or [
+        f"{str(y)[-2:]}/{str(y+1)[-2:]}" for y in range(2025, 2000, -1)
+    ]
+
+    leagues_raw = results["leagues"]
+    leagues = [
+        {
+            "value": row.get("name"),
+            "label": _format_league_name(row.get("name")),
+            "country": row.get("country_name"),
+        }
+        for row in leagues_raw
+    ]
 
-        transfers = []
-        for t in transfers_raw:
-            t["age"] = _calc_age(t.get("date_of_birth"))
-            transfers.append(t)
+    if submitted:
+        # Yas alani database.get_transfers cache'ten sonra ekler (cache'lenmez)
+        transfers, total_results, total_is_estimate = results["transfers"]
 
     total_pages = 0
     if submitted and total_results:
         total_pages = (total_results + per_page - 1) // per_page
+    prev_cursor, next_cursor = database.transfer_page_tokens(
+        transfers, sort_by, sort_dir, current_page, total_pages
+    )
 
     return render_template(
         'transfers.html',
@@ -91,7 +113,11 @@ def transfers_page():
         page=current_page,
         total_pages=total_pages,
         total_results=total_results,
+        total_is_estimate=total_is_estimate,
+        total_param=database.total_hint(total_results, total_is_estimate, database.TRANSFER_LIST_TABLES),
         per_page=per_page,
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
         filters={
             "season": season or "",
             "min_fee": min_fee_raw or "",
@@ -104,6 +130,27 @@ def transfers_page():
     )
 
 
+def transfers_export():
+    """Transfers sayfasındaki filtrelerle tüm transferleri CSV/NDJSON olarak akıtır."""
+    sort_by, sort_dir = TRANSFER_SORT_OPTIONS.get(request.args.get("sort"), ("date", "desc"))
+    rows = database.iter_transfers(
+        season=request.args.get("season") or None,
+        min_fee=_parse_money(request.args.get("min_fee")),
+        max_fee=_parse_money(request.args.get("max_fee")),
+        sort_by=sort_by,
+        sort_dir=sort_dir,
+        from_league=request.args.get("from_league") or None,
+        to_league=request.args.get("to_league") or None,
+    )
+    return export.export_response(rows, export.TRANSFER_COLUMNS, "transfers")
+
+
+def analytics_page():
+    season = request.args.get("season") or None
+    seasons = database.get_transfer_seasons()
+    if season not in seasons:
+        season = None
+    return render_template("analytics.html", seasons=seasons, **database.get_transfer_analytics(season))
 
 
 # utils/router.py içindeki players_page fonksiyonunu GÜNCELLE:
@@ -117,25 +164,51 @@ def players_page():
     max_age = request.args.get('max_age', type=int)
     selected_feet = request.args.getlist('foot')
     selected_positions = request.args.getlist('position')
-    sort_option = request.args.get('sort', 'name_asc')
-    
     # YENİ: Arama sorgusunu al
     search_query = request.args.get('search', '')
+
+    # Arama varken varsayılan sıralama benzerlik skorudur
+    sort_option = request.args.get('sort') or ('relevance' if search_query else 'name_asc')
+    if sort_option == 'relevance' and not search_query:
+        sort_option = 'name_asc'
+
+    # Onceki/sonraki oklari keyset token'i tasir; sayfa numarasi token'dan gelir
+    cursor = request.args.get('cursor')
+    known_total = database.parse_total_hint(request.args.get('total'), database.PLAYER_LIST_TABLES)
+    keyset = database.decode_cursor(cursor, sort_option)
+    if keyset:
+        page = keyset["p"]
+    else:
+        cursor = None
     
-    # Veritabanına search_query'i de gönderiyoruz
-    players, total_count = database.get_all_players(
-        page, per_page, min_age, max_age, selected_feet, selected_positions, sort_option, search_query
+    # Birbirinden bagimsiz sorgular paralel calisir; sure en yavasi kadar olur
+    results = parallel.run_parallel(
+        {
+            # Veritabanına search_query'i de gönderiyoruz
+            "players": lambda: players_engine.get_all_players(
+                page, per_page, min_age, max_age, selected_feet, selected_positions, sort_option, search_query,
+                cursor=cursor, known_total=known_total,
+            ),
+            "age_limits": database.get_age_limits,
+            "positions": database.get_all_positions,
+        }
     )
-    
-    global_min_age, global_max_age = database.get_age_limits()
-    all_positions = database.get_all_positions()
+    players, total_count, total_is_estimate = results["players"]
+    global_min_age, global_max_age = results["age_limits"]
+    all_positions = results["positions"]
     total_pages = (total_count + per_page - 1) // per_page
+    prev_cursor, next_cursor = database.player_page_tokens(players, sort_option, page, total_pages)
     
     return render_template(
         'players.html', 
         players=players, 
         current_page=page, 
         total_pages=total_pages,
+        total_count=total_count,
+        total_is_estimate=total_is_estimate,
+        total_param=database.total_hint(total_count, total_is_estimate, database.PLAYER_LIST_TABLES),
+        prev_cursor=prev_cursor,
+        next_cursor=next_cursor,
         selected_min_age=min_age,
         selected_max_age=max_age,
         global_min_age=global_min_age,
@@ -151,12 +224,25 @@ def players_page():
 
 def player_profile_page(player_id: int):
     """Single player profile page."""
-    player = database.get_player_by_id(player_id)
+    player = database.get_player_profile(player_id)
     if not player:
         abort(404)
     return render_template("player_profile.html", player=player)
 
 
+def _buffered(chunks, min_size: int = 16384):
+    """Jinja'nin cok sayida kucuk parcasini ~16KB'lik parcalar halinde gonderir."""
+    buffer, size = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= min_size:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+
+
 def games_page():
     current_year = datetime.now().year
     years = list(range(current_year, 2011, -1))
@@ -167,33 +253,56 @@ def games_page():
     sort_option = request.args.get("sort", "date")
     if sort_option not in ("date", "goal_diff_desc", "goal_diff_asc"):
         sort_option = "date"
-    games = []
+    # stream=1: tüm sonuçlar sayfalanmadan, server-side cursor'dan akıtılarak render edilir
+    stream = str(request.args.get("stream")).lower() in ("1", "true", "yes")
+    page = max(request.args.get("page", default=1, type=int) or 1, 1)
+    per_page = settings.GAMES_PER_PAGE
 
-    if favorite_only:
-        if selected_year and 1900 <= selected_year <= current_year:
-            games = database.get_favorite_games(selected_year, sort_by=sort_option)
-        else:
-            selected_year = None
-            games = database.get_favorite_games(sort_by=sort_option)
-    elif selected_year and 1900 <= selected_year <= current_year:
-        games = database.get_games_by_year(selected_year, sort_by=sort_option)
-
-    # Gol farkı bilgisini önden hesaplayıp front-end'de filtreleme için saklıyoruz
-    for game in games:
-        if game.get("goal_difference") is None:
-            home_goals = game.get("home_club_goals")
-            away_goals = game.get("away_club_goals")
-            if home_goals is not None and away_goals is not None:
-                game["goal_difference"] = abs(home_goals - away_goals)
+    if not (selected_year and 1900 <= selected_year <= current_year):
+        selected_year = None
+    show_listing = favorite_only or selected_year is not None
 
-    return render_template(
-        'games.html',
+    context = dict(
         years=years,
         selected_year=selected_year,
-        games=games,
         favorite_only=favorite_only,
         sort_option=sort_option,
+        show_listing=show_listing,
+        streamed=stream,
+        current_page=page,
+        total_pages=0,
+        total_count=None,
+    )
+
+    if show_listing and stream:
+        games = database.iter_games(selected_year, favorite_only, sort_by=sort_option)
+        return current_app.response_class(
+            _buffered(stream_template('games.html', games=games, **context)),
+            mimetype="text/html",
+        )
+
+    games = []
+    if show_listing:
+        games, total_count = database.get_games_page(
+            selected_year, favorite_only, sort_by=sort_option, page=page, per_page=per_page
+        )
+        context["total_count"] = total_count
+        context["total_pages"] = (total_count + per_page - 1) // per_page
+
+    return render_template('games.html', games=games, **context)
+
+def games_export():
+    """Games filtreleriyle (year, favorites, sort) tüm maçları CSV/NDJSON olarak akıtır."""
+    selected_year = request.args.get("year", type=int)
+    # Akis basladiktan sonra hata donulemez; gecersiz yil once reddedilir
+    if selected_year is not None and not 1900 <= selected_year <= datetime.now().year:
+        return f"year must be between 1900 and {datetime.now().year}", 400
+    favorite_only = str(request.args.get("favorites")).lower() in ("1", "true", "yes")
+    sort_option = request.args.get("sort", "date")
+    rows = database.iter_games(
+        selected_year, favorite_only, sort_by=sort_option, itersize=settings.EXPORT_ITERSIZE
     )
+    return export.export_response(rows, export.GAME_COLUMNS, "games")
 
 def update_game_favorite(game_id: int):
     """Bir maçı favori olarak işaretler."""
@@ -230,9 +339,26 @@ def competitions_page():
         selected_is_major_league=is_major_league_param,
     )
 
+def competition_table_page(competition_id: str):
+    """Bir ligin secilen sezondaki puan durumu (varsayilan: en son sezon)."""
+    competition = database.get_competition(competition_id)
+    if not competition:
+        abort(404)
+    seasons = database.get_competition_seasons(competition_id)
+    season = request.args.get("season")
+    if season not in seasons:
+        season = seasons[0] if seasons else None
+    table = database.get_standings(competition_id, season) if season else []
+    return render_template(
+        "competition_table.html",
+        competition=competition,
+        seasons=seasons,
+        season=season,
+        table=table,
+    )
+
 def clubs_page():
     """Kulüpler sayfasını render eder ve veritabanından kulüp verilerini çeker."""
-    filters_metadata = database.get_club_filter_metadata()
 
     search_query = (request.args.get("search") or "").strip()
     league_filter = (request.args.get("league") or "").strip()
@@ -270,9 +396,10 @@ def clubs_page():
         ]
     )
 
-    clubs = []
+    # Filtre sinirlari ve kulup listesi paralel cekilir
+    tasks = {}
     if filter_applied:
-        clubs = database.get_clubs_filtered(
+        tasks["clubs"] = lambda: database.get_clubs_filtered(
             search=search_query or None,
             league=league_filter or None,
             min_age=selected_min_age,
@@ -280,6 +407,10 @@ def clubs_page():
             min_capacity=selected_min_capacity,
             max_capacity=selected_max_capacity,
         )
+    tasks["metadata"] = database.get_club_filter_metadata
+    results = parallel.run_parallel(tasks)
+    clubs = results.get("clubs", [])
+    filters_metadata = results["metadata"]
 
     return render_template(
         "clubs.html",
@@ -296,10 +427,72 @@ def clubs_page():
         selected_min_capacity=selected_min_capacity,
         selected_max_capacity=selected_max_capacity,
         filter_applied=filter_applied,
+        squad_batch_size=settings.SQUAD_BATCH_MAX_CLUBS,
     )
 
 
+def head_to_head_page(club_a: int, club_b: int):
+    """Iki kulup arasindaki maclar ve ozet; tek SQL sorgusu, cift bazinda cache'li."""
+    if club_a == club_b:
+        abort(404)
+    h2h = database.get_head_to_head(club_a, club_b)
+    if not h2h:
+        abort(404)
+    return render_template("head_to_head.html", **h2h)
+
+
 def club_players_api(club_id: int):
     """Secilen kulup icin oyuncu listesini JSON olarak doner."""
     players = database.get_players_by_club(club_id)
     return jsonify({"players": players, "count": len(players)})
+
+
+def club_squads_api():
+    """Birden fazla kulubun kadrosunu tek istekte doner: ``?ids=1,2,3``."""
+    raw_ids = ",".join(request.args.getlist("ids")).split(",")
+    try:
+        club_ids = list(dict.fromkeys(int(i) for i in raw_ids if i.strip()))
+    except ValueError:
+        return jsonify({"error": "ids must be integers"}), 400
+    if len(club_ids) > settings.SQUAD_BATCH_MAX_CLUBS:
+        return jsonify({"error": f"At most {settings.SQUAD_BATCH_MAX_CLUBS} clubs per request"}), 400
+
+    squads = database.get_players_by_clubs(club_ids)
+    return jsonify(
+        {
+            "squads": {
+                str(club_id): {"players": squads.get(club_id, []), "count": len(squads.get(club_id, []))}
+                for club_id in club_ids
+            }
+        }
+    )
+
+
+def suggest_api():
+    """Oyuncu, kulup ve lig isimleri icin type-ahead onerileri (JSON)."""
+    query = (request.args.get("q") or "").strip()
+    limit = request.args.get("limit", default=8, type=int)
+    limit = max(1, min(limit or 8, 20))
+    started = time.perf_counter()
+    results = suggest.suggest(query, limit) if query else []
+    took_ms = round((time.perf_counter() - started) * 1000, 3)
+    if results is None:
+        return jsonify({"results": [], "ready": False, "took_ms": took_ms})
+    return jsonify({"results": results, "ready": True, "took_ms": took_ms})
+
+
+def metrics_page():
+    """Prometheus text formatinda sorgu, istek, havuz ve cache metrikleri."""
+    if not settings.METRICS_ENABLED:
+        abort(404)
+    body = metrics.render(
+        {
+            "databros_pool": ("Connection pool state", database.pool_stats()),
+            "databros_parallel": ("Parallel query tasks", parallel.stats()),
+            "databros_cache": ("Reference data cache", cache.stats()),
+            "databros_entity_cache": ("Per-id cache (profiles, squads, head-to-head)", cache.entity_stats()),
+            "databros_result_cache": ("Listing result cache", cache.result_stats()),
+            "databros_players_engine": ("In-memory players engine", players_engine.status()),
+        }
+    )
+    return current_app.response_class(body, mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,24 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+try:  # opsiyonel: kuruluysa ~5-10x daha hizli JSON
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_default(value):
+    """RealDictCursor'un dondurdugu date/datetime ve Decimal degerlerini JSON'a cevirir."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    """Kompakt UTF-8 JSON; orjson varsa onu kullanir."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=json_default)
+    return json.dumps(payload, default=json_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
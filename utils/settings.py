@@ -1,2 +1,122 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
 DEBUG = True
-PORT = 8080
\ No newline at end of file
+PORT = 8080
+
+# PostgreSQL baglanti havuzu
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+# Bu sureden uzun bosta kalan baglantilar kapatilir (saniye)
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", "300"))
+# Bu sureden yasli baglantilar yenilenir (saniye)
+DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+# Havuz doluyken bir baglanti icin en fazla bu kadar beklenir (saniye)
+DB_POOL_CHECKOUT_TIMEOUT = float(os.getenv("DB_POOL_CHECKOUT_TIMEOUT", "10"))
+# Bu sureden uzun bosta kalan baglanti checkout sirasinda SELECT 1 ile kontrol edilir
+DB_POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "5"))
+
+# Istek icindeki bagimsiz sorgular paralel calistirilir (utils/parallel.py).
+# Istek thread'i kendi baglantisini tutarken worker'lar havuzdan ek baglanti alir.
+# Worker'larin ayni anda tutabilecegi baglanti sayisi PARALLEL_MAX_CONNECTIONS ile
+# sinirlidir (varsayilan havuzun yarisi); havuzda bos yer yoksa gorevler istek
+# baglantisiyla sirayla calisir. Boyutlandirma: DB_POOL_MAX_SIZE >= eszamanli
+# istek sayisi + PARALLEL_MAX_CONNECTIONS ise paralellik yuk altinda da korunur.
+PARALLEL_ENABLED = os.getenv("PARALLEL_ENABLED", "1") == "1"
+PARALLEL_MAX_WORKERS = int(os.getenv("PARALLEL_MAX_WORKERS", "4"))
+PARALLEL_MAX_CONNECTIONS = int(os.getenv("PARALLEL_MAX_CONNECTIONS", str(max(1, DB_POOL_MAX_SIZE // 2))))
+# Bu sureyi asan istek 503 doner; worker sorgularina statement_timeout olarak uygulanir
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "10"))
+
+# /metrics: sorgu/istek sureleri, satir sayilari, havuz bekleme sureleri (utils/metrics.py)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Bu sureyi (ms) asan sorgular parametreleriyle loglanir; 0 kapatir
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# Yavas SELECT'ler icin EXPLAIN (ANALYZE, BUFFERS) planini da logla (sorgu tekrar calisir)
+SLOW_QUERY_EXPLAIN = os.getenv("SLOW_QUERY_EXPLAIN", "0") == "1"
+
+# Sayfalanan listelerde toplam sayi (COUNT) stratejisi
+COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", "300"))
+COUNT_CACHE_MAX_ENTRIES = int(os.getenv("COUNT_CACHE_MAX_ENTRIES", "1024"))
+# Filtresiz sonuc bu satir sayisini asarsa planlayici tahmini gosterilir
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv("COUNT_ESTIMATE_THRESHOLD", "100000"))
+
+# /players listesi: "sql" ya da "numpy" (bellek ici kolon motoru, utils/players_engine.py).
+# numpy yuklu degilse, arama varsa ya da snapshot henuz hazir degilse SQL kullanilir.
+PLAYERS_ENGINE = os.getenv("PLAYERS_ENGINE", "sql")
+
+# Games sayfasi: sayfa boyutu ve akis (stream) modunda cursor'dan bir seferde cekilen satir
+GAMES_PER_PAGE = int(os.getenv("GAMES_PER_PAGE", "60"))
+GAMES_STREAM_ITERSIZE = int(os.getenv("GAMES_STREAM_ITERSIZE", "500"))
+
+# /transfers/export ve /games/export
+EXPORT_ITERSIZE = int(os.getenv("EXPORT_ITERSIZE", "2000"))
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", "65536"))
+EXPORT_GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "6"))
+
+# /api/v1 sayfa boyutu (limit parametresi)
+API_DEFAULT_LIMIT = int(os.getenv("API_DEFAULT_LIMIT", "50"))
+API_MAX_LIMIT = int(os.getenv("API_MAX_LIMIT", "500"))
+
+# /clubs/players?ids=... tek istekte en fazla bu kadar kulup kadrosu
+SQUAD_BATCH_MAX_CLUBS = int(os.getenv("SQUAD_BATCH_MAX_CLUBS", "100"))
+
+# Referans veri cache'i (lig/pozisyon/ulke listeleri, filtre sinirlari, puan durumlari)
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+# Id basina sonuclar (oyuncu profilleri, kulup kadrolari, ikili maclar) icin ayri LRU
+ENTITY_CACHE_MAX_ENTRIES = int(os.getenv("ENTITY_CACHE_MAX_ENTRIES", "4096"))
+CACHE_DEFAULT_TTL = float(os.getenv("CACHE_DEFAULT_TTL", "600"))
+# Yalnizca veri yuklenince degisen listeler icin daha uzun TTL
+CACHE_REFERENCE_TTL = float(os.getenv("CACHE_REFERENCE_TTL", "3600"))
+
+# /players, /transfers, /games liste sonuclari (sayfa + toplam), normalize filtre anahtariyla.
+# Bellek butcesi bayt cinsinden; ilgili tablo yazilinca (ingest, favori) kayitlar silinir.
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") == "1"
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "4096"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "300"))
+
+# HTTP onbellekleme (ETag / Last-Modified / Cache-Control)
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"
+# Veri surumu bu kadar saniye bellekte tutulur; 304 cevaplari icin SQL calismaz
+HTTP_VERSION_TTL = float(os.getenv("HTTP_VERSION_TTL", "5"))
+CACHE_CONTROL_PAGES = os.getenv("CACHE_CONTROL_PAGES", "no-cache")
+CACHE_CONTROL_API = os.getenv("CACHE_CONTROL_API", "public, max-age=60")
+CACHE_CONTROL_STATIC_PAGES = os.getenv("CACHE_CONTROL_STATIC_PAGES", "public, max-age=3600")
+# endpoint -> Cache-Control; listede olmayan route'lara baslik eklenmez
+CACHE_CONTROL_POLICIES = {
+    "base_page": CACHE_CONTROL_STATIC_PAGES,
+    "players_page": CACHE_CONTROL_PAGES,
+    "player_profile_page": CACHE_CONTROL_PAGES,
+    "transfers_page": CACHE_CONTROL_PAGES,
+    "games_page": CACHE_CONTROL_PAGES,
+    "clubs_page": CACHE_CONTROL_PAGES,
+    "competitions_page": CACHE_CONTROL_PAGES,
+    "competition_table_page": CACHE_CONTROL_PAGES,
+    "analytics_page": CACHE_CONTROL_PAGES,
+    "transfers_export": CACHE_CONTROL_PAGES,
+    "games_export": CACHE_CONTROL_PAGES,
+    "club_players_api": CACHE_CONTROL_API,
+    "club_squads_api": CACHE_CONTROL_API,
+    "head_to_head_page": CACHE_CONTROL_PAGES,
+    "suggest_api": CACHE_CONTROL_API,
+    "api_v1.players": CACHE_CONTROL_API,
+    "api_v1.player_detail": CACHE_CONTROL_API,
+    "api_v1.player_profile": CACHE_CONTROL_API,
+    "api_v1.transfers": CACHE_CONTROL_API,
+    "api_v1.games": CACHE_CONTROL_PAGES,
+    "api_v1.clubs": CACHE_CONTROL_API,
+    "api_v1.club_players": CACHE_CONTROL_API,
+    "api_v1.head_to_head": CACHE_CONTROL_API,
+    "api_v1.competitions": CACHE_CONTROL_API,
+    "api_v1.competition_table": CACHE_CONTROL_API,
+    "api_v1.transfer_analytics": CACHE_CONTROL_API,
+}
+
+# /api/suggest otomatik tamamlama indeksi (bellek ici, DB'ye gitmez)
+SUGGEST_ENABLED = os.getenv("SUGGEST_ENABLED", "1") == "1"
+SUGGEST_REFRESH_SECONDS = float(os.getenv("SUGGEST_REFRESH_SECONDS", "900"))
+SUGGEST_TOP_K = int(os.getenv("SUGGEST_TOP_K", "10"))
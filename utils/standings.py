@@ -0,0 +1,110 @@
+# Galibiyet 3, beraberlik 1 puan; esitlikte averaj, atilan gol, club_id
+STANDINGS_SQL = """
+WITH sides AS (
+    SELECT g.competition_id, g.season, g.game_id, g.date,
+           g.home_club_id AS club_id, g.home_club_goals AS gf, g.away_club_goals AS ga
+    FROM games g {join}
+    WHERE g.home_club_goals IS NOT NULL AND g.away_club_goals IS NOT NULL
+    UNION ALL
+    SELECT g.competition_id, g.season, g.game_id, g.date,
+           g.away_club_id, g.away_club_goals, g.home_club_goals
+    FROM games g {join}
+    WHERE g.home_club_goals IS NOT NULL AND g.away_club_goals IS NOT NULL
+),
+results AS (
+    SELECT
+        s.*,
+        CASE WHEN gf > ga THEN 'W' WHEN gf = ga THEN 'D' ELSE 'L' END AS result,
+        ROW_NUMBER() OVER (
+            PARTITION BY competition_id, season, club_id ORDER BY date DESC, game_id DESC
+        ) AS recent
+    FROM sides s
+    WHERE club_id IS NOT NULL AND competition_id IS NOT NULL AND season IS NOT NULL
+),
+totals AS (
+    SELECT
+        competition_id,
+        season,
+        club_id,
+        COUNT(*) AS played,
+        COUNT(*) FILTER (WHERE result = 'W') AS won,
+        COUNT(*) FILTER (WHERE result = 'D') AS drawn,
+        COUNT(*) FILTER (WHERE result = 'L') AS lost,
+        SUM(gf) AS goals_for,
+        SUM(ga) AS goals_against,
+        STRING_AGG(result, '' ORDER BY date, game_id) FILTER (WHERE recent <= 5) AS form,
+        MAX(date) AS last_game_date
+    FROM results
+    GROUP BY competition_id, season, club_id
+)
+INSERT INTO standings (
+    competition_id, season, club_id, position, played, won, drawn, lost,
+    goals_for, goals_against, goal_difference, points, form, last_game_date
+)
+SELECT
+    competition_id,
+    season,
+    club_id,
+    ROW_NUMBER() OVER (
+        PARTITION BY competition_id, season
+        ORDER BY 3 * won + drawn DESC, goals_for - goals_against DESC, goals_for DESC, club_id
+    ),
+    played, won, drawn, lost,
+    goals_for, goals_against,
+    goals_for - goals_against,
+    3 * won + drawn,
+    form,
+    last_game_date
+FROM totals
+"""
+
+GROUPS_JOIN = """
+    JOIN unnest(%s::text[], %s::text[]) AS target(competition_id, season)
+      ON target.competition_id = g.competition_id AND target.season = g.season
+"""
+
+
+def changed_groups(cur):
+    """Ingest farkindaki maclarin (competition_id, season) gruplari.
+
+    ``delta_games`` ve ``stg_games`` (bkz. ``ingest._stage_and_diff``) uzerinden
+    degisiklikler uygulanmadan once cagrilir: guncellenen ya da silinen bir
+    macin eski grubu da yeni grubu da yeniden hesaplanmalidir.
+    """
+    cur.execute(
+        """
+        SELECT g.competition_id, g.season
+        FROM games g JOIN delta_games d ON d.key = g.game_id
+        UNION
+        SELECT s.competition_id, s.season
+        FROM stg_games s JOIN delta_games d ON d.key = s.game_id
+        """
+    )
+    return {(c, s) for c, s in cur.fetchall() if c is not None and s is not None}
+
+
+def refresh(cur, groups=None):
+    """Puan durumunu yeniden hesaplar; ``groups`` None ise tum gruplar.
+
+    Cagiranin transaction'i icinde calisir, okuyucular commit'e kadar eski
+    tabloyu gorur. Yazilan satir sayisini doner.
+    """
+    if groups is None:
+        cur.execute("DELETE FROM standings")
+        cur.execute(STANDINGS_SQL.format(join=""))
+        return cur.rowcount
+    if not groups:
+        return 0
+
+    competitions, seasons = zip(*sorted(groups))
+    params = (list(competitions), list(seasons))
+    cur.execute(
+        """
+        DELETE FROM standings st
+        USING unnest(%s::text[], %s::text[]) AS target(competition_id, season)
+        WHERE st.competition_id = target.competition_id AND st.season = target.season
+        """,
+        params,
+    )
+    cur.execute(STANDINGS_SQL.format(join=GROUPS_JOIN), params * 2)
+    return cur.rowcount
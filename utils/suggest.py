@@ -0,0 +1,184 @@
+import bisect
+import heapq
+import threading
+import time
+import unicodedata
+from urllib.parse import quote
+
+from utils import settings
+import utils.database as database
+
+
+def fold(text: str) -> str:
+    """Aksanlari kaldirip kucuk harfe cevirir ('Özil' -> 'ozil').
+
+    Veritabanindaki ``f_search_key`` ile ayni normalizasyon.
+    """
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower().strip()
+
+
+def _format_league_name(name: str) -> str:
+    return (name or "").replace("-", " ").replace("_", " ").title()
+
+
+class PrefixIndex:
+    """Isimler uzerinde bellek ici prefix indeksi.
+
+    Her ismin kelime sinirlarindan baslayan tum son ekleri ("lionel messi",
+    "messi") sirali bir listede tutulur; sorgu ``bisect`` ile bulunur. Cok
+    genis araliklara dusen kisa prefix'ler (1-2 karakter) icin en populer
+    sonuclar onceden hesaplanir, boylece her sorgu milisaniye altinda kalir.
+    """
+
+    PRECOMPUTED_PREFIX_LEN = 2
+
+    def __init__(self, entries, top_k: int):
+        self.entries = entries  # [{kind, id, label, detail, url, score}]
+        self.top_k = top_k
+        keys = []
+        for idx, entry in enumerate(entries):
+            words = fold(entry["label"]).split()
+            for start in range(len(words)):
+                keys.append((" ".join(words[start:]), idx))
+        keys.sort()
+        self._keys = [k for k, _ in keys]
+        self._ids = [i for _, i in keys]
+
+        self._precomputed = {}
+        buckets = {}
+        for key, idx in keys:
+            for length in range(1, self.PRECOMPUTED_PREFIX_LEN + 1):
+                if len(key) >= length:
+                    buckets.setdefault(key[:length], set()).add(idx)
+        for prefix, ids in buckets.items():
+            self._precomputed[prefix] = self._rank(ids, top_k)
+
+    def _rank(self, ids, limit):
+        return heapq.nlargest(limit, ids, key=lambda i: (self.entries[i]["score"], -i))
+
+    def search(self, query: str, limit: int):
+        q = fold(query)
+        if not q:
+            return []
+        limit = min(limit, self.top_k)
+        if q in self._precomputed:
+            return [self.entries[i] for i in self._precomputed[q][:limit]]
+
+        start = bisect.bisect_left(self._keys, q)
+        ids = set()
+        for pos in range(start, len(self._keys)):
+            if not self._keys[pos].startswith(q):
+                break
+            ids.add(self._ids[pos])
+        return [self.entries[i] for i in self._rank(ids, limit)]
+
+
+_index = None
+_built_at = None
+_lock = threading.Lock()
+_started = False
+
+
+def build_index():
+    """Veritabanindan indeksi bastan kurar ve atomik olarak yerine koyar."""
+    global _index, _built_at
+    sources = database.get_suggest_sources()
+    if not any(sources.values()):
+        return None
+
+    club_names = {c["club_id"]: c["name"] for c in sources["clubs"]}
+    competition_names = {c["competition_id"]: c["name"] for c in sources["competitions"]}
+
+    entries = []
+    for p in sources["players"]:
+        entries.append(
+            {
+                "kind": "player",
+                "id": p["player_id"],
+                "label": p["name"],
+                "detail": club_names.get(p["current_club_id"]),
+                "url": f"/players/{p['player_id']}",
+                "score": p["market_value"] or 0,
+            }
+        )
+    for c in sources["clubs"]:
+        entries.append(
+            {
+                "kind": "club",
+                "id": c["club_id"],
+                "label": c["name"],
+                "detail": _format_league_name(competition_names.get(c["domestic_competition_id"])),
+                "url": f"/clubs?search={quote(c['name'])}",
+                "score": c["market_value"] or 0,
+            }
+        )
+    for c in sources["competitions"]:
+        entries.append(
+            {
+                "kind": "competition",
+                "id": c["competition_id"],
+                "label": _format_league_name(c["name"]),
+                "detail": c["country_name"],
+                "url": f"/competitions?country={quote(c['country_name'] or '')}",
+                "score": c["market_value"] or 0,
+            }
+        )
+
+    index = PrefixIndex(entries, settings.SUGGEST_TOP_K)
+    _index, _built_at = index, time.time()
+    return index
+
+
+def _refresh_loop():
+    while True:
+        try:
+            build_index()
+        except Exception as e:
+            print(f"Suggest index error: {e}")
+        time.sleep(settings.SUGGEST_REFRESH_SECONDS)
+
+
+def start():
+    """Indeksi arka planda kurar ve periyodik olarak yeniler (tek sefer baslar)."""
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+    threading.Thread(target=_refresh_loop, name="suggest-index", daemon=True).start()
+
+
+def init_app(app):
+    """Sunucu ilk istegi aldiginda indeks kurulumunu baslatir.
+
+    CLI komutlari (ör. ``flask load-dataset``) da ``create_app`` kullandigi
+    icin kurulum uygulama yuklenirken degil, ilk istekte tetiklenir.
+    """
+    if not settings.SUGGEST_ENABLED:
+        return
+
+    @app.before_request
+    def _start_suggest_index():
+        if not _started:
+            start()
+
+
+def suggest(query: str, limit: int = 10):
+    """Prefix'e uyan en populer isimleri doner; Postgres'e gitmez."""
+    index = _index
+    if index is None:
+        return None
+    return [
+        {k: entry[k] for k in ("kind", "id", "label", "detail", "url")}
+        for entry in index.search(query, limit)
+    ]
+
+
+def status():
+    index = _index
+    return {
+        "ready": index is not None,
+        "entries": len(index.entries) if index else 0,
+        "built_at": _built_at,
+    }